@@ -1,5 +1,6 @@
 import os
 import logging
+import gzip
 from datetime import datetime, timedelta
 from functools import wraps
 import json
@@ -7,22 +8,49 @@ import io
 from io import BytesIO
 
 import pandas as pd
-from flask import Flask, jsonify, request, abort, g, session, make_response, send_file
+from flask import Flask, jsonify, request, abort, g, session, make_response, send_file, Response
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy.sql import func
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import undefer, contains_eager, joinedload
 import jwt
 
-from excel_export import export_qc_cw_panel_data_to_excel
+from excel_export import export_qc_cw_panel_data_to_excel, export_product_parts_to_excel
+from excel_export import export_coating_colors_to_excel, export_qc_reports_to_excel
+from export_jobs import ExportJobQueue, EXPORT_TYPES
+from dashboard_summary import load_current_inventory
+from inventory import record_snapshot, record_shipment
+from inventory_rollups import BUCKETS, GROUP_BY, load_trends
+from inventory_time import DEFAULT_INVENTORY_TZ, init_inventory_zone, inventory_today, as_utc, local_date, to_utc
+from pagination import InvalidCursor, encode_cursor, decode_cursor, get_page_size, apply_keyset, parse_fields
+from pagination import parse_date_range, contains_pattern
+from schema_upgrades import upgrade_schema
+from auth_cache import Principal, principal_cache
+from attribute_cache import attribute_cache
+from lookup_cache import lookup_cache, encode_body
+from reference_cache import reference_cache
+from panel_upsert import upsert_panels, PANEL_JSON_FIELDS, DEFAULT_MAX_PANELS
+from panel_measurements import MEASUREMENT_FIELDS, REFERENCE_SOURCE, MEASURED_SOURCE, sync_measurements, deviation_query
+from qc_ingest import IngestError, read_items, ingest_sessions, DEFAULT_MAX_ITEMS
+from blob_store import init_blob_store
+from image_response import image_response, image_url
+from image_renditions import rendition_queue
+from refresh_tokens import RefreshTokenError, DEFAULT_REFRESH_TOKEN_DAYS
+from refresh_tokens import issue_refresh_token, rotate_refresh_token, revoke_refresh_tokens, revoke_refresh_token
+from password_service import VerifierBusy, password_verifier, DEFAULT_BCRYPT_ROUNDS, DEFAULT_VERIFY_TIMEOUT
+from uploads import UploadError, parse_upload_request, store_image, get_max_file_size
+from uploads import create_upload_session, append_chunk, DEFAULT_MAX_FILE_SIZE, DEFAULT_MAX_REQUEST_SIZE
 
 from models import db, User, Product, QCSession, QCAttributeDef, QCAttributeValue 
 from models import LookupType, Lookup, QCPhoto, Warehouse, PartType, PartSubtype
-from models import InventorySnapshot, PartShipment, Container, ProductShipment, PartSubtypeImage
+from models import InventorySnapshot, PartShipment, Container, ProductShipment, PartSubtypeImage, CurrentInventory
 from models import ProductPart, CoatingColor, ProductColor, QCReport, ReportImage
-from models import QCCWPanelData, FrameCavitiesAttribute, FrameCavitiesValue, QCCWPanelPhoto
+from models import QCCWPanelData, FrameCavitiesAttribute, FrameCavitiesValue, QCCWPanelPhoto, PanelMeasurement
+from models import ExportJob, UploadSession, json_contains
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -38,14 +66,63 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
 }
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+# Background export jobs
+app.config["EXPORT_ARTIFACT_DIR"] = os.environ.get("EXPORT_ARTIFACT_DIR")
+app.config["EXPORT_WORKERS"] = int(os.environ.get("EXPORT_WORKERS", "2"))
+
+# Image blob storage (only "local" is supported)
+app.config["BLOB_STORE_BACKEND"] = os.environ.get("BLOB_STORE_BACKEND", "local")
+app.config["BLOB_STORE_PATH"] = os.environ.get("BLOB_STORE_PATH")
+
+# Image renditions ("webp" or "jpeg")
+app.config["IMAGE_RENDITION_FORMAT"] = os.environ.get("IMAGE_RENDITION_FORMAT", "webp")
+app.config["IMAGE_RENDITION_WORKERS"] = int(os.environ.get("IMAGE_RENDITION_WORKERS", "1"))
+
+# Upload limits; multipart file parts and chunks are streamed to the blob store
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("UPLOAD_MAX_REQUEST_SIZE", DEFAULT_MAX_REQUEST_SIZE))
+app.config["UPLOAD_MAX_FILE_SIZE"] = int(os.environ.get("UPLOAD_MAX_FILE_SIZE", DEFAULT_MAX_FILE_SIZE))
+app.config["UPLOAD_STAGING_DIR"] = os.environ.get("UPLOAD_STAGING_DIR")
+
+# QC attribute definitions are cached per process for ATTRIBUTE_CACHE_TTL seconds
+app.config["ATTRIBUTE_CACHE_TTL"] = float(os.environ.get("ATTRIBUTE_CACHE_TTL", "300"))
+
+# The lookup forest is cached per process; other processes see changes after LOOKUP_CACHE_TTL seconds
+app.config["LOOKUP_CACHE_TTL"] = float(os.environ.get("LOOKUP_CACHE_TTL", "300"))
+
+# Reference data bundles are cached per process for up to REFERENCE_CACHE_TTL seconds
+app.config["REFERENCE_CACHE_TTL"] = float(os.environ.get("REFERENCE_CACHE_TTL", "300"))
+
+# Zone whose calendar days inventory snapshots, shipments and rollups are dated in (IANA name)
+app.config["INVENTORY_TZ"] = os.environ.get("INVENTORY_TZ", DEFAULT_INVENTORY_TZ)
+
+# Maximum number of sessions per bulk QC session request
+app.config["QC_BULK_MAX_ITEMS"] = int(os.environ.get("QC_BULK_MAX_ITEMS", DEFAULT_MAX_ITEMS))
+
+# Maximum number of panels per bulk QC CW panel upsert
+app.config["PANEL_BULK_MAX_ITEMS"] = int(os.environ.get("PANEL_BULK_MAX_ITEMS", DEFAULT_MAX_PANELS))
+
+# Password hashing; verification runs in PASSWORD_WORKERS processes (0 = on the request thread)
+app.config["BCRYPT_ROUNDS"] = int(os.environ.get("BCRYPT_ROUNDS", DEFAULT_BCRYPT_ROUNDS))
+app.config["PASSWORD_WORKERS"] = int(os.environ.get("PASSWORD_WORKERS", min(4, os.cpu_count() or 1)))
+app.config["PASSWORD_MAX_PENDING"] = int(os.environ.get("PASSWORD_MAX_PENDING", "0")) or None
+app.config["PASSWORD_VERIFY_TIMEOUT"] = float(os.environ.get("PASSWORD_VERIFY_TIMEOUT", DEFAULT_VERIFY_TIMEOUT))
+
 # Initialize extensions
 db.init_app(app)
+init_blob_store(app)
+init_inventory_zone(app)
+rendition_queue.init_app(app)
+attribute_cache.init_app(app)
+lookup_cache.init_app(app)
+reference_cache.init_app(app)
+password_verifier.init_app(app)
+export_queue = ExportJobQueue(app)
 # Configure CORS with explicit headers - allow all origins for development
 CORS(app, 
      resources={r"/*": {"origins": "*"}}, 
      supports_credentials=True,
-     expose_headers=["Content-Type", "Authorization", "Content-Disposition"],
-     allow_headers=["Content-Type", "Authorization", "Accept"],
+     expose_headers=["Content-Type", "Authorization", "Content-Disposition", "X-Next-Cursor", "ETag", "Content-Range", "Accept-Ranges"],
+     allow_headers=["Content-Type", "Authorization", "Accept", "If-None-Match", "Range", "Content-Range"],
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
 
 # Initialize Flask-Login
@@ -57,6 +134,14 @@ login_manager.login_view = "login"
 JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY") or "your-secret-key"
 JWT_ALGORITHM = "HS256"
 JWT_ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Refresh tokens renew access tokens without a password check
+JWT_REFRESH_TOKEN_EXPIRE_DAYS = float(os.environ.get("JWT_REFRESH_TOKEN_EXPIRE_DAYS", DEFAULT_REFRESH_TOKEN_DAYS))
+
+# Authenticated principals are cached per process for AUTH_CACHE_TTL seconds
+principal_cache.configure(
+    max_size=int(os.environ.get("AUTH_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("AUTH_CACHE_TTL", "60"))
+)
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -73,6 +158,31 @@ def create_access_token(data, expires_delta=None):
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
+def issue_tokens(user, refresh_token=None):
+    """
+    Build the token part of a login or refresh response.
+
+    Args:
+        user: Authenticated User
+        refresh_token: Rotated refresh token, a new one is issued when None
+
+    Returns:
+        dict: access_token, token_type, expires_in (seconds) and refresh_token
+    """
+    access_token_expires = timedelta(minutes=JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.username, "ver": user.token_version or 0},
+        expires_delta=access_token_expires
+    )
+    if refresh_token is None:
+        refresh_token = issue_refresh_token(db.session, user.id, timedelta(days=JWT_REFRESH_TOKEN_EXPIRE_DAYS))
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": int(access_token_expires.total_seconds()),
+        "refresh_token": refresh_token
+    }
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -91,11 +201,19 @@ def token_required(f):
         
         try:
             payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-            # Store user info in Flask g object for route function access
-            g.user = db.session.query(User).filter(User.username == payload['sub']).first()
+            subject = payload['sub']
+            version = payload.get('ver', 0)
             
-            if not g.user:
-                return jsonify({'message': 'User not found!'}), 401
+            # Store user info in Flask g object for route function access
+            g.user = principal_cache.get(subject, version)
+            if g.user is None:
+                user = db.session.query(User).filter(User.username == subject).first()
+                if not user:
+                    return jsonify({'message': 'User not found!'}), 401
+                if (user.token_version or 0) != version:
+                    return jsonify({'message': 'Token revoked!'}), 401
+                g.user = Principal.from_user(user)
+                principal_cache.put(subject, version, g.user)
                 
             if not g.user.is_active:
                 return jsonify({'message': 'Inactive user!'}), 401
@@ -115,17 +233,31 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated
 
+def image_access_required(f):
+    """
+    Protect a private image route. Requests with a v= version are let through
+    for <img> tags, and image_response serves them only if the version is the
+    current blob key; requests without one need a token.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if request.args.get("v"):
+            return f(*args, **kwargs)
+        return token_required(f)(*args, **kwargs)
+    return decorated
+
 # Create database tables if they don't exist
 with app.app_context():
     db.create_all()
+    upgrade_schema(db.engine)
 
 # Add CORS headers to all responses
 @app.after_request
 def add_cors_headers(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
+    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,Content-Range')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
-    response.headers.add('Access-Control-Expose-Headers', 'Content-Disposition')
+    response.headers.add('Access-Control-Expose-Headers', 'Content-Disposition, X-Next-Cursor, ETag, Content-Range, Accept-Ranges')
     return response
 
 # Root endpoint
@@ -157,8 +289,8 @@ def login_for_access_token():
         (User.username == username) | (User.email == username)
     ).first()
     
-    # For development purposes, create a test user if not exists
-    if not user:
+    # For development purposes, create the test user on its first login
+    if not user and username == "test" and password == "password":
         try:
             user = User(
                 username="test",
@@ -170,24 +302,33 @@ def login_for_access_token():
             user.set_password("password")
             db.session.add(user)
             db.session.commit()
-            
-            # Try to find the user again
-            user = db.session.query(User).filter(User.username == "test").first()
         except Exception as e:
+            db.session.rollback()
             logger.warning(f"Could not create test user: {str(e)}")
-    
-    # For development, allow login with test/password
-    if (username == "test" and password == "password") or (user and user.verify_password(password)):
-        # Ensure we have the user object
-        if not user:
             user = db.session.query(User).filter(User.username == "test").first()
-            
-        access_token_expires = timedelta(minutes=JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user.username},
-            expires_delta=access_token_expires
-        )
-        
+
+    if not user:
+        return jsonify({"message": "Invalid username or password"}), 401
+
+    try:
+        # For development, allow login with test/password
+        valid = (username == "test" and password == "password") or user.verify_password(password)
+    except VerifierBusy as e:
+        logger.warning(f"Login rejected: {str(e)}")
+        response = jsonify({"message": "Too many login attempts in progress, please retry"})
+        response.status_code = 503
+        response.headers["Retry-After"] = "2"
+        return response
+
+    if valid:
+        if db.session.is_modified(user):
+            # verify_password upgraded the hash to the configured bcrypt cost
+            try:
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"Could not store rehashed password for {user.username}: {str(e)}")
+
         # Format user information for response
         user_dict = {
             "id": user.id,
@@ -198,14 +339,40 @@ def login_for_access_token():
             "is_active": user.is_active
         }
         
-        return jsonify({
-            "access_token": access_token,
-            "token_type": "bearer",
-            "user": user_dict
-        })
+        response = issue_tokens(user)
+        response["user"] = user_dict
+        return jsonify(response)
     else:
         return jsonify({"message": "Invalid username or password"}), 401
 
+@app.route("/api/auth/refresh", methods=["POST"])
+def refresh_access_token():
+    """Exchange a refresh token for a new access token and refresh token."""
+    data = request.json or {}
+    try:
+        user, refresh_token = rotate_refresh_token(
+            db.session, data.get("refresh_token"), timedelta(days=JWT_REFRESH_TOKEN_EXPIRE_DAYS)
+        )
+    except RefreshTokenError as e:
+        return jsonify({"message": str(e)}), 401
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error refreshing token: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    return jsonify(issue_tokens(user, refresh_token))
+
+@app.route("/api/auth/logout", methods=["POST"])
+def logout_refresh_token():
+    """Revoke the refresh token of this login."""
+    data = request.json or {}
+    try:
+        revoke_refresh_token(db.session, data.get("refresh_token"))
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error revoking refresh token: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    return jsonify({"message": "Logged out"})
+
 @app.route("/api/auth/register", methods=["POST"])
 def register_user():
     data = request.json
@@ -315,7 +482,8 @@ def read_users_me():
 @app.route("/api/auth/users/me", methods=["PUT"])
 @token_required
 def update_user_me():
-    user = g.user
+    user = db.session.get(User, g.user.id)
+    previous_username = user.username
     data = request.json
     
     # Update user fields
@@ -339,10 +507,17 @@ def update_user_me():
             return jsonify({"message": "Email already registered"}), 400
         user.email = data["email"]
     
+    # Tokens issued before a password change stay invalid, including stolen ones;
+    # the caller gets a new token pair to stay logged in
+    tokens = None
     if "password" in data and data["password"]:
         user.set_password(data["password"])
+        user.revoke_tokens()
+        revoke_refresh_tokens(db.session, user_id=user.id)
+        tokens = issue_tokens(user)
     
     db.session.commit()
+    principal_cache.invalidate(previous_username, user.username)
     
     # Format user response
     user_dict = {
@@ -354,6 +529,8 @@ def update_user_me():
         "is_active": user.is_active,
         "created_at": user.created_at.isoformat() if user.created_at else None
     }
+    if tokens:
+        user_dict.update(tokens)
     
     return jsonify(user_dict)
 
@@ -390,6 +567,7 @@ def update_user(user_id):
     if not user:
         return jsonify({"message": "User not found"}), 404
     
+    previous_username = user.username
     data = request.json
     
     # Update user fields
@@ -425,7 +603,13 @@ def update_user(user_id):
     if "department" in data:
         user.department = data["department"]
     
+    # Tokens issued before a deactivation or an admin password reset stay invalid
+    if ("is_active" in data and not user.is_active) or ("password" in data and data["password"]):
+        user.revoke_tokens()
+        revoke_refresh_tokens(db.session, user_id=user.id)
+    
     db.session.commit()
+    principal_cache.invalidate(previous_username, user.username)
     
     # Format user response
     user_dict = {
@@ -441,47 +625,265 @@ def update_user(user_id):
     return jsonify(user_dict)
 
 # Lookup routes
+def cached_json_response(body, etag, compressed=False):
+    """
+    Build a JSON response from a cached body, or 304 when the client copy is current.
+
+    Args:
+        body: Encoded JSON body
+        etag: Strong ETag of the uncompressed body
+        compressed: Whether body is gzip-compressed; it is sent as is to clients
+            accepting gzip and decompressed for others
+
+    Returns:
+        Response: 200 with the body or 304 without it; clients must revalidate before reuse
+    """
+    gzipped = compressed and bool(request.accept_encodings["gzip"])
+    if gzipped:
+        # Each encoding of the body is a different representation
+        etag = f"{etag}-gzip"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(gzip.decompress(body) if compressed and not gzipped else body, mimetype="application/json")
+        if gzipped:
+            response.headers["Content-Encoding"] = "gzip"
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    if compressed:
+        response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+def lookup_value(node):
+    """Format a cached lookup tree node without its children."""
+    return {key: node[key] for key in ("id", "lookup_type_id", "code", "label", "parent_id")}
+
+def walk_lookups(nodes):
+    """Yield the lookup tree nodes below a list of nodes, parents first."""
+    for node in nodes:
+        yield node
+        yield from walk_lookups(node["children"])
+
 @app.route("/api/lookups/types", methods=["GET"])
 @token_required
 def get_lookup_types():
     skip = request.args.get("skip", 0, type=int)
-    limit = request.args.get("limit", 100, type=int)
-    
-    lookup_types = db.session.query(LookupType).offset(skip).limit(limit).all()
-    
+    if skip < 0:
+        return jsonify({"error": "skip must be a non-negative integer"}), 400
+    limit = get_page_size(request.args, default=100)
+
     # Format lookup types list
-    lookup_types_list = []
-    for lookup_type in lookup_types:
-        lookup_types_list.append({
-            "id": lookup_type.id,
-            "name": lookup_type.name
-        })
-    
-    return jsonify(lookup_types_list)
+    def build(forest):
+        return [
+            {"id": lookup_type["id"], "name": lookup_type["name"]}
+            for lookup_type in sorted(forest, key=lambda lookup_type: lookup_type["id"])
+        ]
+
+    # Only the full list is cached, so clients cannot add a cached body per skip/limit pair
+    forest = lookup_cache.forest(db.session)
+    if skip == 0 and limit >= len(forest):
+        body, etag = lookup_cache.render(db.session, "types", build)
+    else:
+        body, etag = encode_body(build(forest)[skip:skip + limit])
+
+    return cached_json_response(body, etag)
 
 @app.route("/api/lookups/types/<int:lookup_type_id>", methods=["GET"])
 @token_required
 def get_lookup_type(lookup_type_id):
-    lookup_type = db.session.get(LookupType, lookup_type_id)
-    
-    if not lookup_type:
+    """Get a lookup type with its lookup trees."""
+    lookup_type = lookup_cache.lookup_type(db.session, lookup_type_id)
+    if lookup_type is None:
         return jsonify({"message": "Lookup type not found"}), 404
-    
-    # Format lookup type response
-    lookup_type_dict = {
-        "id": lookup_type.id,
-        "name": lookup_type.name
-    }
-    
-    return jsonify(lookup_type_dict)
+
+    # Per-id bodies are encoded per request; only fixed keys are cached
+    body, etag = encode_body(lookup_type)
+
+    return cached_json_response(body, etag)
+
+@app.route("/api/lookups/tree", methods=["GET"])
+@token_required
+def get_lookup_tree():
+    """Get every lookup type with its lookup trees."""
+    body, etag = lookup_cache.render(db.session, "tree", lambda forest: forest)
+    return cached_json_response(body, etag)
+
+@app.route("/api/lookups/types", methods=["POST"])
+@token_required
+@admin_required
+def create_lookup_type():
+    """Create a new lookup type."""
+    try:
+        data = request.json
+
+        # Validate required fields
+        if not data or not data.get("name"):
+            return jsonify({"error": "Missing required field: name"}), 400
+
+        # Check if the name already exists
+        if db.session.query(LookupType).filter(LookupType.name == data["name"]).first():
+            return jsonify({"error": "Lookup type name already exists"}), 400
+
+        lookup_type = LookupType(name=data["name"])
+        db.session.add(lookup_type)
+        db.session.commit()
+
+        return jsonify({
+            "id": lookup_type.id,
+            "name": lookup_type.name,
+            "message": "Lookup type created successfully"
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Create lookup type error: {str(e)}")
+        return jsonify({"error": "An error occurred while creating the lookup type"}), 500
+
+@app.route("/api/lookups/types/<int:lookup_type_id>", methods=["DELETE"])
+@token_required
+@admin_required
+def delete_lookup_type(lookup_type_id):
+    """Delete a lookup type and its lookups."""
+    try:
+        lookup_type = db.session.get(LookupType, lookup_type_id)
+        if not lookup_type:
+            return jsonify({"message": "Lookup type not found"}), 404
+
+        for lookup in lookup_type.lookups:
+            db.session.delete(lookup)
+        db.session.delete(lookup_type)
+        db.session.commit()
+
+        return jsonify({"message": "Lookup type deleted successfully"})
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Lookups of this type are still in use"}), 409
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Delete lookup type error: {str(e)}")
+        return jsonify({"error": "An error occurred while deleting the lookup type"}), 500
+
+@app.route("/api/lookups/values", methods=["GET"])
+@token_required
+def get_lookup_values():
+    """Get lookups without nesting, parents first; filter with lookup_type_id."""
+    lookup_type_id = request.args.get("lookup_type_id", type=int)
+
+    if lookup_type_id is None:
+        body, etag = lookup_cache.render(db.session, "values", lambda forest: [
+            lookup_value(node) for lookup_type in forest for node in walk_lookups(lookup_type["lookups"])
+        ])
+    else:
+        lookup_type = lookup_cache.lookup_type(db.session, lookup_type_id)
+        body, etag = encode_body([
+            lookup_value(node) for node in walk_lookups(lookup_type["lookups"] if lookup_type else [])
+        ])
+
+    return cached_json_response(body, etag)
+
+@app.route("/api/lookups/values/<int:lookup_id>", methods=["GET"])
+@token_required
+def get_lookup_value(lookup_id):
+    """Get a lookup with its subtree."""
+    lookup = lookup_cache.lookup(db.session, lookup_id)
+    if lookup is None:
+        return jsonify({"message": "Lookup not found"}), 404
+
+    body, etag = encode_body(lookup)
+
+    return cached_json_response(body, etag)
+
+@app.route("/api/lookups/values", methods=["POST"])
+@token_required
+@admin_required
+def create_lookup_value():
+    """Create a new lookup, optionally below a parent lookup."""
+    try:
+        data = request.json
+
+        # Validate required fields
+        for field in ["lookup_type_id", "code", "label"]:
+            if not data or data.get(field) in (None, ""):
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+
+        if not db.session.get(LookupType, data["lookup_type_id"]):
+            return jsonify({"error": "Lookup type not found"}), 400
+        if data.get("parent_id") is not None and not db.session.get(Lookup, data["parent_id"]):
+            return jsonify({"error": "Parent lookup not found"}), 400
+
+        lookup = Lookup(
+            lookup_type_id=data["lookup_type_id"],
+            code=data["code"],
+            label=data["label"],
+            parent_id=data.get("parent_id")
+        )
+        db.session.add(lookup)
+        db.session.commit()
+
+        return jsonify({
+            "id": lookup.id,
+            "lookup_type_id": lookup.lookup_type_id,
+            "code": lookup.code,
+            "label": lookup.label,
+            "parent_id": lookup.parent_id,
+            "message": "Lookup created successfully"
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Create lookup error: {str(e)}")
+        return jsonify({"error": "An error occurred while creating the lookup"}), 500
+
+@app.route("/api/lookups/values/<int:lookup_id>", methods=["DELETE"])
+@token_required
+@admin_required
+def delete_lookup_value(lookup_id):
+    """Delete a lookup without children."""
+    try:
+        lookup = db.session.get(Lookup, lookup_id)
+        if not lookup:
+            return jsonify({"message": "Lookup not found"}), 404
+        if db.session.query(Lookup.id).filter(Lookup.parent_id == lookup_id).first():
+            return jsonify({"error": "Lookup has child lookups"}), 409
+
+        db.session.delete(lookup)
+        db.session.commit()
+
+        return jsonify({"message": "Lookup deleted successfully"})
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Lookup is still in use"}), 409
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Delete lookup error: {str(e)}")
+        return jsonify({"error": "An error occurred while deleting the lookup"}), 500
+
+# Reference data bundle
+@app.route("/api/reference-bundle", methods=["GET"])
+@token_required
+def get_reference_bundle():
+    """
+    Get the reference data a form needs in one response: product parts, coating
+    colors, warehouses, lookups and, with fl_id, the frame cavity attributes of
+    that floor. Served gzip-compressed from a per-process cache, with a strong ETag.
+    """
+    try:
+        body, etag = reference_cache.bundle(db.session, request.args.get("fl_id") or None)
+        return cached_json_response(body, etag, compressed=True)
+    except Exception as e:
+        logger.error(f"Reference bundle error: {str(e)}")
+        return jsonify({
+            "error": "An error occurred while retrieving reference data"
+        }), 500
 
 # Dashboard API endpoint
 @app.route("/api/dashboard", methods=["GET"])
 def get_dashboard_data():
     """Get dashboard data including counts and statistics."""
     try:
-        # Get panel counts by status
-        total_panels = db.session.query(func.count(Product.id)).scalar() or 0
+        # Get panel counts by status in a single grouped query
+        status_counts = dict(
+            db.session.query(Product.status, func.count(Product.id)).group_by(Product.status).all()
+        )
+        total_panels = sum(status_counts.values())
         # If we don't have any data yet, return some sample dashboard data
         if total_panels == 0:
             return jsonify({
@@ -501,28 +903,30 @@ def get_dashboard_data():
                 "sealant_data": [],
                 "inventory_data": []
             })
-        pending_panels = db.session.query(func.count(Product.id)).filter(Product.status == 'pending').scalar() or 0
-        passed_panels = db.session.query(func.count(Product.id)).filter(Product.status == 'qc_passed').scalar() or 0
-        shipped_panels = db.session.query(func.count(Product.id)).filter(Product.status == 'shipped').scalar() or 0
-        
-        # Get inventory data by type
-        inventory_data = {}
-        inventory_counts = {}
-        
-        # Get recent QC sessions
-        qc_sessions = db.session.query(QCSession).order_by(QCSession.performed_at.desc()).limit(5).all()
+        # Get recent QC sessions with product and inspector in one query
+        recent_sessions = db.session.query(
+            QCSession.id,
+            QCSession.product_id,
+            QCSession.performed_at,
+            Product.product_number,
+            Product.status,
+            User.username
+        ).outerjoin(
+            Product, QCSession.product_id == Product.id
+        ).outerjoin(
+            User, QCSession.inspector_id == User.id
+        ).order_by(
+            QCSession.performed_at.desc()
+        ).limit(5).all()
         
         panels_data = []
-        for session in qc_sessions:
-            product = db.session.get(Product, session.product_id)
-            inspector = db.session.get(User, session.inspector_id)
-            
+        for session in recent_sessions:
             panel_data = {
                 "qc_id": session.id,
-                "panel_number": product.product_number if product else f"Unknown-{session.product_id}",
-                "inspector": inspector.username if inspector else "System",
+                "panel_number": session.product_number or f"Unknown-{session.product_id}",
+                "inspector": session.username or "System",
                 "date": session.performed_at.strftime("%Y-%m-%d"),
-                "status": "Passed" if session.status == "passed" else "Failed",
+                "status": "Passed" if session.status == "qc_passed" else "Failed",
                 "type": "Standard",
                 "width": "N/A",
                 "height": "N/A",
@@ -530,36 +934,31 @@ def get_dashboard_data():
             }
             panels_data.append(panel_data)
         
-        # Get part types
-        part_subtypes = db.session.query(PartSubtype).all()
-        for subtype in part_subtypes:
-            part_type = db.session.get(PartType, subtype.part_type_id)
-            type_name = part_type.name if part_type else "Unknown"
+        # Get inventory data by type from the current stock of every part subtype
+        inventory_data = {}
+        inventory_counts = {}
+        
+        inventory_items = load_current_inventory(db.session)
+        for item in inventory_items:
+            type_name = item.type_name or "Unknown"
             
             if type_name not in inventory_data:
                 inventory_data[type_name] = []
                 inventory_counts[type_name] = 0
             
-            # Get latest inventory snapshot
-            snapshot = db.session.query(InventorySnapshot).filter(
-                InventorySnapshot.part_subtype_id == subtype.id
-            ).order_by(InventorySnapshot.snapshot_date.desc()).first()
-            
-            warehouse = None
-            if snapshot:
-                warehouse = db.session.get(Warehouse, snapshot.warehouse_id)
-                inventory_counts[type_name] += snapshot.quantity
+            quantity = item.quantity if item.quantity is not None else 0
+            inventory_counts[type_name] += quantity
             
             # Add inventory item data
             inventory_data[type_name].append({
-                "part_id": subtype.id,
+                "part_id": item.part_id,
                 "type": type_name,
-                "description": subtype.name,
+                "description": item.description,
                 "size": "N/A",
                 "color": "Standard",
-                "quantity": snapshot.quantity if snapshot else 0,
-                "warehouse": warehouse.name if warehouse else "Unknown",
-                "last_update": snapshot.snapshot_date.strftime("%Y-%m-%d") if snapshot else datetime.now().strftime("%Y-%m-%d")
+                "quantity": quantity,
+                "warehouse": item.warehouse_name or "Unknown",
+                "last_update": item.as_of.strftime("%Y-%m-%d") if item.as_of else inventory_today().strftime("%Y-%m-%d")
             })
         
         return jsonify({
@@ -568,47 +967,119 @@ def get_dashboard_data():
             "inventory_counts": inventory_counts,
             "panel_counts": {
                 "total": total_panels,
-                "pending": pending_panels,
-                "passed": passed_panels,
-                "shipped": shipped_panels
+                "pending": status_counts.get("pending", 0),
+                "passed": status_counts.get("qc_passed", 0),
+                "shipped": status_counts.get("shipped", 0)
             },
-            "failed_qc": db.session.query(func.count(QCSession.id)).filter(
-                QCSession.status == "failed"
-            ).scalar() or 0
+            "failed_qc": sum(
+                count for status, count in status_counts.items()
+                if status not in ("qc_passed", "pending", "shipped", "complete")
+            )
         })
     except Exception as e:
         logger.error(f"Error generating dashboard data: {str(e)}")
         return jsonify({"error": "Could not generate dashboard data"}), 500
 
 # Products routes - public for development purposes
+PRODUCT_LIST_FIELDS = [
+    "id", "product_number", "status", "created_at", "warehouse_id",
+    "qc_id", "qc_date", "inspector_id"
+]
+PRODUCT_QC_FIELDS = {"qc_id", "qc_date", "inspector_id"}
+
 @app.route("/api/products", methods=["GET"])
 def get_products():
-    """Get all products data."""
+    """
+    Get products, newest first, one keyset page at a time.
+    
+    Query parameters: limit, cursor (from the X-Next-Cursor header of the previous page),
+    fields (comma separated projection), status, warehouse_id and search.
+    """
     try:
-        products = db.session.query(Product).order_by(Product.created_at.desc()).all()
+        try:
+            fields = parse_fields(request.args, PRODUCT_LIST_FIELDS)
+            cursor = request.args.get("cursor")
+            cursor_values = decode_cursor(cursor, datetime, int) if cursor else None
+        except (ValueError, InvalidCursor) as e:
+            return jsonify({"error": str(e)}), 400
+        
+        limit = get_page_size(request.args)
+        
+        # Select one page of products using the (created_at, id) keyset
+        page_query = db.session.query(
+            Product.id,
+            Product.product_number,
+            Product.status,
+            Product.created_at,
+            Product.warehouse_id
+        )
+        if request.args.get("status"):
+            page_query = page_query.filter(Product.status == request.args.get("status"))
+        if request.args.get("warehouse_id", type=int):
+            page_query = page_query.filter(Product.warehouse_id == request.args.get("warehouse_id", type=int))
+        if request.args.get("search"):
+            page_query = page_query.filter(Product.product_number.ilike(contains_pattern(request.args.get("search")), escape="\\"))
+        page_query = apply_keyset(page_query, [Product.created_at, Product.id], cursor_values)
+        
+        # Offset paging is kept for older clients that send skip instead of a cursor
+        skip = request.args.get("skip", 0, type=int)
+        if skip and cursor_values is None:
+            page_query = page_query.offset(skip)
+        
+        # Fetch one extra row to know whether another page exists
+        page = page_query.limit(limit + 1).cte("product_page")
+        
+        columns = [page.c.id, page.c.product_number, page.c.status, page.c.created_at, page.c.warehouse_id]
+        query = db.session.query(*columns)
+        if PRODUCT_QC_FIELDS.intersection(fields):
+            # Most recent QC session of each product on the page, ranked in the same query
+            ranked_sessions = db.session.query(
+                QCSession.id,
+                QCSession.product_id,
+                QCSession.performed_at,
+                QCSession.inspector_id,
+                func.row_number().over(
+                    partition_by=QCSession.product_id,
+                    order_by=(QCSession.performed_at.desc(), QCSession.id.desc())
+                ).label("row_number")
+            ).filter(
+                QCSession.product_id.in_(db.session.query(page.c.id))
+            ).subquery()
+            query = db.session.query(
+                *columns,
+                ranked_sessions.c.id.label("qc_id"),
+                ranked_sessions.c.performed_at.label("qc_performed_at"),
+                ranked_sessions.c.inspector_id
+            ).outerjoin(
+                ranked_sessions,
+                (ranked_sessions.c.product_id == page.c.id) & (ranked_sessions.c.row_number == 1)
+            )
+        rows = query.order_by(page.c.created_at.desc(), page.c.id.desc()).all()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
         product_list = []
-        for product in products:
-            # Get the most recent QC session for this product if any
-            qc_session = db.session.query(QCSession).filter(
-                QCSession.product_id == product.id
-            ).order_by(QCSession.performed_at.desc()).first()
-            
+        for row in rows:
             # Format product data
             product_data = {
-                "id": product.id,
-                "product_number": product.product_number,
-                "status": product.status,
-                "created_at": product.created_at.strftime("%Y-%m-%d"),
-                "warehouse_id": product.warehouse_id,
-                "qc_id": qc_session.id if qc_session else None,
-                "qc_date": qc_session.performed_at.strftime("%Y-%m-%d") if qc_session else None,
-                "inspector_id": qc_session.inspector_id if qc_session else None,
+                "id": row.id,
+                "product_number": row.product_number,
+                "status": row.status,
+                "created_at": row.created_at.strftime("%Y-%m-%d"),
+                "warehouse_id": row.warehouse_id
             }
+            if PRODUCT_QC_FIELDS.intersection(fields):
+                product_data["qc_id"] = row.qc_id
+                product_data["qc_date"] = row.qc_performed_at.strftime("%Y-%m-%d") if row.qc_performed_at else None
+                product_data["inspector_id"] = row.inspector_id
             
-            product_list.append(product_data)
+            product_list.append({field: product_data[field] for field in fields})
         
-        return jsonify(product_list)
+        response = jsonify(product_list)
+        if has_more:
+            response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+        return response
     except Exception as e:
         # Log the error details
         logger.error(f"Products data error: {str(e)}")
@@ -708,23 +1179,78 @@ def get_product(product_id):
 # QC sessions route - public for development purposes
 @app.route("/api/qc/sessions", methods=["GET"])
 def get_qc_sessions():
-    """Get all QC sessions data."""
+    """
+    Get QC sessions, most recent first, one keyset page at a time.
+    
+    Query parameters: limit, cursor (from the X-Next-Cursor header of the previous page),
+    inspector_id, inspector (username search), product_id, date_from and date_to (ISO dates, inclusive).
+    """
     try:
-        qc_sessions = db.session.query(QCSession).join(
-            Product, QCSession.product_id == Product.id
+        try:
+            cursor = request.args.get("cursor")
+            cursor_values = decode_cursor(cursor, datetime, int) if cursor else None
+            date_from, date_to = parse_date_range(request.args)
+        except (ValueError, InvalidCursor) as e:
+            return jsonify({"error": str(e)}), 400
+        
+        limit = get_page_size(request.args)
+        
+        # Select one page of session ids using the (performed_at, id) keyset
+        page_query = db.session.query(QCSession.id)
+        if request.args.get("inspector_id", type=int):
+            page_query = page_query.filter(QCSession.inspector_id == request.args.get("inspector_id", type=int))
+        if request.args.get("inspector"):
+            page_query = page_query.join(User, QCSession.inspector_id == User.id).filter(
+                User.username.ilike(contains_pattern(request.args.get("inspector")), escape="\\")
+            )
+        if request.args.get("product_id", type=int):
+            page_query = page_query.filter(QCSession.product_id == request.args.get("product_id", type=int))
+        if date_from:
+            page_query = page_query.filter(QCSession.performed_at >= date_from)
+        if date_to:
+            page_query = page_query.filter(QCSession.performed_at < date_to)
+        page_query = apply_keyset(page_query, [QCSession.performed_at, QCSession.id], cursor_values)
+        
+        # Offset paging is kept for older clients that send skip instead of a cursor
+        skip = request.args.get("skip", 0, type=int)
+        if skip and cursor_values is None:
+            page_query = page_query.offset(skip)
+        
+        # Fetch one extra row to know whether another page exists
+        page = page_query.limit(limit + 1).cte("qc_session_page")
+        
+        # Attribute counts of the sessions on the page only
+        attribute_counts = db.session.query(
+            QCAttributeValue.qc_id,
+            func.count().label("attribute_count")
+        ).filter(
+            QCAttributeValue.qc_id.in_(db.session.query(page.c.id))
+        ).group_by(QCAttributeValue.qc_id).subquery()
+        
+        # Sessions, products, inspectors and counts in a single query
+        rows = db.session.query(
+            QCSession,
+            func.coalesce(attribute_counts.c.attribute_count, 0)
         ).join(
-            User, QCSession.inspector_id == User.id
+            page, page.c.id == QCSession.id
+        ).join(
+            QCSession.product
+        ).outerjoin(
+            QCSession.inspector_user
+        ).outerjoin(
+            attribute_counts, attribute_counts.c.qc_id == QCSession.id
+        ).options(
+            contains_eager(QCSession.product),
+            contains_eager(QCSession.inspector_user)
         ).order_by(
-            QCSession.performed_at.desc()
+            QCSession.performed_at.desc(), QCSession.id.desc()
         ).all()
         
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
         sessions_list = []
-        for session in qc_sessions:
-            # Get attribute values
-            attribute_values = db.session.query(QCAttributeValue).filter(
-                QCAttributeValue.qc_id == session.id
-            ).all()
-            
+        for session, attribute_count in rows:
             # Format session data
             session_data = {
                 "id": session.id,
@@ -734,12 +1260,16 @@ def get_qc_sessions():
                 "inspector_name": session.inspector_user.username if session.inspector_user else "Unknown",
                 "performed_at": session.performed_at.strftime("%Y-%m-%d %H:%M"),
                 "status": session.product.status,
-                "attribute_count": len(attribute_values)
+                "attribute_count": attribute_count
             }
             
             sessions_list.append(session_data)
         
-        return jsonify(sessions_list)
+        response = jsonify(sessions_list)
+        if has_more:
+            last_session = rows[-1][0]
+            response.headers["X-Next-Cursor"] = encode_cursor(last_session.performed_at, last_session.id)
+        return response
     except Exception as e:
         # Log the error details
         logger.error(f"QC sessions data error: {str(e)}")
@@ -787,6 +1317,135 @@ def get_inventory_snapshots():
             "error": "An error occurred while retrieving inventory snapshots data"
         }), 500
 
+def inventory_target(data):
+    """
+    Read and check the part subtype, warehouse and quantity of an inventory write.
+    
+    Returns:
+        tuple: (part_subtype_id, warehouse_id, quantity, error response or None)
+    """
+    ids = []
+    for field, model in (("part_subtype_id", PartSubtype), ("warehouse_id", Warehouse)):
+        value = data.get(field)
+        if isinstance(value, bool) or not isinstance(value, int):
+            return None, None, None, (jsonify({"error": f"{field} must be an integer"}), 400)
+        if db.session.get(model, value) is None:
+            return None, None, None, (jsonify({"error": f"{field} {value} not found"}), 404)
+        ids.append(value)
+    quantity = data.get("quantity")
+    if isinstance(quantity, bool) or not isinstance(quantity, int):
+        return None, None, None, (jsonify({"error": "quantity must be an integer"}), 400)
+    return ids[0], ids[1], quantity, None
+
+
+def format_current_inventory(row):
+    """Format a current_inventory row."""
+    return {
+        "part_subtype_id": row.part_subtype_id,
+        "warehouse_id": row.warehouse_id,
+        "quantity": row.quantity,
+        "snapshot_id": row.snapshot_id,
+        "snapshot_date": row.snapshot_date.isoformat() if row.snapshot_date else None,
+        "as_of": row.as_of.isoformat()
+    }
+
+
+@app.route("/api/inventory/inventory-snapshots", methods=["POST"])
+@token_required
+def create_inventory_snapshot():
+    """
+    Record a stock count of a part subtype in a warehouse.
+    Body: part_subtype_id, warehouse_id, quantity and snapshot_date (ISO date, today in INVENTORY_TZ by default).
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        part_subtype_id, warehouse_id, quantity, error = inventory_target(data)
+        if error:
+            return error
+        if quantity < 0:
+            return jsonify({"error": "quantity must not be negative"}), 400
+        try:
+            snapshot_date = datetime.strptime(data["snapshot_date"], "%Y-%m-%d").date() if data.get("snapshot_date") else inventory_today()
+        except (TypeError, ValueError):
+            return jsonify({"error": "snapshot_date must be an ISO date (YYYY-MM-DD)"}), 400
+        
+        snapshot = record_snapshot(db.session, part_subtype_id, warehouse_id, quantity, snapshot_date)
+        db.session.commit()
+        
+        current = db.session.get(CurrentInventory, (part_subtype_id, warehouse_id))
+        return jsonify({
+            "id": snapshot.id,
+            "part_subtype_id": snapshot.part_subtype_id,
+            "warehouse_id": snapshot.warehouse_id,
+            "quantity": snapshot.quantity,
+            "snapshot_date": snapshot.snapshot_date.isoformat(),
+            "current_inventory": format_current_inventory(current)
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error recording inventory snapshot: {str(e)}")
+        return jsonify({"error": "An error occurred while recording the inventory snapshot"}), 500
+
+@app.route("/api/inventory/current", methods=["GET"])
+def get_current_inventory():
+    """Get current stock per part subtype and warehouse, optionally filtered by part_subtype_id or warehouse_id."""
+    try:
+        query = db.session.query(CurrentInventory)
+        if request.args.get("part_subtype_id", type=int):
+            query = query.filter(CurrentInventory.part_subtype_id == request.args.get("part_subtype_id", type=int))
+        if request.args.get("warehouse_id", type=int):
+            query = query.filter(CurrentInventory.warehouse_id == request.args.get("warehouse_id", type=int))
+        rows = query.order_by(CurrentInventory.part_subtype_id, CurrentInventory.warehouse_id).all()
+        return jsonify([format_current_inventory(row) for row in rows])
+    except Exception as e:
+        logger.error(f"Current inventory data error: {str(e)}")
+        return jsonify({"error": "An error occurred while retrieving current inventory"}), 500
+
+@app.route("/api/inventory/current/<int:part_subtype_id>/<int:warehouse_id>", methods=["GET"])
+def get_current_inventory_item(part_subtype_id, warehouse_id):
+    """Get the current stock of one part subtype in one warehouse."""
+    try:
+        row = db.session.get(CurrentInventory, (part_subtype_id, warehouse_id))
+        if row is None:
+            return jsonify({"error": "No inventory recorded for this part subtype and warehouse"}), 404
+        return jsonify(format_current_inventory(row))
+    except Exception as e:
+        logger.error(f"Current inventory data error: {str(e)}")
+        return jsonify({"error": "An error occurred while retrieving current inventory"}), 500
+
+@app.route("/api/inventory/trends", methods=["GET"])
+def get_inventory_trends():
+    """
+    Get inventory trends from the precomputed rollups.
+    
+    Query parameters: bucket (day, week or month; default day), group_by
+    (part_type, part_subtype or warehouse; default part_type), date_from and
+    date_to (ISO dates, inclusive), part_type_id, part_subtype_id and warehouse_id.
+    """
+    try:
+        bucket = request.args.get("bucket", "day")
+        group_by = request.args.get("group_by", "part_type")
+        if bucket not in BUCKETS:
+            return jsonify({"error": f"bucket must be one of {', '.join(BUCKETS)}"}), 400
+        if group_by not in GROUP_BY:
+            return jsonify({"error": f"group_by must be one of {', '.join(GROUP_BY)}"}), 400
+        try:
+            date_from, date_to = parse_date_range(request.args)
+            series = load_trends(
+                db.session, bucket, group_by,
+                start=date_from.date() if date_from else None,
+                end=date_to.date() if date_to else None,
+                part_type_id=request.args.get("part_type_id", type=int),
+                part_subtype_id=request.args.get("part_subtype_id", type=int),
+                warehouse_id=request.args.get("warehouse_id", type=int)
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"bucket": bucket, "group_by": group_by, "series": series})
+    except Exception as e:
+        logger.error(f"Inventory trends data error: {str(e)}")
+        return jsonify({"error": "An error occurred while retrieving inventory trends"}), 500
+
 # Warehouses route - public for development purposes
 @app.route("/api/inventory/warehouses", methods=["GET"])
 def get_warehouses():
@@ -863,28 +1522,53 @@ def get_part_subtypes():
 def get_qc_session(session_id):
     """Get a specific QC session by ID."""
     try:
-        session = db.session.get(QCSession, session_id)
+        session = db.session.query(QCSession).options(
+            joinedload(QCSession.product),
+            joinedload(QCSession.inspector_user)
+        ).filter(QCSession.id == session_id).first()
         
         if not session:
             return jsonify({"error": "QC session not found"}), 404
         
-        product = db.session.get(Product, session.product_id)
-        inspector = db.session.get(User, session.inspector_id)
-        
-        # Get attribute values
-        attribute_values = db.session.query(QCAttributeValue).filter(
+        product = session.product
+        inspector = session.inspector_user
+        
+        # Get attribute values with their lookups in one query; definitions come from the cache
+        attribute_values = db.session.query(
+            QCAttributeValue.attribute_id,
+            QCAttributeValue.value_numeric,
+            QCAttributeValue.value_text,
+            QCAttributeValue.lookup_id,
+            QCAttributeValue.photo_url,
+            Lookup.code.label("lookup_code"),
+            Lookup.label.label("lookup_label"),
+            LookupType.name.label("lookup_type")
+        ).outerjoin(
+            Lookup, QCAttributeValue.lookup_id == Lookup.id
+        ).outerjoin(
+            LookupType, Lookup.lookup_type_id == LookupType.id
+        ).filter(
             QCAttributeValue.qc_id == session.id
-        ).all()
+        ).order_by(QCAttributeValue.attribute_id).all()
         
         attributes_list = []
         for attr_value in attribute_values:
-            attribute_def = db.session.get(QCAttributeDef, attr_value.attribute_id)
+            attribute_def = attribute_cache.get(db.session, attr_value.attribute_id)
             
             attribute_data = {
                 "attribute_id": attr_value.attribute_id,
                 "attribute_name": attribute_def.name if attribute_def else "Unknown",
+                "data_type": attribute_def.data_type if attribute_def else None,
                 "value_numeric": float(attr_value.value_numeric) if attr_value.value_numeric is not None else None,
-                "value_text": attr_value.value_text
+                "value_text": attr_value.value_text,
+                "lookup_id": attr_value.lookup_id,
+                "lookup": {
+                    "id": attr_value.lookup_id,
+                    "code": attr_value.lookup_code,
+                    "label": attr_value.lookup_label,
+                    "lookup_type": attr_value.lookup_type
+                } if attr_value.lookup_id else None,
+                "photo_url": attr_value.photo_url
             }
             attributes_list.append(attribute_data)
         
@@ -975,43 +1659,115 @@ def create_qc_session():
             "error": "An error occurred while creating QC session"
         }), 500
 
+# Bulk QC session ingestion route - public for development purposes
+@app.route("/api/qc/sessions/bulk", methods=["POST"])
+def bulk_create_qc_sessions():
+    """
+    Create many QC sessions in one transaction.
+    
+    The body is a JSON array of sessions (or {"sessions": [...]}), or NDJSON with
+    one session per line. Each session has product_id, inspector_id, performed_at,
+    an optional client ref echoed in the results, and attribute_values.
+    Invalid sessions are reported per item; with ?atomic=true nothing is inserted
+    when any session is invalid.
+    """
+    try:
+        items = read_items(request, app.config["QC_BULK_MAX_ITEMS"])
+        atomic = request.args.get("atomic", "false").lower() == "true"
+        results = ingest_sessions(db.session, items, atomic)
+    except IngestError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Bulk QC session ingestion error: {str(e)}")
+        return jsonify({
+            "error": "An error occurred while creating QC sessions"
+        }), 500
+    
+    created = sum(1 for result in results if "id" in result)
+    failed = sum(1 for result in results if "errors" in result)
+    if failed == 0:
+        status_code = 201
+    elif created:
+        status_code = 207
+    else:
+        status_code = 400
+    return jsonify({"created": created, "failed": failed, "results": results}), status_code
+
 # Part shipments route - public for development purposes
 @app.route("/api/inventory/part-shipments", methods=["GET"])
 def get_part_shipments():
-    """Get all part shipments data."""
+    """
+    Get part shipments, most recently received first, one keyset page at a time.
+    
+    Query parameters: limit (default 10), cursor (from the X-Next-Cursor header of the previous page),
+    vendor, warehouse_id, part_subtype_id, date_from and date_to (ISO dates, inclusive).
+    """
     try:
-        # Get limit parameter from query string, default to 10
-        limit = request.args.get('limit', 10, type=int)
+        try:
+            cursor = request.args.get("cursor")
+            cursor_values = decode_cursor(cursor, datetime, int) if cursor else None
+            date_from, date_to = parse_date_range(request.args)
+        except (ValueError, InvalidCursor) as e:
+            return jsonify({"error": str(e)}), 400
         
-        shipments = db.session.query(
+        limit = get_page_size(request.args, default=10)
+        
+        query = db.session.query(
             PartShipment,
-            PartSubtype,
-            Warehouse
+            PartSubtype.name,
+            Warehouse.name
         ).join(
             PartSubtype, PartShipment.part_subtype_id == PartSubtype.id
         ).join(
             Warehouse, PartShipment.warehouse_id == Warehouse.id
-        ).order_by(
-            PartShipment.received_at.desc()
-        ).limit(limit).all()
+        )
+        if request.args.get("vendor"):
+            query = query.filter(PartShipment.vendor == request.args.get("vendor"))
+        if request.args.get("warehouse_id", type=int):
+            query = query.filter(PartShipment.warehouse_id == request.args.get("warehouse_id", type=int))
+        if request.args.get("part_subtype_id", type=int):
+            query = query.filter(PartShipment.part_subtype_id == request.args.get("part_subtype_id", type=int))
+        # Dates and naive datetimes are inventory zone days and wall times
+        if date_from:
+            query = query.filter(PartShipment.received_at >= to_utc(date_from))
+        if date_to:
+            query = query.filter(PartShipment.received_at < to_utc(date_to))
+        
+        # Walks one of the (..., received_at, id) indexes, so every page costs the same
+        query = apply_keyset(query, [PartShipment.received_at, PartShipment.id], cursor_values)
+        
+        # Offset paging is kept for older clients that send skip instead of a cursor
+        skip = request.args.get("skip", 0, type=int)
+        if skip and cursor_values is None:
+            query = query.offset(skip)
+        
+        # Fetch one extra row to know whether another page exists
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
         shipments_list = []
-        for shipment, part_subtype, warehouse in shipments:
+        for shipment, part_name, warehouse_name in rows:
             # Format shipment data
             shipment_data = {
                 "shipment_id": shipment.id,
                 "part_subtype_id": shipment.part_subtype_id,
-                "part_name": part_subtype.name,
+                "part_name": part_name,
                 "warehouse_id": shipment.warehouse_id,
-                "warehouse_name": warehouse.name,
+                "warehouse_name": warehouse_name,
                 "quantity": shipment.quantity,
-                "received_at": shipment.received_at.strftime("%Y-%m-%d"),
+                "received_at": local_date(shipment.received_at).isoformat(),
                 "vendor": shipment.vendor
             }
             
             shipments_list.append(shipment_data)
         
-        return jsonify(shipments_list)
+        response = jsonify(shipments_list)
+        if has_more:
+            last_shipment = rows[-1][0]
+            response.headers["X-Next-Cursor"] = encode_cursor(last_shipment.received_at, last_shipment.id)
+        return response
     except Exception as e:
         # Log the error details
         logger.error(f"Part shipments data error: {str(e)}")
@@ -1019,6 +1775,45 @@ def get_part_shipments():
             "error": "An error occurred while retrieving part shipments data"
         }), 500
 
+@app.route("/api/inventory/part-shipments", methods=["POST"])
+@token_required
+def create_part_shipment():
+    """
+    Record a received part shipment.
+    Body: part_subtype_id, warehouse_id, quantity, received_at (ISO datetime, now by default; without an offset it is INVENTORY_TZ wall time) and vendor.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        part_subtype_id, warehouse_id, quantity, error = inventory_target(data)
+        if error:
+            return error
+        if quantity <= 0:
+            return jsonify({"error": "quantity must be positive"}), 400
+        try:
+            received_at = datetime.fromisoformat(data["received_at"]) if data.get("received_at") else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "received_at must be an ISO datetime"}), 400
+        
+        shipment = record_shipment(
+            db.session, part_subtype_id, warehouse_id, quantity, received_at, data.get("vendor")
+        )
+        db.session.commit()
+        
+        current = db.session.get(CurrentInventory, (part_subtype_id, warehouse_id))
+        return jsonify({
+            "shipment_id": shipment.id,
+            "part_subtype_id": shipment.part_subtype_id,
+            "warehouse_id": shipment.warehouse_id,
+            "quantity": shipment.quantity,
+            "received_at": as_utc(shipment.received_at).isoformat(),
+            "vendor": shipment.vendor,
+            "current_inventory": format_current_inventory(current)
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error recording part shipment: {str(e)}")
+        return jsonify({"error": "An error occurred while recording the part shipment"}), 500
+
 # Home page API endpoint
 @app.route("/api/home", methods=["GET"])
 def get_home_data():
@@ -1070,9 +1865,21 @@ def get_home_data():
 @app.route("/api/qc-reports", methods=["GET"])
 @token_required
 def get_qc_reports():
-    """Get all QC reports."""
+    """
+    Get all QC reports.
+    Optional filters: strs_batch and catalyst_batch match the "Batch #",
+    primer_lot the primer C "Lot #".
+    """
     try:
-        qc_reports = QCReport.query.all()
+        query = QCReport.query.options(undefer(QCReport.image_count))
+        for param, column, key in (
+            ("strs_batch", QCReport.strs_batch, "Batch #"),
+            ("catalyst_batch", QCReport.catalyst_batch, "Batch #"),
+            ("primer_lot", QCReport.primer_c, "Lot #"),
+        ):
+            if request.args.get(param):
+                query = query.filter(json_contains(column, {key: request.args[param]}))
+        qc_reports = query.all()
         result = []
         for report in qc_reports:
             # Get batch items with their individual panels_glazed, date_glazed, and time_glazed fields
@@ -1097,7 +1904,7 @@ def get_qc_reports():
                 "panels_glazed": first_panel,  # Show the first item's panels_glazed or fall back to report-level field
                 "date_glazed": report.date_glazed.isoformat() if report.date_glazed else None,
                 "time_glazed": report.time_glazed.isoformat() if report.time_glazed else None,
-                "has_images": len(report.images) > 0,
+                "has_images": report.image_count > 0,
                 "created_at": report.created_at.isoformat() if report.created_at else None,
                 "updated_at": report.updated_at.isoformat() if report.updated_at else None,
                 "created_by": {
@@ -1126,7 +1933,10 @@ def get_qc_report(report_id):
         for image in report.images:
             images.append({
                 "id": image.id,
-                "image_data": image.get_image_as_base64()
+                "url": image_url(f"/api/qc-reports/images/{image.id}", image.image_key),
+                "thumbnail_url": image_url(f"/api/qc-reports/images/{image.id}", image.image_key, "thumb"),
+                "medium_url": image_url(f"/api/qc-reports/images/{image.id}", image.image_key, "medium"),
+                "size": image.image_size
             })
         
         # Get batch items
@@ -1164,14 +1974,34 @@ def get_qc_report(report_id):
         logger.error(f"Error retrieving QC report: {str(e)}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route("/api/qc-reports/images/<int:image_id>", methods=["GET"])
+@image_access_required
+def get_qc_report_image(image_id):
+    """Stream a QC report image."""
+    try:
+        image = ReportImage.query.get(image_id)
+        if not image:
+            return jsonify({"error": "Image not found"}), 404
+        
+        return image_response(image.image_key, None if image.image_key else image.image_data, private=True)
+    except Exception as e:
+        logger.error(f"Error retrieving QC report image: {str(e)}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @app.route("/api/qc-reports", methods=["POST"])
 @token_required
 def create_qc_report():
-    """Create a new QC report."""
+    """
+    Create a new QC report.
+    
+    Accepts JSON, or multipart/form-data with the JSON in a "data" field and
+    image files in "images" parts.
+    """
     try:
-        data = request.json
-        logger.info(f"Received QC report data: {data}")
+        data, files = parse_upload_request()
+        logger.info(f"Received QC report {data.get('report_id')} with {len(data.get('images') or []) + len(files.getlist('images'))} images")
         current_user_id = g.user.id
+        max_file_size = get_max_file_size(app.config)
         
         # Create a new QC report
         report = QCReport(
@@ -1216,11 +2046,11 @@ def create_qc_report():
         db.session.add(report)
         db.session.flush()  # Get ID for the report before committing
         
-        # Handle report images if any
-        if data.get("images"):
-            for image_data in data.get("images"):
+        # Handle report images if any (base64 strings, upload references or file parts)
+        for image_data in (data.get("images") or []) + files.getlist("images"):
+            if image_data:
                 image = ReportImage(report_id=report.id)
-                image.set_image_from_base64(image_data)
+                image.set_image_blob(*store_image(image_data, current_user_id, max_file_size))
                 db.session.add(image)
         
         db.session.commit()
@@ -1233,6 +2063,9 @@ def create_qc_report():
                 "report_id": report.report_id
             }
         }), 201
+    except UploadError as e:
+        db.session.rollback()
+        return jsonify({"status": "error", "message": str(e)}), e.status_code
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error creating QC report: {str(e)}")
@@ -1241,10 +2074,15 @@ def create_qc_report():
 @app.route("/api/qc-reports/<int:report_id>", methods=["PUT"])
 @token_required
 def update_qc_report(report_id):
-    """Update an existing QC report."""
+    """
+    Update an existing QC report.
+    
+    Accepts JSON, or multipart/form-data with the JSON in a "data" field and
+    image files in "new_images" parts.
+    """
     try:
-        data = request.json
-        logger.info(f"Updating QC report {report_id} with data: {data}")
+        data, files = parse_upload_request()
+        logger.info(f"Updating QC report {report_id} fields: {', '.join(data.keys())}")
         report = QCReport.query.get(report_id)
         
         if not report:
@@ -1295,10 +2133,10 @@ def update_qc_report(report_id):
             report.set_batch_items(data["batch_items"])
         
         # Handle image updates if provided
-        if "new_images" in data and data["new_images"]:
-            for image_data in data["new_images"]:
+        for image_data in (data.get("new_images") or []) + files.getlist("new_images"):
+            if image_data:
                 image = ReportImage(report_id=report.id)
-                image.set_image_from_base64(image_data)
+                image.set_image_blob(*store_image(image_data, g.user.id, get_max_file_size(app.config)))
                 db.session.add(image)
         
         # Handle image deletions if provided
@@ -1318,6 +2156,9 @@ def update_qc_report(report_id):
                 "report_id": report.report_id
             }
         }), 200
+    except UploadError as e:
+        db.session.rollback()
+        return jsonify({"status": "error", "message": str(e)}), e.status_code
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating QC report: {str(e)}")
@@ -1361,7 +2202,7 @@ def get_product_parts():
                 "product_part_vendor": part.product_part_vendor,
                 "product_part_type": part.product_part_type,
                 "created_at": part.created_at.isoformat() if part.created_at else None,
-                "has_image": part.product_part_image is not None,
+                "has_image": part.has_image,
                 "colors": [
                     {
                         "id": color.coating_color.id,
@@ -1384,9 +2225,6 @@ def get_product_part(part_id):
         if not part:
             return jsonify({"error": "Product part not found"}), 404
         
-        # Convert image to base64 for transfer if available
-        image_base64 = part.get_image_as_base64()
-        
         part_data = {
             "id": part.id,
             "product_part_id": part.product_part_id,
@@ -1394,7 +2232,7 @@ def get_product_part(part_id):
             "product_part_vendor": part.product_part_vendor,
             "product_part_type": part.product_part_type,
             "created_at": part.created_at.isoformat() if part.created_at else None,
-            "image_data": image_base64,
+            "image_url": image_url(f"/api/product-parts/{part.id}/image", part.product_part_image_key) if part.has_image else None,
             "colors": [
                 {
                     "id": color.coating_color.id,
@@ -1412,13 +2250,11 @@ def get_product_part_image(part_id):
     """Get product part image as binary data."""
     try:
         part = ProductPart.query.get(part_id)
-        if not part or not part.product_part_image:
+        if not part:
             return jsonify({"error": "Image not found"}), 404
         
-        # Return the image directly with appropriate content type
-        response = make_response(part.product_part_image)
-        response.headers.set('Content-Type', 'image/png')  # Adjust content type if needed
-        return response
+        key = part.product_part_image_key
+        return image_response(key, None if key else part.product_part_image)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1586,7 +2422,7 @@ def get_qc_cw_panel_data():
                 "ipa_cleaned": panel.ipa_cleaned,
                 "sealant_frame_enough": panel.sealant_frame_enough,
                 "created_at": panel.created_at.isoformat() if panel.created_at else None,
-                "has_profile_photo": panel.profile_photo is not None
+                "has_profile_photo": panel.has_profile_photo
             }
             result.append(panel_data)
         
@@ -1596,6 +2432,123 @@ def get_qc_cw_panel_data():
         return jsonify({"error": str(e)}), 500
 
 
+def format_panel_detail(panel):
+    """Format a QC CW panel with its JSON fields, frame cavity values and photos."""
+    panel_data = {
+        "id": panel.id,
+        "fl_id": panel.fl_id,
+        "pan_id": panel.pan_id,
+        "pan_name": panel.pan_name,
+        "ipa_cleaned": panel.ipa_cleaned,
+        "sealant_frame_enough": panel.sealant_frame_enough,
+        "cavities_invert": panel.cavities_invert,
+        "qc_infill_affix": panel.qc_infill_affix,
+        "structural_sealant_records": panel.structural_sealant_records,
+        "lmr": panel.lmr,
+        "edge_bead_attached": panel.edge_bead_attached,
+        "operable": panel.operable,
+        "card_checked": panel.card_checked,
+        "paint_damage": panel.paint_damage,
+        "glass_scratched": panel.glass_scratched,
+        "cleaned_ready": panel.cleaned_ready,
+        "crated": panel.crated,
+        "created_at": panel.created_at.isoformat() if panel.created_at else None,
+        "updated_at": panel.updated_at.isoformat() if panel.updated_at else None,
+        "profile_photo_url": image_url(
+            f"/api/qc-cw-panel-data/{panel.id}/profile-photo", panel.profile_photo_key
+        ) if panel.has_profile_photo else None,
+        "profile_photo_medium_url": image_url(
+            f"/api/qc-cw-panel-data/{panel.id}/profile-photo", panel.profile_photo_key, "medium"
+        ) if panel.has_profile_photo else None
+    }
+    
+    # Add all JSON fields after parsing
+    for field in PANEL_JSON_FIELDS:
+        panel_data[field] = panel.get_json_field(field)
+    
+    # Get frame cavities values
+    frame_cavities_values = []
+    for value in panel.frame_cavities_values:
+        frame_cavities_values.append({
+            "id": value.id,
+            "attribute_id": value.attribute_id,
+            "attribute_name": value.attribute.attribute_name,
+            "attribute_type": value.attribute.get_attribute_type(),
+            "value": value.value
+        })
+    panel_data["frame_cavities_values"] = frame_cavities_values
+    
+    # Get additional photos
+    additional_photos = []
+    for photo in panel.panel_photos:
+        additional_photos.append({
+            "id": photo.id,
+            "photo_type": photo.photo_type,
+            "url": image_url(f"/api/qc-cw-panel-data/images/{photo.id}", photo.photo_key),
+            "thumbnail_url": image_url(f"/api/qc-cw-panel-data/images/{photo.id}", photo.photo_key, "thumb"),
+            "medium_url": image_url(f"/api/qc-cw-panel-data/images/{photo.id}", photo.photo_key, "medium"),
+            "size": photo.photo_size,
+            "created_at": photo.created_at.isoformat() if photo.created_at else None
+        })
+    panel_data["additional_photos"] = additional_photos
+    return panel_data
+
+
+@app.route("/api/qc-cw-panel-data/measurement-deviations", methods=["GET"])
+@token_required
+def get_panel_measurement_deviations():
+    """
+    List panel measurements that deviate from their reference by more than a tolerance.
+    
+    Query arguments: tolerance (mm, required), kind (comma separated dimension
+    fields, default all), fl_id, source (default factory_floor), reference
+    (default GZ_office), limit and cursor. The cursor for the next page is
+    returned in the X-Next-Cursor header.
+    """
+    try:
+        tolerance = request.args.get("tolerance", type=float)
+        if tolerance is None or tolerance < 0:
+            return jsonify({"error": "tolerance must be a non-negative number"}), 400
+        kinds = [kind.strip() for kind in request.args.get("kind", "").split(",") if kind.strip()]
+        unknown = [kind for kind in kinds if kind not in MEASUREMENT_FIELDS]
+        if unknown:
+            return jsonify({"error": f"Unknown measurement: {', '.join(unknown)}"}), 400
+        
+        limit = get_page_size(request.args)
+        cursor = request.args.get("cursor")
+        cursor_values = decode_cursor(cursor, int, str) if cursor else None
+        
+        query = deviation_query(
+            db.session, tolerance, kinds,
+            fl_id=request.args.get("fl_id"),
+            source=request.args.get("source", MEASURED_SOURCE),
+            reference=request.args.get("reference", REFERENCE_SOURCE)
+        )
+        query = apply_keyset(query, [PanelMeasurement.panel_id, PanelMeasurement.kind], cursor_values, descending=False)
+        rows = query.limit(limit + 1).all()
+        
+        result = [{
+            "panel_id": row.panel_id,
+            "fl_id": row.fl_id,
+            "pan_id": row.pan_id,
+            "pan_name": row.pan_name,
+            "kind": row.kind,
+            "reference_value": float(row.reference_value),
+            "measured_value": float(row.measured_value),
+            "deviation": float(row.deviation)
+        } for row in rows[:limit]]
+        
+        response = jsonify(result)
+        if len(rows) > limit:
+            response.headers["X-Next-Cursor"] = encode_cursor(rows[limit - 1].panel_id, rows[limit - 1].kind)
+        return response, 200
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error retrieving panel measurement deviations: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/api/qc-cw-panel-data/<int:panel_id>", methods=["GET"])
 @token_required
 def get_qc_cw_panel_data_by_id(panel_id):
@@ -1605,74 +2558,58 @@ def get_qc_cw_panel_data_by_id(panel_id):
         if not panel:
             return jsonify({"error": "Panel not found"}), 404
         
-        # Convert JSON fields
-        json_fields = [
-            'width_l', 'width_r', 'height_1', 'height_2', 'height_3', 'height_4',
-            'cavity_ro_height_total', 'cavity_diag_cw_pan_l', 'cavity_diag_cw_pan_r',
-            'left', 'middle', 'right', 'head', 'sill',
-            'trans_1', 'trans_2', 'trans_3',
-            'bracket_l', 'bracket_r',
-            'infill_fs_location',
-            'infills_1_type', 'infills_2_type', 'infills_3_type', 'infills_4_type',
-            'infills_right_1_type', 'infills_right_2_type', 'infills_right_3_type', 'infills_right_4_type',
-            'infills_1_color', 'infills_2_color', 'infills_3_color', 'infills_4_color',
-            'infills_right_1_color', 'infills_right_2_color', 'infills_right_3_color', 'infills_right_4_color',
-            'type_gz_factory'
-        ]
-        
-        panel_data = {
-            "id": panel.id,
-            "fl_id": panel.fl_id,
-            "pan_id": panel.pan_id,
-            "pan_name": panel.pan_name,
-            "ipa_cleaned": panel.ipa_cleaned,
-            "sealant_frame_enough": panel.sealant_frame_enough,
-            "cavities_invert": panel.cavities_invert,
-            "qc_infill_affix": panel.qc_infill_affix,
-            "structural_sealant_records": panel.structural_sealant_records,
-            "lmr": panel.lmr,
-            "edge_bead_attached": panel.edge_bead_attached,
-            "operable": panel.operable,
-            "card_checked": panel.card_checked,
-            "paint_damage": panel.paint_damage,
-            "glass_scratched": panel.glass_scratched,
-            "cleaned_ready": panel.cleaned_ready,
-            "crated": panel.crated,
-            "created_at": panel.created_at.isoformat() if panel.created_at else None,
-            "updated_at": panel.updated_at.isoformat() if panel.updated_at else None,
-            "profile_photo": panel.get_profile_photo_as_base64()
-        }
+        return jsonify(format_panel_detail(panel)), 200
+    except Exception as e:
+        logger.error(f"Error retrieving QC CW Panel Data: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/qc-cw-panel-data/fl/<string:fl_id>/<string:pan_id>", methods=["GET"])
+@token_required
+def get_qc_cw_panel_data_by_key(fl_id, pan_id):
+    """Get a specific QC CW Panel Data by floor and panel ID."""
+    try:
+        panel = QCCWPanelData.query.filter(
+            QCCWPanelData.fl_id == fl_id,
+            QCCWPanelData.pan_id == pan_id
+        ).first()
+        if not panel:
+            return jsonify({"error": "Panel not found"}), 404
         
-        # Add all JSON fields after parsing
-        for field in json_fields:
-            panel_data[field] = panel.get_json_field(field)
+        return jsonify(format_panel_detail(panel)), 200
+    except Exception as e:
+        logger.error(f"Error retrieving QC CW Panel Data by fl_id and pan_id: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/qc-cw-panel-data/<int:panel_id>/profile-photo", methods=["GET"])
+@image_access_required
+def get_qc_cw_panel_profile_photo(panel_id):
+    """Stream the profile photo of a QC CW panel."""
+    try:
+        panel = QCCWPanelData.query.get(panel_id)
+        if not panel:
+            return jsonify({"error": "Image not found"}), 404
         
-        # Get frame cavities values
-        frame_cavities_values = []
-        for value in panel.frame_cavities_values:
-            frame_cavities_values.append({
-                "id": value.id,
-                "attribute_id": value.attribute_id,
-                "attribute_name": value.attribute.attribute_name,
-                "attribute_type": value.attribute.get_attribute_type(),
-                "value": value.value
-            })
-        panel_data["frame_cavities_values"] = frame_cavities_values
-        
-        # Get additional photos
-        additional_photos = []
-        for photo in panel.panel_photos:
-            additional_photos.append({
-                "id": photo.id,
-                "photo_type": photo.photo_type,
-                "photo": photo.get_photo_as_base64(),
-                "created_at": photo.created_at.isoformat() if photo.created_at else None
-            })
-        panel_data["additional_photos"] = additional_photos
+        key = panel.profile_photo_key
+        return image_response(key, None if key else panel.profile_photo, private=True)
+    except Exception as e:
+        logger.error(f"Error retrieving QC CW panel profile photo: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/qc-cw-panel-data/images/<int:photo_id>", methods=["GET"])
+@image_access_required
+def get_qc_cw_panel_photo(photo_id):
+    """Stream an additional QC CW panel photo."""
+    try:
+        photo = QCCWPanelPhoto.query.get(photo_id)
+        if not photo:
+            return jsonify({"error": "Image not found"}), 404
         
-        return jsonify(panel_data), 200
+        return image_response(photo.photo_key, None if photo.photo_key else photo.photo, private=True)
     except Exception as e:
-        logger.error(f"Error retrieving QC CW Panel Data: {str(e)}")
+        logger.error(f"Error retrieving QC CW panel photo: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
@@ -1681,7 +2618,7 @@ def get_qc_cw_panel_data_by_id(panel_id):
 def get_qc_cw_panel_data_by_fl_id(fl_id):
     """Get all QC CW Panel Data for a specific fl_id."""
     try:
-        panels = QCCWPanelData.query.filter(QCCWPanelData.fl_id == fl_id).all()
+        panels = QCCWPanelData.query.filter(QCCWPanelData.fl_id == fl_id).order_by(QCCWPanelData.pan_id).all()
         result = []
         
         for panel in panels:
@@ -1693,7 +2630,7 @@ def get_qc_cw_panel_data_by_fl_id(fl_id):
                 "ipa_cleaned": panel.ipa_cleaned,
                 "sealant_frame_enough": panel.sealant_frame_enough,
                 "created_at": panel.created_at.isoformat() if panel.created_at else None,
-                "has_profile_photo": panel.profile_photo is not None
+                "has_profile_photo": panel.has_profile_photo
             }
             result.append(panel_data)
         
@@ -1703,14 +2640,40 @@ def get_qc_cw_panel_data_by_fl_id(fl_id):
         return jsonify({"error": str(e)}), 500
 
 
+def panel_photo_inputs(data, files, field):
+    """
+    Collect the panel photos of a request as dicts with "photo" and "photo_type".
+    
+    JSON entries carry the photo as a base64 string ("photo") or a completed
+    upload ("upload_id"); multipart file parts are matched with their types by position.
+    """
+    photos = []
+    if isinstance(data.get(field), list):
+        for photo_data in data[field]:
+            photo = photo_data.get("photo") or ({"upload_id": photo_data["upload_id"]} if photo_data.get("upload_id") else None)
+            if photo:
+                photos.append({"photo": photo, "photo_type": photo_data.get("photo_type")})
+    photo_types = request.form.getlist(f"{field}_type") if files else []
+    for index, file in enumerate(files.getlist(field)):
+        photos.append({"photo": file, "photo_type": photo_types[index] if index < len(photo_types) else None})
+    return photos
+
+
 @app.route("/api/qc-cw-panel-data", methods=["POST"])
 @token_required
 def create_qc_cw_panel_data():
-    """Create a new QC CW Panel Data entry."""
+    """
+    Create a new QC CW Panel Data entry.
+    
+    Accepts JSON, or multipart/form-data with the JSON in a "data" field, a
+    "profile_photo" file part and "additional_photos" file parts whose types
+    are given in matching "additional_photos_type" form fields.
+    """
     try:
-        data = request.json
-        logger.info(f"Received QC CW Panel Data: {data}")
+        data, files = parse_upload_request()
+        logger.info(f"Received QC CW Panel Data {data.get('fl_id')}/{data.get('pan_id')} with {len(data.get('additional_photos') or []) + len(files.getlist('additional_photos'))} photos")
         current_user_id = g.user.id
+        max_file_size = get_max_file_size(app.config)
         
         # Required fields validation
         required_fields = ["fl_id", "pan_id"]
@@ -1718,6 +2681,14 @@ def create_qc_cw_panel_data():
             if field not in data:
                 return jsonify({"error": f"Missing required field: {field}"}), 400
         
+        # (fl_id, pan_id) identifies a panel
+        existing_panel = db.session.query(QCCWPanelData.id).filter(
+            QCCWPanelData.fl_id == data["fl_id"],
+            QCCWPanelData.pan_id == data["pan_id"]
+        ).first()
+        if existing_panel:
+            return jsonify({"error": f"Panel {data['fl_id']}/{data['pan_id']} already exists", "id": existing_panel.id}), 409
+        
         # Calculate pan_name based on fl_id and pan_id
         pan_name = f"c{data['fl_id']}.{data['pan_id']}"
         
@@ -1743,31 +2714,22 @@ def create_qc_cw_panel_data():
         )
         
         # Set JSON fields
-        json_fields = [
-            'width_l', 'width_r', 'height_1', 'height_2', 'height_3', 'height_4',
-            'cavity_ro_height_total', 'cavity_diag_cw_pan_l', 'cavity_diag_cw_pan_r',
-            'left', 'middle', 'right', 'head', 'sill',
-            'trans_1', 'trans_2', 'trans_3',
-            'bracket_l', 'bracket_r',
-            'infill_fs_location',
-            'infills_1_type', 'infills_2_type', 'infills_3_type', 'infills_4_type',
-            'infills_right_1_type', 'infills_right_2_type', 'infills_right_3_type', 'infills_right_4_type',
-            'infills_1_color', 'infills_2_color', 'infills_3_color', 'infills_4_color',
-            'infills_right_1_color', 'infills_right_2_color', 'infills_right_3_color', 'infills_right_4_color',
-            'type_gz_factory'
-        ]
-        
-        for field in json_fields:
+        for field in PANEL_JSON_FIELDS:
             if field in data:
                 panel.set_json_field(field, data[field])
         
         # Set profile photo if provided
-        if "profile_photo" in data and data["profile_photo"]:
-            panel.set_profile_photo_from_base64(data["profile_photo"])
+        profile_photo = files.get("profile_photo") or data.get("profile_photo")
+        if profile_photo:
+            panel.set_profile_photo_blob(*store_image(profile_photo, current_user_id, max_file_size))
         
         db.session.add(panel)
         db.session.flush()  # Get ID before committing
         
+        sync_measurements(db.session, [
+            (panel.id, {field: getattr(panel, field) for field in MEASUREMENT_FIELDS if field in data})
+        ])
+        
         # Add frame cavity values if provided
         if "frame_cavities_values" in data and isinstance(data["frame_cavities_values"], list):
             for value_data in data["frame_cavities_values"]:
@@ -1779,14 +2741,13 @@ def create_qc_cw_panel_data():
                 db.session.add(value)
         
         # Add photos if provided
-        if "additional_photos" in data and isinstance(data["additional_photos"], list):
-            for photo_data in data["additional_photos"]:
-                photo = QCCWPanelPhoto(
-                    panel_id=panel.id,
-                    photo_type=photo_data.get("photo_type")
-                )
-                photo.set_photo_from_base64(photo_data["photo"])
-                db.session.add(photo)
+        for photo_data in panel_photo_inputs(data, files, "additional_photos"):
+            photo = QCCWPanelPhoto(
+                panel_id=panel.id,
+                photo_type=photo_data.get("photo_type")
+            )
+            photo.set_photo_blob(*store_image(photo_data["photo"], current_user_id, max_file_size))
+            db.session.add(photo)
         
         db.session.commit()
         
@@ -1800,18 +2761,77 @@ def create_qc_cw_panel_data():
                 "pan_name": panel.pan_name
             }
         }), 201
+    except UploadError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), e.status_code
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error creating QC CW Panel Data: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/qc-cw-panel-data/bulk", methods=["POST"])
+@token_required
+def bulk_upsert_qc_cw_panel_data():
+    """
+    Insert or update many QC CW panels in one transaction, matched on (fl_id, pan_id).
+    
+    The body is a JSON array of panels (or {"panels": [...]}) with the fields of the
+    single panel endpoints, including frame_cavities_values; photos are not accepted.
+    Invalid panels are reported per item; with ?atomic=true nothing is written
+    when any panel is invalid.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get("panels")
+        if not isinstance(data, list):
+            return jsonify({"error": "Body must be a JSON array of panels"}), 400
+        if len(data) > app.config["PANEL_BULK_MAX_ITEMS"]:
+            return jsonify({"error": f"At most {app.config['PANEL_BULK_MAX_ITEMS']} panels per request"}), 400
+        
+        atomic = request.args.get("atomic", "false").lower() == "true"
+        results = upsert_panels(db.session, data, g.user.id, atomic)
+    except IntegrityError:
+        # Panels inserted concurrently are updated instead; this is only reached
+        # on databases without ON CONFLICT support
+        db.session.rollback()
+        return jsonify({"error": "Panels were modified concurrently, retry the request"}), 409
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error in bulk QC CW Panel Data upsert: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    
+    inserted = sum(1 for result in results if result.get("action") == "inserted")
+    updated = sum(1 for result in results if result.get("action") == "updated")
+    failed = sum(1 for result in results if "errors" in result)
+    if failed == 0:
+        status_code = 200
+    elif inserted or updated:
+        status_code = 207
+    else:
+        status_code = 400
+    return jsonify({
+        "inserted": inserted,
+        "updated": updated,
+        "failed": failed,
+        "results": results
+    }), status_code
+
+
 @app.route("/api/qc-cw-panel-data/<int:panel_id>", methods=["PUT"])
 @token_required
 def update_qc_cw_panel_data(panel_id):
-    """Update an existing QC CW Panel Data entry."""
+    """
+    Update an existing QC CW Panel Data entry.
+    
+    Accepts JSON, or multipart/form-data with the JSON in a "data" field, a
+    "profile_photo" file part and "new_photos" file parts whose types are
+    given in matching "new_photos_type" form fields.
+    """
     try:
-        data = request.json
+        data, files = parse_upload_request()
+        max_file_size = get_max_file_size(app.config)
         panel = QCCWPanelData.query.get(panel_id)
         
         if not panel:
@@ -1819,6 +2839,11 @@ def update_qc_cw_panel_data(panel_id):
         
         # Update basic fields
         if "pan_id" in data:
+            if data["pan_id"] != panel.pan_id and db.session.query(QCCWPanelData.id).filter(
+                QCCWPanelData.fl_id == panel.fl_id,
+                QCCWPanelData.pan_id == data["pan_id"]
+            ).first():
+                return jsonify({"error": f"Panel {panel.fl_id}/{data['pan_id']} already exists"}), 409
             panel.pan_id = data["pan_id"]
             # Recalculate pan_name if pan_id changes
             panel.pan_name = f"c{panel.fl_id}.{panel.pan_id}"
@@ -1836,30 +2861,22 @@ def update_qc_cw_panel_data(panel_id):
                 setattr(panel, field, data[field])
         
         # Update JSON fields
-        json_fields = [
-            'width_l', 'width_r', 'height_1', 'height_2', 'height_3', 'height_4',
-            'cavity_ro_height_total', 'cavity_diag_cw_pan_l', 'cavity_diag_cw_pan_r',
-            'left', 'middle', 'right', 'head', 'sill',
-            'trans_1', 'trans_2', 'trans_3',
-            'bracket_l', 'bracket_r',
-            'infill_fs_location',
-            'infills_1_type', 'infills_2_type', 'infills_3_type', 'infills_4_type',
-            'infills_right_1_type', 'infills_right_2_type', 'infills_right_3_type', 'infills_right_4_type',
-            'infills_1_color', 'infills_2_color', 'infills_3_color', 'infills_4_color',
-            'infills_right_1_color', 'infills_right_2_color', 'infills_right_3_color', 'infills_right_4_color',
-            'type_gz_factory'
-        ]
-        
-        for field in json_fields:
+        for field in PANEL_JSON_FIELDS:
             if field in data:
                 panel.set_json_field(field, data[field])
         
+        sync_measurements(db.session, [
+            (panel.id, {field: getattr(panel, field) for field in MEASUREMENT_FIELDS if field in data})
+        ])
+        
         # Update profile photo if provided
-        if "profile_photo" in data:
+        if "profile_photo" in files:
+            panel.set_profile_photo_blob(*store_image(files["profile_photo"], g.user.id, max_file_size))
+        elif "profile_photo" in data:
             if data["profile_photo"]:
-                panel.set_profile_photo_from_base64(data["profile_photo"])
+                panel.set_profile_photo_blob(*store_image(data["profile_photo"], g.user.id, max_file_size))
             else:
-                panel.profile_photo = None
+                panel.set_profile_photo_blob(None, None)
         
         panel.updated_by = g.user.id
         
@@ -1884,14 +2901,13 @@ def update_qc_cw_panel_data(panel_id):
                     db.session.add(value)
         
         # Handle photo updates
-        if "new_photos" in data and isinstance(data["new_photos"], list):
-            for photo_data in data["new_photos"]:
-                photo = QCCWPanelPhoto(
-                    panel_id=panel.id,
-                    photo_type=photo_data.get("photo_type")
-                )
-                photo.set_photo_from_base64(photo_data["photo"])
-                db.session.add(photo)
+        for photo_data in panel_photo_inputs(data, files, "new_photos"):
+            photo = QCCWPanelPhoto(
+                panel_id=panel.id,
+                photo_type=photo_data.get("photo_type")
+            )
+            photo.set_photo_blob(*store_image(photo_data["photo"], g.user.id, max_file_size))
+            db.session.add(photo)
         
         # Handle photo deletions
         if "delete_photos" in data and isinstance(data["delete_photos"], list):
@@ -1912,6 +2928,9 @@ def update_qc_cw_panel_data(panel_id):
                 "pan_name": panel.pan_name
             }
         }), 200
+    except UploadError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), e.status_code
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating QC CW Panel Data: {str(e)}")
@@ -2209,262 +3228,42 @@ def delete_coating_color(color_id):
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
-    try:
-        # Get panel counts
-        total_panels = db.session.query(func.count(Product.id)).scalar() or 0
-        
-        # Count panels by status
-        passed_qc = db.session.query(func.count(Product.id)).filter(
-            Product.status == 'qc_passed'
-        ).scalar() or 0
-        
-        pending_qc = db.session.query(func.count(Product.id)).filter(
-            Product.status == 'pending'
-        ).scalar() or 0
-        
-        failed_qc = db.session.query(func.count(Product.id)).filter(
-            ~Product.status.in_(['qc_passed', 'pending', 'shipped', 'complete'])
-        ).scalar() or 0
-        
-        shipped_panels = db.session.query(func.count(Product.id)).filter(
-            Product.status.in_(['shipped', 'complete'])
-        ).scalar() or 0
 
-        # Get recent panels data (Floor 17)
-        panels_data = []
-        
-        # Get all products first (even without QC sessions)
-        products = db.session.query(Product).order_by(Product.created_at.desc()).limit(10).all()
-        
-        for product in products:
-            # Get the most recent QC session for this product if any
-            qc_session = db.session.query(QCSession).filter(
-                QCSession.product_id == product.id
-            ).order_by(QCSession.performed_at.desc()).first()
-            
-            status = 'Passed' if product.status == 'qc_passed' else \
-                    'Pending' if product.status == 'pending' else 'Failed'
-            
-            # Get any attribute values from the QC session if available
-            inspector_name = "Unassigned"
-            performed_date = product.created_at.strftime("%Y-%m-%d")
-            notes = ""  # Default empty notes
-            
-            if qc_session:
-                if qc_session.inspector_user:
-                    inspector_name = qc_session.inspector_user.username
-                performed_date = qc_session.performed_at.strftime("%Y-%m-%d")
-                
-                # Get QC attribute values for this product if any exist
-                attribute_values = db.session.query(QCAttributeValue).filter(
-                    QCAttributeValue.qc_id == qc_session.id
-                ).all()
-                
-                # Look for text values to use as notes
-                for attr_value in attribute_values:
-                    if attr_value.value_text:
-                        notes = attr_value.value_text
-                        break
-            
-            panels_data.append({
-                "qc_id": qc_session.id if qc_session else None,
-                "panel_number": product.product_number or f"Panel #{product.id}",
-                "type": "Standard",  # Default type
-                "width": "N/A",
-                "height": "N/A",
-                "inspector": inspector_name,
-                "date": performed_date,
-                "status": status,
-                "notes": notes
-            })
+EXCEL_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_STREAM_CHUNK_SIZE = 64 * 1024
+
+def stream_file_response(fileobj, filename, mimetype=EXCEL_MIMETYPE):
+    """Stream a file object to the client in chunks and close it once sent."""
+    def generate():
+        try:
+            while True:
+                chunk = fileobj.read(EXPORT_STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            fileobj.close()
+    
+    response = Response(generate(), mimetype=mimetype)
+    
+    # Add explicit headers to help with download
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    response.headers["Access-Control-Expose-Headers"] = "Content-Disposition"
+    return response
 
-        # Get structural sealant data
-        sealant_data = []
-        
-        # Look for any sealant-related products or QC sessions
-        sealant_products = db.session.query(Product).filter(
-            Product.product_number.ilike('%sealant%') | 
-            Product.product_number.ilike('%seal%') |
-            Product.product_number.ilike('%str%') |
-            Product.product_number.ilike('%barrel%')
-        ).order_by(Product.created_at.desc()).limit(5).all()
-        
-        for product in sealant_products:
-            # Get the most recent QC session for this product
-            qc_session = db.session.query(QCSession).filter(
-                QCSession.product_id == product.id
-            ).order_by(QCSession.performed_at.desc()).first()
-            
-            inspector_name = "Unassigned"
-            performed_date = product.created_at.strftime("%Y-%m-%d")
-            
-            if qc_session and qc_session.inspector_user:
-                inspector_name = qc_session.inspector_user.username
-                performed_date = qc_session.performed_at.strftime("%Y-%m-%d")
-            
-            # Extract data from product number if possible
-            product_parts = product.product_number.split('-')
-            
-            sealant_data.append({
-                "date": performed_date,
-                "shift": "Day",  # Default shift
-                "batch_number": f"B{product.id}",
-                "barrel_number": f"BAR{product.id}",
-                "panels_glazed": 1,  # Default value
-                "inspector": inspector_name
-            })
-        
-        # If we don't have any sealant products, add placeholder based on available QC sessions
-        if not sealant_data and total_panels > 0:
-            # Get latest QC sessions
-            recent_sessions = db.session.query(QCSession).order_by(
-                QCSession.performed_at.desc()
-            ).limit(3).all()
-            
-            for session in recent_sessions:
-                inspector_name = "Unassigned"
-                if session.inspector_user:
-                    inspector_name = session.inspector_user.username
-                
-                sealant_data.append({
-                    "date": session.performed_at.strftime("%Y-%m-%d"),
-                    "shift": "Day",  # Default shift
-                    "batch_number": f"B{session.id}",
-                    "barrel_number": f"BAR{session.id}",
-                    "panels_glazed": 1,  # Default value
-                    "inspector": inspector_name
-                })
-        
-        # Get inventory data (Extrusions & Infills)
-        inventory_data = {}
-        inventory_counts = {}
-        
-        # Get all part subtypes with their inventory snapshots
-        inventory_items = db.session.query(
-            PartSubtype, 
-            InventorySnapshot,
-            Warehouse
-        ).join(
-            InventorySnapshot, InventorySnapshot.part_subtype_id == PartSubtype.id, isouter=True
-        ).join(
-            Warehouse, InventorySnapshot.warehouse_id == Warehouse.id, isouter=True
-        ).join(
-            PartType, PartSubtype.part_type_id == PartType.id
-        ).order_by(
-            PartType.name, 
-            PartSubtype.name
-        ).all()
-        
-        # Organize inventory data by part type
-        for subtype, snapshot, warehouse in inventory_items:
-            # Get part type name from the subtype's parent
-            part_type = db.session.query(PartType).filter(PartType.id == subtype.part_type_id).first()
-            type_name = part_type.name if part_type else "Unknown"
-            
-            # Initialize this part type in inventory data if not present
-            if type_name not in inventory_data:
-                inventory_data[type_name] = []
-                inventory_counts[type_name] = 0
-            
-            # Get quantity from snapshot if available
-            quantity = snapshot.quantity if snapshot else 0
-            warehouse_name = warehouse.name if warehouse else "Main Warehouse"
-            last_update = snapshot.snapshot_date.strftime("%Y-%m-%d") if snapshot else "N/A"
-            
-            # Add to inventory counts
-            inventory_counts[type_name] += quantity
-            
-            # Add this part to the inventory data
-            inventory_data[type_name].append({
-                "part_id": subtype.id,
-                "description": subtype.name,
-                "type": type_name,
-                "color": "Standard",  # Could be derived from attributes if available
-                "size": "N/A",        # Could be derived from attributes if available
-                "warehouse": warehouse_name,
-                "quantity": quantity,
-                "last_update": last_update
-            })
-        
-        # Get recent activities based on timestamps
-        recent_activities = []
-        
-        # Get latest QC sessions
-        recent_qc = db.session.query(QCSession).join(
-            User, QCSession.inspector_id == User.id
-        ).join(
-            Product, QCSession.product_id == Product.id
-        ).order_by(
-            QCSession.performed_at.desc()
-        ).limit(5).all()
-        
-        for qc in recent_qc:
-            recent_activities.append({
-                "type": "qc_inspection",
-                "date": qc.performed_at.strftime("%Y-%m-%d %H:%M"),
-                "user": qc.inspector_user.username if qc.inspector_user else "System",
-                "description": f"QC inspection performed on {qc.product.product_number}",
-                "details": {
-                    "product_id": qc.product_id,
-                    "qc_id": qc.id
-                }
-            })
-        
-        # Return the dashboard data
-        return jsonify({
-            "total_panels": total_panels,
-            "passed_qc": passed_qc,
-            "pending_qc": pending_qc,
-            "failed_qc": failed_qc,
-            "shipped_panels": shipped_panels,
-            "panels_data": panels_data,
-            "sealant_data": sealant_data,
-            "inventory_data": inventory_data,
-            "inventory_counts": inventory_counts,
-            "recent_activities": recent_activities
-        })
-    except Exception as e:
-        # Log the error details
-        logger.error(f"Dashboard data error: {str(e)}")
-        return jsonify({
-            "error": "An error occurred while retrieving dashboard data",
-            "total_panels": 0,
-            "passed_qc": 0,
-            "pending_qc": 0,
-            "failed_qc": 0,
-            "shipped_panels": 0,
-            "panels_data": [],
-            "sealant_data": [],
-            "inventory_data": {},
-            "inventory_counts": {},
-            "recent_activities": []
-        }), 500
-        
 # Export QC CW Panel Data to Excel
 @app.route("/api/qc/cw-panel-data/export-excel", methods=["GET"])
 @token_required
 def export_qc_cw_panel_data_excel():
     """Export QC CW Panel Data to Excel file with same structure as reference file."""
     try:
-        # Generate Excel file
+        # Generate Excel file into a spooled temporary file
         excel_data = export_qc_cw_panel_data_to_excel(db.session)
         
-        # Create response with Excel file
+        # Stream the file back in chunks
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"QC_CW_Panel_Data_{timestamp}.xlsx"
-        
-        # Set additional headers for better download handling
-        response = send_file(
-            excel_data,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            as_attachment=True,
-            download_name=filename
-        )
-        
-        # Add explicit headers to help with download
-        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
-        response.headers["Access-Control-Expose-Headers"] = "Content-Disposition"
-        return response
+        return stream_file_response(excel_data, filename)
     except Exception as e:
         logger.error(f"Error exporting Excel: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -2474,88 +3273,11 @@ def export_qc_cw_panel_data_excel():
 def export_product_parts_excel():
     """Export Product Parts to Excel file."""
     try:
-        # Create a BytesIO object to store the Excel file
-        output = io.BytesIO()
+        excel_data = export_product_parts_to_excel(db.session)
         
-        # Create an Excel writer with the BytesIO object
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            try:
-                # Query the database to get product parts data
-                query = text("""
-                    SELECT 
-                        product_part_id,
-                        product_part_name,
-                        description,
-                        part_type,
-                        coating_color
-                    FROM product_parts
-                    ORDER BY product_part_id
-                """)
-                
-                # Execute the query
-                result = db.session.execute(query)
-                records = result.fetchall()
-                
-                # Convert the results to a list of dictionaries
-                data = []
-                for record in records:
-                    data.append(dict(record))
-                
-                # Create a DataFrame from the data
-                df = pd.DataFrame(data) if data else pd.DataFrame(columns=[
-                    'product_part_id', 'product_part_name', 'description', 'part_type', 'coating_color'
-                ])
-                
-                # Rename columns for better readability in Excel
-                if not df.empty:
-                    df.rename(columns={
-                        'product_part_id': 'Product Part ID',
-                        'product_part_name': 'Name',
-                        'description': 'Description',
-                        'part_type': 'Part Type',
-                        'coating_color': 'Coating Color'
-                    }, inplace=True)
-                else:
-                    df = pd.DataFrame(columns=[
-                        'Product Part ID', 'Name', 'Description', 'Part Type', 'Coating Color'
-                    ])
-                
-                # Write DataFrame to Excel
-                df.to_excel(writer, sheet_name='Product Parts', index=False)
-                
-                # Get the worksheet
-                worksheet = writer.sheets['Product Parts']
-                
-                # Adjust column widths
-                for col_num, column in enumerate(df.columns, 1):
-                    max_length = max(df[column].astype(str).apply(len).max(), len(column)) + 2
-                    col_letter = chr(64 + col_num)
-                    worksheet.column_dimensions[col_letter].width = max_length
-                
-            except Exception as e:
-                logger.error(f"Error exporting Product Parts: {str(e)}")
-                # Create a minimal sheet if export fails
-                pd.DataFrame({'Error': ['No data available']}).to_excel(writer, sheet_name='Product Parts')
-
-        # Reset the BytesIO position to the beginning
-        output.seek(0)
-
-        # Create response with Excel file
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"Product_Parts_{timestamp}.xlsx"
-        
-        # Set additional headers for better download handling
-        response = send_file(
-            output,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            as_attachment=True,
-            download_name=filename
-        )
-        
-        # Add explicit headers to help with download
-        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
-        response.headers["Access-Control-Expose-Headers"] = "Content-Disposition"
-        return response
+        return stream_file_response(excel_data, filename)
     except Exception as e:
         logger.error(f"Error exporting Product Parts to Excel: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -2565,91 +3287,11 @@ def export_product_parts_excel():
 def export_coating_colors_excel():
     """Export Coating Colors to Excel file."""
     try:
-        # Create a BytesIO object to store the Excel file
-        output = io.BytesIO()
+        excel_data = export_coating_colors_to_excel(db.session)
         
-        # Create an Excel writer with the BytesIO object
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            try:
-                # Query the database to get coating colors data
-                query = text("""
-                    SELECT 
-                        id,
-                        color_name,
-                        color_code,
-                        description,
-                        is_active
-                    FROM coating_colors
-                    ORDER BY color_name
-                """)
-                
-                # Execute the query
-                result = db.session.execute(query)
-                records = result.fetchall()
-                
-                # Convert the results to a list of dictionaries
-                data = []
-                for record in records:
-                    data.append(dict(record))
-                
-                # Create a DataFrame from the data
-                df = pd.DataFrame(data) if data else pd.DataFrame(columns=[
-                    'id', 'color_name', 'color_code', 'description', 'is_active'
-                ])
-                
-                # Rename columns for better readability in Excel
-                if not df.empty:
-                    df.rename(columns={
-                        'id': 'ID',
-                        'color_name': 'Color Name',
-                        'color_code': 'Color Code',
-                        'description': 'Description',
-                        'is_active': 'Active'
-                    }, inplace=True)
-                    
-                    # Convert boolean to Yes/No for better readability
-                    df['Active'] = df['Active'].map({True: 'Yes', False: 'No'})
-                else:
-                    df = pd.DataFrame(columns=[
-                        'ID', 'Color Name', 'Color Code', 'Description', 'Active'
-                    ])
-                
-                # Write DataFrame to Excel
-                df.to_excel(writer, sheet_name='Coating Colors', index=False)
-                
-                # Get the worksheet
-                worksheet = writer.sheets['Coating Colors']
-                
-                # Adjust column widths
-                for col_num, column in enumerate(df.columns, 1):
-                    max_length = max(df[column].astype(str).apply(len).max(), len(column)) + 2
-                    col_letter = chr(64 + col_num)
-                    worksheet.column_dimensions[col_letter].width = max_length
-                
-            except Exception as e:
-                logger.error(f"Error exporting Coating Colors: {str(e)}")
-                # Create a minimal sheet if export fails
-                pd.DataFrame({'Error': ['No data available']}).to_excel(writer, sheet_name='Coating Colors')
-
-        # Reset the BytesIO position to the beginning
-        output.seek(0)
-
-        # Create response with Excel file
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"Coating_Colors_{timestamp}.xlsx"
-        
-        # Set additional headers for better download handling
-        response = send_file(
-            output,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            as_attachment=True,
-            download_name=filename
-        )
-        
-        # Add explicit headers to help with download
-        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
-        response.headers["Access-Control-Expose-Headers"] = "Content-Disposition"
-        return response
+        return stream_file_response(excel_data, filename)
     except Exception as e:
         logger.error(f"Error exporting Coating Colors to Excel: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -2659,113 +3301,146 @@ def export_coating_colors_excel():
 def export_qc_reports_excel():
     """Export QC Reports to Excel file."""
     try:
-        # Create a BytesIO object to store the Excel file
-        output = io.BytesIO()
+        excel_data = export_qc_reports_to_excel(db.session)
         
-        # Create an Excel writer with the BytesIO object
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            try:
-                # Query the database to get QC Reports data
-                query = text("""
-                    SELECT 
-                        id,
-                        report_date,
-                        panels_glazed,
-                        date_glazed,
-                        time_glazed,
-                        qc_technician,
-                        report_status,
-                        batch_items,
-                        structural_sealant_records,
-                        created_at,
-                        updated_at
-                    FROM qc_reports
-                    ORDER BY report_date DESC
-                """)
-                
-                # Execute the query
-                result = db.session.execute(query)
-                records = result.fetchall()
-                
-                # Convert the results to a list of dictionaries
-                data = []
-                for record in records:
-                    row_dict = dict(record)
-                    
-                    # Parse batch_items JSON if it exists
-                    if row_dict.get('batch_items') and isinstance(row_dict['batch_items'], str):
-                        try:
-                            row_dict['batch_items'] = len(json.loads(row_dict['batch_items']))
-                        except:
-                            row_dict['batch_items'] = 0
-                    
-                    data.append(row_dict)
-                
-                # Create a DataFrame from the data
-                df = pd.DataFrame(data) if data else pd.DataFrame(columns=[
-                    'id', 'report_date', 'panels_glazed', 'date_glazed', 'time_glazed',
-                    'qc_technician', 'report_status', 'batch_items', 'structural_sealant_records',
-                    'created_at', 'updated_at'
-                ])
-                
-                # Rename columns for better readability in Excel
-                if not df.empty:
-                    df.rename(columns={
-                        'id': 'Report ID',
-                        'report_date': 'Report Date',
-                        'panels_glazed': 'Panels Glazed',
-                        'date_glazed': 'Date Glazed',
-                        'time_glazed': 'Time Glazed',
-                        'qc_technician': 'QC Technician',
-                        'report_status': 'Status',
-                        'batch_items': 'Number of Items',
-                        'structural_sealant_records': 'Structural Sealant Records',
-                        'created_at': 'Created At',
-                        'updated_at': 'Updated At'
-                    }, inplace=True)
-                else:
-                    df = pd.DataFrame(columns=[
-                        'Report ID', 'Report Date', 'Panels Glazed', 'Date Glazed', 'Time Glazed',
-                        'QC Technician', 'Status', 'Number of Items', 'Structural Sealant Records',
-                        'Created At', 'Updated At'
-                    ])
-                
-                # Write DataFrame to Excel
-                df.to_excel(writer, sheet_name='QC Reports', index=False)
-                
-                # Get the worksheet
-                worksheet = writer.sheets['QC Reports']
-                
-                # Adjust column widths
-                for col_num, column in enumerate(df.columns, 1):
-                    max_length = max(df[column].astype(str).apply(len).max(), len(column)) + 2
-                    col_letter = chr(64 + col_num)
-                    worksheet.column_dimensions[col_letter].width = max_length
-                
-            except Exception as e:
-                logger.error(f"Error exporting QC Reports: {str(e)}")
-                # Create a minimal sheet if export fails
-                pd.DataFrame({'Error': ['No data available']}).to_excel(writer, sheet_name='QC Reports')
-
-        # Reset the BytesIO position to the beginning
-        output.seek(0)
-
-        # Create response with Excel file
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"QC_Reports_{timestamp}.xlsx"
+        return stream_file_response(excel_data, filename)
+    except Exception as e:
+        logger.error(f"Error exporting QC Reports to Excel: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+# Asynchronous export job endpoints
+def format_export_job(job):
+    """Format an export job for JSON responses."""
+    return {
+        "id": job.id,
+        "export_type": job.export_type,
+        "status": job.status,
+        "filename": job.filename,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "download_url": f"/api/exports/{job.id}/download" if job.status == "completed" else None
+    }
+
+@app.route("/api/exports", methods=["POST"])
+@token_required
+def create_export_job():
+    """
+    Queue an Excel export.
+    
+    Returns an existing job instead when the same export of unchanged data is
+    already queued, running or available for download.
+    """
+    try:
+        data = request.json or {}
+        export_type = data.get("export_type")
+        if export_type not in EXPORT_TYPES:
+            return jsonify({
+                "error": f"export_type must be one of: {', '.join(EXPORT_TYPES)}"
+            }), 400
         
-        # Set additional headers for better download handling
-        response = send_file(
-            output,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            as_attachment=True,
-            download_name=filename
+        job, created = export_queue.submit(db.session, export_type, g.user.id)
+        return jsonify({"status": "success", "data": format_export_job(job)}), 202 if created else 200
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error creating export job: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/exports/<string:job_id>", methods=["GET"])
+@token_required
+def get_export_job(job_id):
+    """Get the status of an export job."""
+    try:
+        job = db.session.get(ExportJob, job_id)
+        if not job:
+            return jsonify({"error": "Export job not found"}), 404
+        return jsonify({"status": "success", "data": format_export_job(job)}), 200
+    except Exception as e:
+        logger.error(f"Error retrieving export job: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/exports/<string:job_id>/download", methods=["GET"])
+@token_required
+def download_export_job(job_id):
+    """Download the artifact of a completed export job."""
+    try:
+        job = db.session.get(ExportJob, job_id)
+        if not job:
+            return jsonify({"error": "Export job not found"}), 404
+        if job.status != "completed":
+            return jsonify({"error": f"Export job is {job.status}"}), 409
+        if not job.file_path or not os.path.exists(job.file_path):
+            return jsonify({"error": "Export file is no longer available"}), 410
+        
+        return stream_file_response(open(job.file_path, "rb"), job.filename)
+    except Exception as e:
+        logger.error(f"Error downloading export job: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+# Resumable upload endpoints
+def format_upload_session(upload):
+    """Format an upload session for JSON responses."""
+    return {
+        "id": upload.id,
+        "filename": upload.filename,
+        "total_size": upload.total_size,
+        "received_size": upload.received_size,
+        "status": upload.status,
+        "upload_url": f"/api/uploads/{upload.id}"
+    }
+
+@app.route("/api/uploads", methods=["POST"])
+@token_required
+def create_upload():
+    """
+    Start a resumable upload.
+    
+    Body: {"size": <bytes>, "filename": <optional name>}. Send the file with
+    PUT /api/uploads/<id> in one or more chunks, each with a Content-Range
+    header, then reference it as {"upload_id": <id>} in place of a base64 image.
+    """
+    try:
+        data = request.json or {}
+        upload = create_upload_session(db.session, app.config, g.user.id, data.get("size"), data.get("filename"))
+        return jsonify({"status": "success", "data": format_upload_session(upload)}), 201
+    except UploadError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), e.status_code
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error creating upload: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/uploads/<string:upload_id>", methods=["PUT"])
+@token_required
+def upload_chunk(upload_id):
+    """Append a chunk to a resumable upload."""
+    try:
+        upload = append_chunk(
+            db.session, app.config, upload_id, g.user.id,
+            request.headers.get("Content-Range"), request.stream
         )
-        
-        # Add explicit headers to help with download
-        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
-        response.headers["Access-Control-Expose-Headers"] = "Content-Disposition"
-        return response
+        return jsonify({"status": "success", "data": format_upload_session(upload)}), 200
+    except UploadError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), e.status_code
     except Exception as e:
-        logger.error(f"Error exporting QC Reports to Excel: {str(e)}")
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        db.session.rollback()
+        logger.error(f"Error receiving upload chunk: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/api/uploads/<string:upload_id>", methods=["GET"])
+@token_required
+def get_upload(upload_id):
+    """Get the progress of a resumable upload, to resume after an interruption."""
+    try:
+        upload = db.session.get(UploadSession, upload_id)
+        if not upload or upload.user_id != g.user.id:
+            return jsonify({"error": "Upload not found"}), 404
+        return jsonify({"status": "success", "data": format_upload_session(upload)}), 200
+    except Exception as e:
+        logger.error(f"Error retrieving upload: {str(e)}")
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,149 @@
+"""
+Per-process cache of QC attribute definitions.
+There are a few hundred definitions and they rarely change, so they are loaded
+in one query and kept for ATTRIBUTE_CACHE_TTL seconds. Commits that change a
+definition in this process drop the cache immediately.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import QCAttributeDef
+
+DEFAULT_TTL = 300
+
+# Lookups of unknown ids or names reload the snapshot at most this often
+MIN_RELOAD_INTERVAL = 5
+
+
+class AttributeDef(namedtuple("AttributeDef", ["id", "name", "data_type", "description"])):
+    """Immutable copy of a QCAttributeDef row, safe to share between requests."""
+    __slots__ = ()
+
+
+class AttributeDefCache:
+    """
+    Thread-safe snapshot of all attribute definitions, indexed by id and name.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._by_id = None
+        self._by_name = None
+        self._expires_at = 0
+        self._loaded_at = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure the cache from the app config and drop it when definitions change.
+
+        Args:
+            app: Flask application
+        """
+        self.ttl = app.config.get("ATTRIBUTE_CACHE_TTL", DEFAULT_TTL)
+        self.invalidate()
+        if not event.contains(Session, "after_flush", self._collect_changes):
+            event.listen(Session, "after_flush", self._collect_changes)
+            event.listen(Session, "after_commit", self._invalidate_changed)
+            event.listen(Session, "after_rollback", self._discard_changes)
+
+    def _load(self, db_session, force=False):
+        """
+        Return the current snapshot, reloading it when expired.
+
+        Args:
+            db_session: SQLAlchemy database session
+            force: Reload even if the snapshot has not expired, unless it was just loaded
+
+        Returns:
+            tuple: (definitions by id, definitions by name)
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._by_id is None or self._expires_at < now or (force and self._loaded_at + MIN_RELOAD_INTERVAL < now):
+                definitions = [
+                    AttributeDef(*row) for row in db_session.query(
+                        QCAttributeDef.id, QCAttributeDef.name, QCAttributeDef.data_type, QCAttributeDef.description
+                    )
+                ]
+                self._by_id = {definition.id: definition for definition in definitions}
+                self._by_name = {definition.name: definition for definition in definitions}
+                self._loaded_at = now
+                self._expires_at = now + self.ttl
+            return self._by_id, self._by_name
+
+    def all(self, db_session):
+        """
+        Return all attribute definitions.
+
+        Args:
+            db_session: SQLAlchemy database session
+
+        Returns:
+            dict: AttributeDef by id
+        """
+        return self._load(db_session)[0]
+
+    def get(self, db_session, attribute_id):
+        """
+        Look up an attribute definition by id.
+        Unknown ids reload the snapshot once, since the definition may have
+        been added by another process.
+
+        Args:
+            db_session: SQLAlchemy database session
+            attribute_id: ID of the definition
+
+        Returns:
+            AttributeDef or None if it does not exist
+        """
+        definition = self._load(db_session)[0].get(attribute_id)
+        if definition is None:
+            definition = self._load(db_session, force=True)[0].get(attribute_id)
+        return definition
+
+    def get_by_name(self, db_session, name):
+        """
+        Look up an attribute definition by name, reloading once for unknown names.
+
+        Args:
+            db_session: SQLAlchemy database session
+            name: Name of the definition
+
+        Returns:
+            AttributeDef or None if it does not exist
+        """
+        definition = self._load(db_session)[1].get(name)
+        if definition is None:
+            definition = self._load(db_session, force=True)[1].get(name)
+        return definition
+
+    def invalidate(self):
+        """Drop the snapshot; the next lookup reloads it."""
+        with self._lock:
+            self._by_id = None
+            self._by_name = None
+
+    def _collect_changes(self, session, flush_context):
+        """Remember whether a flush touched an attribute definition."""
+        for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(instance, QCAttributeDef):
+                session.info["attribute_defs_changed"] = True
+                return
+
+    def _invalidate_changed(self, session):
+        """Drop the snapshot after a commit that changed definitions."""
+        if session.info.pop("attribute_defs_changed", False):
+            self.invalidate()
+
+    def _discard_changes(self, session):
+        """Forget definition changes of a rolled back transaction."""
+        session.info.pop("attribute_defs_changed", None)
+
+
+attribute_cache = AttributeDefCache()
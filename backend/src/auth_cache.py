@@ -0,0 +1,124 @@
+"""
+Per-process cache of authenticated user principals.
+token_required resolves the user of every protected request; caching the few
+fields it needs avoids a users query per request. Entries expire after a short
+TTL so changes made by other worker processes are picked up, and are dropped
+immediately when a user is changed in this process.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_SIZE = 1024
+
+
+class Principal(namedtuple("Principal", ["id", "username", "role", "is_active", "token_version"])):
+    """Minimal identity of an authenticated user, stored in g.user."""
+    __slots__ = ()
+
+    @classmethod
+    def from_user(cls, user):
+        """
+        Build a principal from a User row.
+
+        Args:
+            user: User model instance
+
+        Returns:
+            Principal: Identity of the user
+        """
+        return cls(user.id, user.username, user.role, bool(user.is_active), user.token_version or 0)
+
+    def is_admin(self):
+        return self.role == "admin"
+
+    def is_manager(self):
+        return self.role in ["admin", "manager"]
+
+
+class PrincipalCache:
+    """
+    Thread-safe LRU cache of principals with a time to live.
+    Keys are (token subject, token version) pairs.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, max_size, ttl):
+        """
+        Change the cache limits and drop all entries.
+
+        Args:
+            max_size: Maximum number of entries, 0 disables the cache
+            ttl: Seconds an entry stays valid
+        """
+        with self._lock:
+            self.max_size = max_size
+            self.ttl = ttl
+            self._entries.clear()
+
+    def get(self, subject, version):
+        """
+        Look up a cached principal.
+
+        Args:
+            subject: Token subject (username)
+            version: Token version claim
+
+        Returns:
+            Principal or None if missing or expired
+        """
+        key = (subject, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def put(self, subject, version, principal):
+        """
+        Cache a principal, evicting the least recently used entry when full.
+
+        Args:
+            subject: Token subject (username)
+            version: Token version claim
+            principal: Principal to cache
+        """
+        if self.max_size <= 0:
+            return
+        key = (subject, version)
+        with self._lock:
+            self._entries[key] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *subjects):
+        """
+        Drop every cached principal of the given users.
+
+        Args:
+            subjects: Token subjects (usernames)
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] in subjects]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop all cached principals."""
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,29 @@
+"""
+Fill the panel_measurements table from the dimension documents of existing panels.
+Panels written through the API after the table was introduced are kept in sync
+automatically; this command rebuilds the rows of every panel and can be re-run.
+
+Usage:
+    python backfill_measurements.py [--batch-size N]
+"""
+import argparse
+import sys
+
+from app import app, db
+from panel_measurements import rebuild_measurements
+
+
+def main():
+    """Entry point for the measurement backfill command."""
+    parser = argparse.ArgumentParser(description="Rebuild panel measurements from the panel dimension fields")
+    parser.add_argument("--batch-size", type=int, default=500, help="Panels per transaction")
+    args = parser.parse_args()
+
+    with app.app_context():
+        processed = rebuild_measurements(db.session, args.batch_size)
+        print(f"Rebuilt measurements of {processed} panels")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Benchmark for the Fl-17 row formatter.
+Compares the vectorized format_fl17_data_for_excel against the previous
+row-by-row formatter on synthetic panel data and checks both produce the same rows.
+
+Usage: python benchmark_excel_export.py [row counts...]
+"""
+import random
+import sys
+import time
+
+import pandas as pd
+
+from excel_export import FL17_COLUMN_MAP, FL17_SOURCE_COLUMNS, extract_json_value, format_fl17_data_for_excel
+
+def make_panel_frame(row_count, seed=17):
+    """
+    Build a DataFrame shaped like the qc_cw_panel_data rows read by the export.
+    
+    Args:
+        row_count: Number of panels
+        seed: Random seed
+        
+    Returns:
+        DataFrame: Synthetic panel data with JSON document columns
+    """
+    rng = random.Random(seed)
+    json_columns = {source for _, kind, source, _ in FL17_COLUMN_MAP if kind == 'json'}
+    rows = []
+    for i in range(row_count):
+        row = {}
+        for column in FL17_SOURCE_COLUMNS:
+            if column in json_columns:
+                value = {'GZ_office': rng.randint(500, 3000), 'factory_floor': rng.choice(['yes', 'no', None])}
+                if column.startswith('infills'):
+                    value['GZ_office_2'] = rng.choice(['Vision', 'Spandrel'])
+                row[column] = value if rng.random() > 0.1 else None
+            elif column in ('ipa_cleaned', 'sealant_frame_enough', 'edge_bead_attached', 'operable', 'crated'):
+                row[column] = rng.random() > 0.5
+            else:
+                row[column] = f"{column}-{i}"
+        row['panel_name'] = f"C{row['fl_id']}.{row['pan_id']}"
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def format_fl17_rowwise(df, start_index=0):
+    """
+    Row-by-row formatter equivalent to the implementation replaced by the vectorized one.
+    
+    Args:
+        df: DataFrame with QC CW Panel Data
+        start_index: Number of rows already exported before this DataFrame
+        
+    Returns:
+        list: Data formatted for Excel
+    """
+    excel_data = []
+    for idx, (_, row) in enumerate(df.iterrows(), start_index):
+        excel_row = {}
+        for header, kind, source, key in FL17_COLUMN_MAP:
+            if kind == 'index':
+                excel_row[header] = idx + 1
+            elif kind == 'yes_no':
+                excel_row[header] = 'yes' if row.get(source) else 'no'
+            elif kind == 'json':
+                excel_row[header] = extract_json_value(row.get(source), key)
+            else:
+                excel_row[header] = row.get(source)
+        excel_data.append(excel_row)
+    return excel_data
+
+def run_benchmark(row_count):
+    """
+    Time both formatters on the same data.
+    
+    Args:
+        row_count: Number of panels
+        
+    Returns:
+        tuple: (row-by-row seconds, vectorized seconds)
+    """
+    df = make_panel_frame(row_count)
+    
+    start = time.perf_counter()
+    rowwise = format_fl17_rowwise(df)
+    rowwise_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    vectorized = format_fl17_data_for_excel(df)
+    vectorized_seconds = time.perf_counter() - start
+    
+    if vectorized.to_dict(orient='records') != rowwise:
+        raise AssertionError("Vectorized and row-by-row formatters disagree")
+    
+    return rowwise_seconds, vectorized_seconds
+
+if __name__ == "__main__":
+    row_counts = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for row_count in row_counts:
+        rowwise_seconds, vectorized_seconds = run_benchmark(row_count)
+        print(f"{row_count:>8} rows: row-by-row {rowwise_seconds:8.2f}s, "
+              f"vectorized {vectorized_seconds:6.2f}s, speedup {rowwise_seconds / vectorized_seconds:5.1f}x")
@@ -0,0 +1,107 @@
+"""
+Benchmark for the login endpoint.
+Sends concurrent logins through the Flask test client with password
+verification on the request threads and in process pools of several sizes,
+and reports throughput, latency and rejected (503) logins.
+
+Usage: python benchmark_login.py [--logins N] [--concurrency C] [--rounds R] [pool sizes...]
+Without DATABASE_URL the benchmark uses a temporary SQLite database.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Password worker processes re-import this module as __mp_main__; only the
+# benchmark process sets up the database and loads the app
+if __name__ != "__mp_main__":
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark_login.db')}"
+
+    from app import app, db
+    from models import User
+    from password_service import configure_bcrypt_rounds, password_verifier
+
+BENCHMARK_USERNAME = "login_benchmark"
+BENCHMARK_PASSWORD = "benchmark-password"
+
+def ensure_benchmark_user():
+    """Create or reset the user the benchmark logs in as."""
+    with app.app_context():
+        user = db.session.query(User).filter(User.username == BENCHMARK_USERNAME).first()
+        if not user:
+            user = User(username=BENCHMARK_USERNAME, email=f"{BENCHMARK_USERNAME}@example.com",
+                        role="inspector", department="QC", is_active=True)
+            db.session.add(user)
+        user.set_password(BENCHMARK_PASSWORD)
+        db.session.commit()
+
+def login(client):
+    """
+    Perform one login.
+
+    Args:
+        client: Flask test client
+
+    Returns:
+        tuple: (status code, seconds)
+    """
+    start = time.perf_counter()
+    response = client.post("/api/auth/login", json={"username": BENCHMARK_USERNAME, "password": BENCHMARK_PASSWORD})
+    return response.status_code, time.perf_counter() - start
+
+def run_benchmark(workers, logins, concurrency):
+    """
+    Time concurrent logins with a given verification pool size.
+
+    Args:
+        workers: Verification processes, 0 to verify on the request threads
+        logins: Total number of logins
+        concurrency: Number of simultaneous clients
+
+    Returns:
+        tuple: (logins per second, median seconds, 95th percentile seconds, rejected logins)
+    """
+    password_verifier.shutdown()
+    app.config["PASSWORD_WORKERS"] = workers
+    password_verifier.init_app(app)
+    client = app.test_client()
+    # Start the worker processes before timing
+    login(client)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: login(client), range(logins)))
+    elapsed = time.perf_counter() - start
+
+    failed = [status for status, _ in results if status not in (200, 503)]
+    if failed:
+        raise AssertionError(f"Unexpected login responses: {sorted(set(failed))}")
+    latencies = sorted(seconds for status, seconds in results if status == 200)
+    rejected = sum(1 for status, _ in results if status == 503)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    return len(latencies) / elapsed, statistics.median(latencies) if latencies else 0, p95, rejected
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark login throughput")
+    parser.add_argument("--logins", type=int, default=200, help="Total logins per run")
+    parser.add_argument("--concurrency", type=int, default=50, help="Simultaneous clients")
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt cost of the benchmark user")
+    parser.add_argument("pool_sizes", type=int, nargs="*", help="Verification processes per run (0 = request thread)")
+    args = parser.parse_args()
+
+    if args.rounds:
+        app.config["BCRYPT_ROUNDS"] = args.rounds
+        configure_bcrypt_rounds(args.rounds)
+    ensure_benchmark_user()
+
+    pool_sizes = args.pool_sizes or [0, min(4, os.cpu_count() or 1)]
+    for workers in pool_sizes:
+        rate, median, p95, rejected = run_benchmark(workers, args.logins, args.concurrency)
+        print(f"{workers:>3} workers: {rate:7.1f} logins/s, median {median * 1000:7.1f}ms, "
+              f"p95 {p95 * 1000:7.1f}ms, {rejected} rejected")
+    password_verifier.shutdown()
+    sys.exit(0)
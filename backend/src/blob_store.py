@@ -0,0 +1,271 @@
+"""
+Content-addressed blob storage for images and other binary data.
+Blobs are keyed by the SHA-256 hex digest of their content, so identical
+uploads are stored once and table rows only keep the 64 character key.
+"""
+
+import hashlib
+from abc import ABC, abstractmethod
+import os
+import tempfile
+
+DEFAULT_BLOB_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "blobs")
+
+
+# Read size when copying file objects into the store
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class BlobNotFound(KeyError):
+    """Raised when a blob key is not present in the store."""
+
+
+class BlobTooLarge(ValueError):
+    """Raised when a streamed blob exceeds the allowed size."""
+
+
+def blob_key(data):
+    """
+    Compute the content address of a blob.
+
+    Args:
+        data: Blob bytes
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore(ABC):
+    """
+    Interface implemented by the blob store backends.
+    """
+
+    @abstractmethod
+    def put(self, data):
+        """
+        Store a blob, skipping the write when identical content already exists.
+
+        Args:
+            data: Blob bytes
+
+        Returns:
+            str: Key of the stored blob
+        """
+
+    @abstractmethod
+    def put_stream(self, fileobj, max_size=None):
+        """
+        Store a blob read from a file object without holding it in memory.
+
+        Args:
+            fileobj: Binary file object positioned at the start of the blob
+            max_size: Maximum blob size in bytes, unlimited if None
+
+        Returns:
+            tuple: (key, size in bytes)
+
+        Raises:
+            BlobTooLarge: If more than max_size bytes are read
+        """
+
+    @abstractmethod
+    def open(self, key):
+        """
+        Open a blob for reading.
+
+        Args:
+            key: Blob key
+
+        Returns:
+            Binary file object positioned at the start of the blob
+        """
+
+    def get(self, key):
+        """
+        Read a whole blob.
+
+        Args:
+            key: Blob key
+
+        Returns:
+            bytes: Blob content
+        """
+        with self.open(key) as blob:
+            return blob.read()
+
+    @abstractmethod
+    def exists(self, key):
+        """Check whether a blob is stored."""
+
+    @abstractmethod
+    def size(self, key):
+        """Return the size of a blob in bytes."""
+
+    @abstractmethod
+    def delete(self, key):
+        """Delete a blob if it exists."""
+
+    @abstractmethod
+    def list_blobs(self):
+        """
+        List the stored blobs.
+
+        Returns:
+            Iterator of (key, last modified unix timestamp) tuples
+        """
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Blob store on the local filesystem.
+    Blobs live at <root>/<key[:2]>/<key[2:4]>/<key> to keep directories small.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key):
+        """
+        Resolve the file path of a blob.
+
+        Args:
+            key: Blob key
+
+        Returns:
+            str: Absolute file path
+        """
+        if len(key) != 64 or any(char not in "0123456789abcdef" for char in key):
+            raise BlobNotFound(key)
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put(self, data):
+        key = blob_key(data)
+        path = self.path(key)
+        if os.path.exists(path):
+            return key
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial blob
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as blob:
+                blob.write(data)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return key
+
+    def put_stream(self, fileobj, max_size=None):
+        staging_dir = os.path.join(self.root, "staging")
+        os.makedirs(staging_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        # Hash while copying into a staging file on the same filesystem, then move it into place
+        fd, temp_path = tempfile.mkstemp(dir=staging_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as blob:
+                while True:
+                    chunk = fileobj.read(STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise BlobTooLarge(f"File exceeds the maximum size of {max_size} bytes")
+                    digest.update(chunk)
+                    blob.write(chunk)
+
+            key = digest.hexdigest()
+            path = self.path(key)
+            if os.path.exists(path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp_path, path)
+            return key, size
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def open(self, key):
+        try:
+            return open(self.path(key), "rb")
+        except FileNotFoundError:
+            raise BlobNotFound(key)
+
+    def exists(self, key):
+        try:
+            return os.path.exists(self.path(key))
+        except BlobNotFound:
+            return False
+
+    def size(self, key):
+        try:
+            return os.path.getsize(self.path(key))
+        except FileNotFoundError:
+            raise BlobNotFound(key)
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except (FileNotFoundError, BlobNotFound):
+            pass
+
+    def list_blobs(self):
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if len(filename) == 64 and not filename.endswith(".tmp"):
+                    yield filename, os.path.getmtime(os.path.join(directory, filename))
+
+
+def create_blob_store(config):
+    """
+    Create the blob store configured by BLOB_STORE_BACKEND.
+
+    Args:
+        config: Mapping with BLOB_STORE_* settings
+
+    Returns:
+        BlobStore: Configured backend
+
+    Raises:
+        ValueError: If the backend is not supported
+    """
+    backend = (config.get("BLOB_STORE_BACKEND") or "local").lower()
+    if backend == "local":
+        return LocalBlobStore(config.get("BLOB_STORE_PATH") or DEFAULT_BLOB_STORE_PATH)
+    raise ValueError(f"Unknown blob store backend: {backend} (supported: local)")
+
+
+_blob_store = None
+
+
+def init_blob_store(app):
+    """
+    Configure the process-wide blob store from the app config.
+
+    Args:
+        app: Flask application
+    """
+    global _blob_store
+    _blob_store = create_blob_store(app.config)
+
+
+def get_blob_store():
+    """
+    Return the process-wide blob store, configured from the environment when
+    init_blob_store has not been called (e.g. in scripts).
+
+    Returns:
+        BlobStore: Configured backend
+    """
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = create_blob_store(os.environ)
+    return _blob_store
@@ -0,0 +1,40 @@
+"""
+Set-based queries backing the dashboard endpoint.
+Current stock is read from the current_inventory table, which is maintained
+when snapshots and shipments are recorded, so no snapshot history is scanned.
+"""
+
+from sqlalchemy.orm import Session
+
+from models import CurrentInventory, PartSubtype, PartType, Warehouse
+
+
+def load_current_inventory(db_session: Session):
+    """
+    Load every part subtype with its current stock per warehouse in a single query.
+    Part subtypes without stock are returned once, with no quantity.
+
+    Args:
+        db_session: SQLAlchemy database session
+
+    Returns:
+        list: Rows with part_id, description, type_name, quantity, as_of and warehouse_name
+    """
+    return db_session.query(
+        PartSubtype.id.label("part_id"),
+        PartSubtype.name.label("description"),
+        PartType.name.label("type_name"),
+        CurrentInventory.quantity,
+        CurrentInventory.as_of,
+        Warehouse.name.label("warehouse_name")
+    ).outerjoin(
+        PartType, PartSubtype.part_type_id == PartType.id
+    ).outerjoin(
+        CurrentInventory, CurrentInventory.part_subtype_id == PartSubtype.id
+    ).outerjoin(
+        Warehouse, Warehouse.id == CurrentInventory.warehouse_id
+    ).order_by(
+        PartType.name,
+        PartSubtype.name,
+        Warehouse.name
+    ).all()
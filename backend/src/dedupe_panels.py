@@ -0,0 +1,109 @@
+"""
+Merge duplicate QC CW panels and create the unique (fl_id, pan_id) index.
+For every (fl_id, pan_id) with more than one panel, the most recently updated
+panel is kept. Photos of the other panels are moved to it, as are their frame
+cavity values for attributes the kept panel has no value for; then the other
+panels are deleted. Each duplicate group is committed on its own.
+
+Usage:
+    python dedupe_panels.py [--dry-run]
+"""
+import argparse
+import sys
+
+from sqlalchemy import func
+
+from app import app, db
+from models import QCCWPanelData, QCCWPanelPhoto, FrameCavitiesValue
+
+UNIQUE_INDEX_NAME = "uq_qc_cw_panel_data_fl_pan"
+
+
+def find_duplicates():
+    """
+    Find the (fl_id, pan_id) pairs used by more than one panel.
+
+    Returns:
+        list: (fl_id, pan_id, panel count) tuples
+    """
+    return db.session.query(
+        QCCWPanelData.fl_id, QCCWPanelData.pan_id, func.count(QCCWPanelData.id)
+    ).group_by(
+        QCCWPanelData.fl_id, QCCWPanelData.pan_id
+    ).having(func.count(QCCWPanelData.id) > 1).order_by(
+        QCCWPanelData.fl_id, QCCWPanelData.pan_id
+    ).all()
+
+
+def merge_group(fl_id, pan_id):
+    """
+    Merge the panels of one (fl_id, pan_id) into the most recently updated one.
+
+    Args:
+        fl_id: Floor ID
+        pan_id: Panel ID
+
+    Returns:
+        int: Number of panels deleted
+    """
+    panels = db.session.query(QCCWPanelData).filter(
+        QCCWPanelData.fl_id == fl_id, QCCWPanelData.pan_id == pan_id
+    ).order_by(
+        func.coalesce(QCCWPanelData.updated_at, QCCWPanelData.created_at).asc().nullsfirst(),
+        QCCWPanelData.id
+    ).all()
+    keep, duplicates = panels[-1], panels[:-1]
+    duplicate_ids = [panel.id for panel in duplicates]
+
+    db.session.query(QCCWPanelPhoto).filter(
+        QCCWPanelPhoto.panel_id.in_(duplicate_ids)
+    ).update({QCCWPanelPhoto.panel_id: keep.id}, synchronize_session=False)
+
+    kept_attributes = {value.attribute_id for value in keep.frame_cavities_values}
+    # Newest duplicate first, so its value wins for attributes the kept panel lacks
+    for panel in reversed(duplicates):
+        for value in panel.frame_cavities_values:
+            if value.attribute_id not in kept_attributes:
+                kept_attributes.add(value.attribute_id)
+                db.session.query(FrameCavitiesValue).filter(
+                    FrameCavitiesValue.id == value.id
+                ).update({FrameCavitiesValue.panel_id: keep.id}, synchronize_session=False)
+
+    db.session.expire_all()
+    for panel in db.session.query(QCCWPanelData).filter(QCCWPanelData.id.in_(duplicate_ids)):
+        db.session.delete(panel)
+    db.session.commit()
+    print(f"  {fl_id}/{pan_id}: kept panel {keep.id}, merged {', '.join(map(str, duplicate_ids))}")
+    return len(duplicate_ids)
+
+
+def create_unique_index():
+    """Create the unique (fl_id, pan_id) index if it does not exist yet."""
+    for index in QCCWPanelData.__table__.indexes:
+        if index.name == UNIQUE_INDEX_NAME:
+            index.create(bind=db.engine, checkfirst=True)
+            print(f"Index {UNIQUE_INDEX_NAME} is in place")
+
+
+def main():
+    """Entry point for the panel deduplication command."""
+    parser = argparse.ArgumentParser(description="Merge duplicate (fl_id, pan_id) panels and add the unique index")
+    parser.add_argument("--dry-run", action="store_true", help="Only list duplicate panels")
+    args = parser.parse_args()
+
+    with app.app_context():
+        duplicates = find_duplicates()
+        print(f"{len(duplicates)} (fl_id, pan_id) pairs have duplicate panels")
+        if args.dry_run:
+            for fl_id, pan_id, count in duplicates:
+                print(f"  {fl_id}/{pan_id}: {count} panels")
+            return 0
+
+        deleted = sum(merge_group(fl_id, pan_id) for fl_id, pan_id, _ in duplicates)
+        print(f"Deleted {deleted} duplicate panels")
+        create_unique_index()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
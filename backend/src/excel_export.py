@@ -4,289 +4,422 @@ This module handles exporting database data to Excel files that match the struct
 of the reference Excel files.
 """
 
-import io
+import tempfile
+from itertools import chain, groupby
+import numpy as np
 import pandas as pd
+from openpyxl import Workbook
 from sqlalchemy.orm import Session
 from datetime import datetime
 import json
-from sqlalchemy import text
+from sqlalchemy import select
 
-def export_qc_cw_panel_data_to_excel(db_session: Session):
+from models import QCCWPanelData, QCReport, ProductPart, ProductColor, CoatingColor
+
+# Number of rows fetched from the server-side cursor and formatted at a time
+EXPORT_CHUNK_SIZE = 1000
+
+# Workbooks larger than this are spooled to disk instead of memory
+EXPORT_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+# Source columns of qc_cw_panel_data used by the Fl-17 sheet
+FL17_SOURCE_COLUMNS = [
+    'id', 'fl_id', 'pan_id',
+    'ipa_cleaned', 'sealant_frame_enough', 'width_l', 'width_r',
+    'height_1', 'height_2', 'height_3', 'height_4', 'cavities_invert',
+    'cavity_ro_height_total', 'cavity_diag_cw_pan_l', 'cavity_diag_cw_pan_r',
+    'left', 'middle', 'right', 'head', 'sill',
+    'trans_1', 'trans_2', 'trans_3', 'bracket_l', 'bracket_r',
+    'infill_fs_location', 'infills_1_type', 'infills_2_type', 'infills_3_type', 'infills_4_type',
+    'infills_right_1_type', 'infills_right_2_type', 'infills_right_3_type', 'infills_right_4_type',
+    'infills_1_color', 'infills_2_color', 'infills_3_color', 'infills_4_color',
+    'infills_right_1_color', 'infills_right_2_color', 'infills_right_3_color', 'infills_right_4_color',
+    'qc_infill_affix', 'structural_sealant_records', 'lmr', 'type_gz_factory', 'isa_type',
+    'edge_bead_attached', 'operable', 'card_checked', 'paint_damage',
+    'glass_scratched', 'cleaned_ready', 'crated'
+]
+
+STR_SEAL_HEADERS = [
+    'StrS Batch #', 'Catalyst Batch #', 'Primer C',
+    'Panels Glazed', 'Date Glazed', 'Time Glazed',
+    'Photo of the paper record as a reference'
+]
+
+INVENTORY_HEADERS = [
+    'Die # (PF)', 'Die Name', 'Description', 'Type (e.g. Mullion)', 'Coating Color'
+]
+
+# Declarative layout of the Fl-17 sheet, one entry per column in header order:
+# (header, kind, source column, JSON key). Kinds are 'index' (running row number),
+# 'value' (source column as is), 'yes_no' (boolean rendered as yes/no) and
+# 'json' (key extracted from a JSON text column).
+FL17_COLUMN_MAP = [
+    ('Index', 'index', None, None),
+    ('pan #', 'value', 'pan_id', None),
+    ('Panel #', 'value', 'panel_name', None),
+    ('IPA cleaned', 'yes_no', 'ipa_cleaned', None),
+    ('Sealant Frame enough', 'yes_no', 'sealant_frame_enough', None),
+    ('Width-L (mm)', 'json', 'width_l', 'GZ_office'),
+    ('Width-L factory', 'json', 'width_l', 'factory_floor'),
+    ('Width-R (mm)', 'json', 'width_r', 'GZ_office'),
+    ('Width-R factory', 'json', 'width_r', 'factory_floor'),
+    ('Height 1 (mm)', 'json', 'height_1', 'GZ_office'),
+    ('Height 1 factory', 'json', 'height_1', 'factory_floor'),
+    ('Height 2 (mm)', 'json', 'height_2', 'GZ_office'),
+    ('Height 2 factory', 'json', 'height_2', 'factory_floor'),
+    ('Height 3 (mm)', 'json', 'height_3', 'GZ_office'),
+    ('Height 3 factory', 'json', 'height_3', 'factory_floor'),
+    ('Height 4 (mm)', 'json', 'height_4', 'GZ_office'),
+    ('Height 4 factory', 'json', 'height_4', 'factory_floor'),
+    ('# Cavities (in vert)', 'value', 'cavities_invert', None),
+    ('Cavity RO Height Total (mm)', 'json', 'cavity_ro_height_total', 'GZ_office'),
+    ('Cavity RO Height Total factory', 'json', 'cavity_ro_height_total', 'factory_floor'),
+    ('Cavity Diag CW Pan-L (mm)', 'json', 'cavity_diag_cw_pan_l', 'GZ_office'),
+    ('Cavity Diag CW Pan-L factory', 'json', 'cavity_diag_cw_pan_l', 'factory_floor'),
+    ('Cavity Diag CW Pan-R (mm)', 'json', 'cavity_diag_cw_pan_r', 'GZ_office'),
+    ('Cavity Diag CW Pan-R factory', 'json', 'cavity_diag_cw_pan_r', 'factory_floor'),
+    ('Left', 'json', 'left', 'GZ_office'),
+    ('Left factory', 'json', 'left', 'factory_floor'),
+    ('Middle', 'json', 'middle', 'GZ_office'),
+    ('Middle factory', 'json', 'middle', 'factory_floor'),
+    ('Right', 'json', 'right', 'GZ_office'),
+    ('Right factory', 'json', 'right', 'factory_floor'),
+    ('Head', 'json', 'head', 'GZ_office'),
+    ('Head factory', 'json', 'head', 'factory_floor'),
+    ('Sill', 'json', 'sill', 'GZ_office'),
+    ('Sill factory', 'json', 'sill', 'factory_floor'),
+    ('Trans-1', 'json', 'trans_1', 'GZ_office'),
+    ('Trans-1 factory', 'json', 'trans_1', 'factory_floor'),
+    ('Trans-2', 'json', 'trans_2', 'GZ_office'),
+    ('Trans-2 factory', 'json', 'trans_2', 'factory_floor'),
+    ('Trans-3', 'json', 'trans_3', 'GZ_office'),
+    ('Trans-3 factory', 'json', 'trans_3', 'factory_floor'),
+    ('Bracket-L', 'json', 'bracket_l', 'GZ_office'),
+    ('Bracket-L factory', 'json', 'bracket_l', 'factory_floor'),
+    ('Bracket-R', 'json', 'bracket_r', 'GZ_office'),
+    ('Bracket-R factory', 'json', 'bracket_r', 'factory_floor'),
+    ('Infill-FS-Location', 'json', 'infill_fs_location', 'GZ_office'),
+    ('Infill-FS-Location factory', 'json', 'infill_fs_location', 'factory_floor'),
+    ('Infill 1 Type', 'json', 'infills_1_type', 'GZ_office'),
+    ('Infill 1 Type 2', 'json', 'infills_1_type', 'GZ_office_2'),
+    ('Infill 1 factory', 'json', 'infills_1_type', 'factory_floor'),
+    ('Infill 1 Color', 'json', 'infills_1_color', 'GZ_office'),
+    ('Infill 1 Color factory', 'json', 'infills_1_color', 'factory_floor'),
+    ('Infill 2 Type', 'json', 'infills_2_type', 'GZ_office'),
+    ('Infill 2 Type 2', 'json', 'infills_2_type', 'GZ_office_2'),
+    ('Infill 2 factory', 'json', 'infills_2_type', 'factory_floor'),
+    ('Infill 2 Color', 'json', 'infills_2_color', 'GZ_office'),
+    ('Infill 2 Color factory', 'json', 'infills_2_color', 'factory_floor'),
+    ('Infill 3 Type', 'json', 'infills_3_type', 'GZ_office'),
+    ('Infill 3 Type 2', 'json', 'infills_3_type', 'GZ_office_2'),
+    ('Infill 3 factory', 'json', 'infills_3_type', 'factory_floor'),
+    ('Infill 3 Color', 'json', 'infills_3_color', 'GZ_office'),
+    ('Infill 3 Color factory', 'json', 'infills_3_color', 'factory_floor'),
+    ('Infill 4 Type', 'json', 'infills_4_type', 'GZ_office'),
+    ('Infill 4 Type 2', 'json', 'infills_4_type', 'GZ_office_2'),
+    ('Infill 4 factory', 'json', 'infills_4_type', 'factory_floor'),
+    ('Infill 4 Color', 'json', 'infills_4_color', 'GZ_office'),
+    ('Infill 4 Color factory', 'json', 'infills_4_color', 'factory_floor'),
+    ('Right Infill 1 Type', 'json', 'infills_right_1_type', 'GZ_office'),
+    ('Right Infill 1 Type 2', 'json', 'infills_right_1_type', 'GZ_office_2'),
+    ('Right Infill 1 factory', 'json', 'infills_right_1_type', 'factory_floor'),
+    ('Right Infill 1 Color', 'json', 'infills_right_1_color', 'GZ_office'),
+    ('Right Infill 1 Color factory', 'json', 'infills_right_1_color', 'factory_floor'),
+    ('Right Infill 2 Type', 'json', 'infills_right_2_type', 'GZ_office'),
+    ('Right Infill 2 Type 2', 'json', 'infills_right_2_type', 'GZ_office_2'),
+    ('Right Infill 2 factory', 'json', 'infills_right_2_type', 'factory_floor'),
+    ('Right Infill 2 Color', 'json', 'infills_right_2_color', 'GZ_office'),
+    ('Right Infill 2 Color factory', 'json', 'infills_right_2_color', 'factory_floor'),
+    ('Right Infill 3 Type', 'json', 'infills_right_3_type', 'GZ_office'),
+    ('Right Infill 3 Type 2', 'json', 'infills_right_3_type', 'GZ_office_2'),
+    ('Right Infill 3 factory', 'json', 'infills_right_3_type', 'factory_floor'),
+    ('Right Infill 3 Color', 'json', 'infills_right_3_color', 'GZ_office'),
+    ('Right Infill 3 Color factory', 'json', 'infills_right_3_color', 'factory_floor'),
+    ('Right Infill 4 Type', 'json', 'infills_right_4_type', 'GZ_office'),
+    ('Right Infill 4 Type 2', 'json', 'infills_right_4_type', 'GZ_office_2'),
+    ('Right Infill 4 factory', 'json', 'infills_right_4_type', 'factory_floor'),
+    ('Right Infill 4 Color', 'json', 'infills_right_4_color', 'GZ_office'),
+    ('Right Infill 4 Color factory', 'json', 'infills_right_4_color', 'factory_floor'),
+    ('QC Infill Affix', 'value', 'qc_infill_affix', None),
+    ('Structural Sealant Records', 'value', 'structural_sealant_records', None),
+    ('L/M/R', 'value', 'lmr', None),
+    ('Type 1', 'json', 'type_gz_factory', 'GZ_office'),
+    ('Type 1 factory', 'json', 'type_gz_factory', 'factory_floor'),
+    ('Type 2', 'json', 'isa_type', 'GZ_office'),
+    ('Type 2 factory', 'json', 'isa_type', 'factory_floor'),
+    ('Edge Bead Attached', 'yes_no', 'edge_bead_attached', None),
+    ('Operable', 'yes_no', 'operable', None),
+    ('Card Checked', 'value', 'card_checked', None),
+    ('Paint Damage', 'value', 'paint_damage', None),
+    ('Glass Scratched', 'value', 'glass_scratched', None),
+    ('Cleaned Ready', 'value', 'cleaned_ready', None),
+    ('Crated', 'yes_no', 'crated', None),
+]
+
+# JSON keys read from each JSON source column
+FL17_JSON_KEYS = {
+    source: list(dict.fromkeys(
+        key for _, kind, column, key in FL17_COLUMN_MAP if kind == 'json' and column == source
+    ))
+    for _, kind, source, _ in FL17_COLUMN_MAP if kind == 'json'
+}
+
+def build_workbook(db_session: Session, sheet_writers, output=None):
     """
-    Export QC CW Panel Data to Excel with the same structure as the reference file.
+    Build a workbook from write-only sheets and save it to a file object.
+    
+    A sheet whose writer fails is replaced by a minimal error sheet so the
+    remaining sheets are still exported.
     
     Args:
         db_session: SQLAlchemy database session
+        sheet_writers: List of (sheet name, writer) where writer(db_session, worksheet) fills the sheet
+        output: Optional binary file object to write to
         
     Returns:
-        BytesIO: Excel file as bytes stream
+        File object positioned at the start of the Excel file
     """
-    # Create a BytesIO object to store the Excel file
-    output = io.BytesIO()
+    if output is None:
+        output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
     
-    # Create an Excel writer with the BytesIO object
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        try:
-            # Export Fl-17 sheet data (QC CW Panel Data)
-            export_fl17_sheet(db_session, writer)
-        except Exception as e:
-            print(f"Error exporting Fl-17 sheet: {str(e)}")
-            # Create a minimal sheet if export fails
-            pd.DataFrame({'Error': ['No data available']}).to_excel(writer, sheet_name='Fl-17')
-        
-        try:
-            # Export Str Seal sheet data
-            export_str_seal_sheet(db_session, writer)
-        except Exception as e:
-            print(f"Error exporting Str Seal sheet: {str(e)}")
-            # Create a minimal sheet if export fails
-            pd.DataFrame({'Error': ['No data available']}).to_excel(writer, sheet_name='Str Seal')
-        
+    workbook = Workbook(write_only=True)
+    
+    for sheet_name, sheet_writer in sheet_writers:
+        worksheet = workbook.create_sheet(title=sheet_name)
         try:
-            # Export Adm-Extrus,Infills sheet data
-            export_inventory_sheet(db_session, writer)
+            sheet_writer(db_session, worksheet)
         except Exception as e:
-            print(f"Error exporting Inventory sheet: {str(e)}")
-            # Create a minimal sheet if export fails
-            pd.DataFrame({'Error': ['No data available']}).to_excel(writer, sheet_name='Adm-Extrus,Infills')
-        
-    # Reset the BytesIO position to the beginning
+            print(f"Error exporting {sheet_name} sheet: {str(e)}")
+            db_session.rollback()
+            # Replace the partially written sheet with a minimal one
+            workbook.remove(worksheet)
+            worksheet = workbook.create_sheet(title=sheet_name)
+            write_error_sheet(worksheet)
+    
+    workbook.save(output)
+    
+    # Reset the file position to the beginning
     output.seek(0)
     return output
 
-def export_fl17_sheet(db_session: Session, writer):
+def export_qc_cw_panel_data_to_excel(db_session: Session, output=None):
     """
-    Export QC CW Panel Data to Fl-17 sheet.
+    Export QC CW Panel Data to Excel with the same structure as the reference file.
+    
+    Rows are read through server-side cursors in chunks of EXPORT_CHUNK_SIZE and
+    appended to write-only worksheets, so memory use does not grow with the
+    number of panels.
     
     Args:
         db_session: SQLAlchemy database session
-        writer: Excel writer
+        output: Optional binary file object to write to
+        
+    Returns:
+        File object positioned at the start of the Excel file
     """
-    # Create a simple DataFrame with headers to ensure we have a valid sheet
-    headers = create_fl17_headers()
-    excel_df = pd.DataFrame(columns=headers)
-    write_fl17_sheet(writer, excel_df, headers)
+    return build_workbook(db_session, [
+        ('Fl-17', export_fl17_sheet),
+        ('Str Seal', export_str_seal_sheet),
+        ('Adm-Extrus,Infills', export_inventory_sheet)
+    ], output)
+
+def export_product_parts_to_excel(db_session: Session, output=None):
+    """
+    Export Product Parts to Excel.
     
-    # Let's just get a list of columns to make sure we don't have any column mismatches
-    try:
-        # Get column names dynamically
-        col_query = text("""
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_name = 'qc_cw_panel_data'
-            ORDER BY ordinal_position
-        """)
-        
-        result = db_session.execute(col_query)
-        columns = [row[0] for row in result.fetchall()]
-        
-        # Build a dynamic query based on actual columns
-        select_parts = ["qp.id", "qp.fl_id", "qp.pan_id", 
-                      "'C' || qp.fl_id || '.' || qp.pan_id AS panel_name"]
+    Args:
+        db_session: SQLAlchemy database session
+        output: Optional binary file object to write to
         
-        # Add columns that exist in the table
-        common_columns = [
-            'ipa_cleaned', 'sealant_frame_enough', 'width_l', 'width_r',
-            'height_1', 'height_2', 'height_3', 'height_4', 'cavities_invert',
-            'cavity_ro_height_total', 'cavity_diag_cw_pan_l', 'cavity_diag_cw_pan_r',
-            'left', 'middle', 'right', 'head', 'sill',
-            'trans_1', 'trans_2', 'trans_3', 'bracket_l', 'bracket_r',
-            'infill_fs_location', 'infills_1_type', 'infills_2_type', 'infills_3_type', 'infills_4_type',
-            'infills_right_1_type', 'infills_right_2_type', 'infills_right_3_type', 'infills_right_4_type',
-            'infills_1_color', 'infills_2_color', 'infills_3_color', 'infills_4_color',
-            'infills_right_1_color', 'infills_right_2_color', 'infills_right_3_color', 'infills_right_4_color',
-            'qc_infill_affix', 'structural_sealant_records', 'lmr', 'type_gz_factory',
-            'edge_bead_attached', 'operable', 'card_checked', 'paint_damage',
-            'glass_scratched', 'cleaned_ready', 'crated'
-        ]
+    Returns:
+        File object positioned at the start of the Excel file
+    """
+    return build_workbook(db_session, [('Product Parts', export_product_parts_sheet)], output)
+
+def export_coating_colors_to_excel(db_session: Session, output=None):
+    """
+    Export Coating Colors to Excel.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        output: Optional binary file object to write to
         
-        for col in common_columns:
-            if col in columns:
-                select_parts.append(f"qp.{col}")
+    Returns:
+        File object positioned at the start of the Excel file
+    """
+    return build_workbook(db_session, [('Coating Colors', export_coating_colors_sheet)], output)
+
+def export_qc_reports_to_excel(db_session: Session, output=None):
+    """
+    Export QC Reports to Excel.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        output: Optional binary file object to write to
         
-        # Create the query with the columns that exist
-        select_clause = ",\n            ".join(select_parts)
-        query_str = f"""
-            SELECT 
-            {select_clause}
-            FROM qc_cw_panel_data qp
-            ORDER BY qp.fl_id, qp.pan_id
-        """
+    Returns:
+        File object positioned at the start of the Excel file
+    """
+    return build_workbook(db_session, [('QC Reports', export_qc_reports_sheet)], output)
+
+def write_error_sheet(worksheet):
+    """
+    Write a minimal sheet used when an export fails.
+    
+    Args:
+        worksheet: Write-only worksheet
+    """
+    worksheet.append(['Error'])
+    worksheet.append(['No data available'])
+
+def stream_query(db_session: Session, statement, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Execute a query on a server-side cursor and yield its rows in chunks.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        statement: SQLAlchemy select statement
+        chunk_size: Number of rows per chunk
         
-        query = text(query_str)
-    except Exception as e:
-        print(f"Error building dynamic query: {str(e)}")
-        return
-    
-    # Execute the query
-    result = db_session.execute(query)
-    records = result.fetchall()
-    
-    # Convert the results to a list of dictionaries
-    data = []
-    for record in records:
-        row = dict(record)
-        # Convert JSON strings to dictionaries
-        for key in row:
-            if key in [
-                'width_l', 'width_r', 'height_1', 'height_2', 'height_3', 'height_4',
-                'cavity_ro_height_total', 'cavity_diag_cw_pan_l', 'cavity_diag_cw_pan_r',
-                'left', 'middle', 'right', 'head', 'sill',
-                'trans_1', 'trans_2', 'trans_3',
-                'bracket_l', 'bracket_r',
-                'infill_fs_location',
-                'infills_1_type', 'infills_2_type', 'infills_3_type', 'infills_4_type',
-                'infills_right_1_type', 'infills_right_2_type', 'infills_right_3_type', 'infills_right_4_type',
-                'infills_1_color', 'infills_2_color', 'infills_3_color', 'infills_4_color',
-                'infills_right_1_color', 'infills_right_2_color', 'infills_right_3_color', 'infills_right_4_color',
-                'type_gz_factory', 'isa_type'
-            ] and row[key] and isinstance(row[key], str):
-                try:
-                    row[key] = json.loads(row[key])
-                except:
-                    # If JSON conversion fails, keep the original value
-                    pass
-        data.append(row)
+    Yields:
+        tuple: (column names, list of rows)
+    """
+    result = db_session.execute(statement.execution_options(yield_per=chunk_size))
+    try:
+        columns = list(result.keys())
+        for partition in result.partitions():
+            yield columns, partition
+    finally:
+        result.close()
+
+def export_fl17_sheet(db_session: Session, worksheet):
+    """
+    Export QC CW Panel Data to Fl-17 sheet.
     
-    # Create a DataFrame from the data
-    df = pd.DataFrame(data) if data else pd.DataFrame()
+    Args:
+        db_session: SQLAlchemy database session
+        worksheet: Write-only worksheet
+    """
+    headers = create_fl17_headers()
+    write_fl17_header_rows(worksheet, headers)
+    
+    table = QCCWPanelData.__table__
+    statement = select(*[table.c[name] for name in FL17_SOURCE_COLUMNS]).order_by(table.c.fl_id, table.c.pan_id)
     
-    if not df.empty:
+    row_count = 0
+    for columns, rows in stream_query(db_session, statement):
+        df = pd.DataFrame.from_records(rows, columns=columns)
+        df['panel_name'] = 'C' + df['fl_id'].astype(str) + '.' + df['pan_id'].astype(str)
+        
         # Prepare the data in the format needed for the Excel file
-        excel_data = format_fl17_data_for_excel(df)
+        excel_df = format_fl17_data_for_excel(df, start_index=row_count)
+        for values in excel_df.itertuples(index=False, name=None):
+            worksheet.append(values)
+        row_count += len(df)
+
+def format_fl17_data_for_excel(df, start_index=0):
+    """
+    Format the QC CW Panel Data for the Excel file.
+    
+    Columns are built with vectorized operations from FL17_COLUMN_MAP, and each
+    JSON column is parsed once and expanded into its keys.
+    
+    Args:
+        df: DataFrame with QC CW Panel Data
+        start_index: Number of rows already exported before this DataFrame
         
-        # Create the headers (matching the reference file)
-        headers = create_fl17_headers()
+    Returns:
+        DataFrame: Data formatted for Excel with one column per Fl-17 header
+    """
+    expanded = {}
+    columns = {}
+    
+    for header, kind, source, key in FL17_COLUMN_MAP:
+        if kind == 'index':
+            columns[header] = np.arange(start_index + 1, start_index + len(df) + 1)
+        elif source not in df.columns:
+            columns[header] = None
+        elif kind == 'yes_no':
+            columns[header] = np.where(df[source].notna() & df[source].astype(bool), 'yes', 'no')
+        elif kind == 'json':
+            if source not in expanded:
+                expanded[source] = expand_json_column(df[source], FL17_JSON_KEYS[source])
+            columns[header] = expanded[source][key]
+        else:
+            columns[header] = df[source]
+    
+    excel_df = pd.DataFrame(columns, index=df.index)
+    
+    # Missing values are written as empty cells
+    return excel_df.astype(object).where(excel_df.notna(), None)
+
+def parse_json_object(value):
+    """
+    Parse a JSON object stored as text.
+    
+    Args:
+        value: JSON string, dictionary or empty value
         
-        # Create the DataFrame for the Excel file
-        excel_df = pd.DataFrame(excel_data)
+    Returns:
+        dict: Parsed object, or an empty dict if the value is not a JSON object
+    """
+    if isinstance(value, dict):
+        return value
+    if value and isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+        except:
+            return {}
+        if isinstance(parsed, dict):
+            return parsed
+    return {}
+
+def parse_json_objects(values):
+    """
+    Parse a sequence of JSON objects stored as text in a single decoder call.
+    
+    The texts are joined into one JSON array so the C decoder parses the whole
+    column at once. If the batch does not decode to exactly one element per
+    value, every value is parsed on its own instead.
+    
+    Args:
+        values: JSON strings, dictionaries or empty values
         
-        # Write the headers and data to the Excel file
-        write_fl17_sheet(writer, excel_df, headers)
-    else:
-        # Create an empty DataFrame with the headers
-        headers = create_fl17_headers()
-        excel_df = pd.DataFrame(columns=headers)
-        write_fl17_sheet(writer, excel_df, headers)
+    Returns:
+        list: Parsed objects, an empty dict where a value is not a JSON object
+    """
+    # JSON document columns arrive already decoded
+    if not any(value.__class__ is str for value in values):
+        return [parse_json_object(value) for value in values]
+    texts = [value if value.__class__ is str and value else 'null' for value in values]
+    try:
+        parsed = json.loads('[' + ','.join(texts) + ']')
+    except ValueError:
+        parsed = None
+    if parsed is None or len(parsed) != len(texts):
+        return [parse_json_object(value) for value in values]
+    # Values that did not decode to an object (dicts, scalars) are handled one by one
+    return [
+        item if item.__class__ is dict else parse_json_object(value)
+        for item, value in zip(parsed, values)
+    ]
 
-def format_fl17_data_for_excel(df):
+def expand_json_column(series, keys):
     """
-    Format the QC CW Panel Data for the Excel file.
+    Parse a column of JSON objects once and expand the given keys into columns.
     
     Args:
-        df: DataFrame with QC CW Panel Data
+        series: Column of JSON strings or dictionaries
+        keys: Keys to extract
         
     Returns:
-        list: Data formatted for Excel
-    """
-    excel_data = []
-    
-    for idx, row in df.iterrows():
-        excel_row = {
-            'Index': idx + 1,
-            'pan #': row['pan_id'],
-            'Panel #': row['panel_name'],
-            'IPA cleaned': 'yes' if row['ipa_cleaned'] else 'no',
-            'Sealant Frame enough': 'yes' if row['sealant_frame_enough'] else 'no',
-            'Width-L (mm)': extract_json_value(row['width_l'], 'GZ_office'),
-            'Width-L factory': extract_json_value(row['width_l'], 'factory_floor'),
-            'Width-R (mm)': extract_json_value(row['width_r'], 'GZ_office'),
-            'Width-R factory': extract_json_value(row['width_r'], 'factory_floor'),
-            'Height 1 (mm)': extract_json_value(row['height_1'], 'GZ_office'),
-            'Height 1 factory': extract_json_value(row['height_1'], 'factory_floor'),
-            'Height 2 (mm)': extract_json_value(row['height_2'], 'GZ_office'),
-            'Height 2 factory': extract_json_value(row['height_2'], 'factory_floor'),
-            'Height 3 (mm)': extract_json_value(row['height_3'], 'GZ_office'),
-            'Height 3 factory': extract_json_value(row['height_3'], 'factory_floor'),
-            'Height 4 (mm)': extract_json_value(row['height_4'], 'GZ_office'),
-            'Height 4 factory': extract_json_value(row['height_4'], 'factory_floor'),
-            '# Cavities (in vert)': row['cavities_invert'],
-            'Cavity RO Height Total (mm)': extract_json_value(row['cavity_ro_height_total'], 'GZ_office'),
-            'Cavity RO Height Total factory': extract_json_value(row['cavity_ro_height_total'], 'factory_floor'),
-            'Cavity Diag CW Pan-L (mm)': extract_json_value(row['cavity_diag_cw_pan_l'], 'GZ_office'),
-            'Cavity Diag CW Pan-L factory': extract_json_value(row['cavity_diag_cw_pan_l'], 'factory_floor'),
-            'Cavity Diag CW Pan-R (mm)': extract_json_value(row['cavity_diag_cw_pan_r'], 'GZ_office'),
-            'Cavity Diag CW Pan-R factory': extract_json_value(row['cavity_diag_cw_pan_r'], 'factory_floor'),
-            'Left': extract_json_value(row['left'], 'GZ_office'),
-            'Left factory': extract_json_value(row['left'], 'factory_floor'),
-            'Middle': extract_json_value(row['middle'], 'GZ_office'),
-            'Middle factory': extract_json_value(row['middle'], 'factory_floor'),
-            'Right': extract_json_value(row['right'], 'GZ_office'),
-            'Right factory': extract_json_value(row['right'], 'factory_floor'),
-            'Head': extract_json_value(row['head'], 'GZ_office'),
-            'Head factory': extract_json_value(row['head'], 'factory_floor'),
-            'Sill': extract_json_value(row['sill'], 'GZ_office'),
-            'Sill factory': extract_json_value(row['sill'], 'factory_floor'),
-            'Trans-1': extract_json_value(row['trans_1'], 'GZ_office'),
-            'Trans-1 factory': extract_json_value(row['trans_1'], 'factory_floor'),
-            'Trans-2': extract_json_value(row['trans_2'], 'GZ_office'),
-            'Trans-2 factory': extract_json_value(row['trans_2'], 'factory_floor'),
-            'Trans-3': extract_json_value(row['trans_3'], 'GZ_office'),
-            'Trans-3 factory': extract_json_value(row['trans_3'], 'factory_floor'),
-            'Bracket-L': extract_json_value(row['bracket_l'], 'GZ_office'),
-            'Bracket-L factory': extract_json_value(row['bracket_l'], 'factory_floor'),
-            'Bracket-R': extract_json_value(row['bracket_r'], 'GZ_office'),
-            'Bracket-R factory': extract_json_value(row['bracket_r'], 'factory_floor'),
-            'Infill-FS-Location': extract_json_value(row['infill_fs_location'], 'GZ_office'),
-            'Infill-FS-Location factory': extract_json_value(row['infill_fs_location'], 'factory_floor'),
-            'Infill 1 Type': extract_json_value(row['infills_1_type'], 'GZ_office'),
-            'Infill 1 Type 2': extract_json_value(row['infills_1_type'], 'GZ_office_2'),
-            'Infill 1 factory': extract_json_value(row['infills_1_type'], 'factory_floor'),
-            'Infill 1 Color': extract_json_value(row['infills_1_color'], 'GZ_office'),
-            'Infill 1 Color factory': extract_json_value(row['infills_1_color'], 'factory_floor'),
-            'Infill 2 Type': extract_json_value(row['infills_2_type'], 'GZ_office'),
-            'Infill 2 Type 2': extract_json_value(row['infills_2_type'], 'GZ_office_2'),
-            'Infill 2 factory': extract_json_value(row['infills_2_type'], 'factory_floor'),
-            'Infill 2 Color': extract_json_value(row['infills_2_color'], 'GZ_office'),
-            'Infill 2 Color factory': extract_json_value(row['infills_2_color'], 'factory_floor'),
-            'Infill 3 Type': extract_json_value(row['infills_3_type'], 'GZ_office'),
-            'Infill 3 Type 2': extract_json_value(row['infills_3_type'], 'GZ_office_2'),
-            'Infill 3 factory': extract_json_value(row['infills_3_type'], 'factory_floor'),
-            'Infill 3 Color': extract_json_value(row['infills_3_color'], 'GZ_office'),
-            'Infill 3 Color factory': extract_json_value(row['infills_3_color'], 'factory_floor'),
-            'Infill 4 Type': extract_json_value(row['infills_4_type'], 'GZ_office'),
-            'Infill 4 Type 2': extract_json_value(row['infills_4_type'], 'GZ_office_2'),
-            'Infill 4 factory': extract_json_value(row['infills_4_type'], 'factory_floor'),
-            'Infill 4 Color': extract_json_value(row['infills_4_color'], 'GZ_office'),
-            'Infill 4 Color factory': extract_json_value(row['infills_4_color'], 'factory_floor'),
-            'Right Infill 1 Type': extract_json_value(row['infills_right_1_type'], 'GZ_office'),
-            'Right Infill 1 Type 2': extract_json_value(row['infills_right_1_type'], 'GZ_office_2'),
-            'Right Infill 1 factory': extract_json_value(row['infills_right_1_type'], 'factory_floor'),
-            'Right Infill 1 Color': extract_json_value(row['infills_right_1_color'], 'GZ_office'),
-            'Right Infill 1 Color factory': extract_json_value(row['infills_right_1_color'], 'factory_floor'),
-            'Right Infill 2 Type': extract_json_value(row['infills_right_2_type'], 'GZ_office'),
-            'Right Infill 2 Type 2': extract_json_value(row['infills_right_2_type'], 'GZ_office_2'),
-            'Right Infill 2 factory': extract_json_value(row['infills_right_2_type'], 'factory_floor'),
-            'Right Infill 2 Color': extract_json_value(row['infills_right_2_color'], 'GZ_office'),
-            'Right Infill 2 Color factory': extract_json_value(row['infills_right_2_color'], 'factory_floor'),
-            'Right Infill 3 Type': extract_json_value(row['infills_right_3_type'], 'GZ_office'),
-            'Right Infill 3 Type 2': extract_json_value(row['infills_right_3_type'], 'GZ_office_2'),
-            'Right Infill 3 factory': extract_json_value(row['infills_right_3_type'], 'factory_floor'),
-            'Right Infill 3 Color': extract_json_value(row['infills_right_3_color'], 'GZ_office'),
-            'Right Infill 3 Color factory': extract_json_value(row['infills_right_3_color'], 'factory_floor'),
-            'Right Infill 4 Type': extract_json_value(row['infills_right_4_type'], 'GZ_office'),
-            'Right Infill 4 Type 2': extract_json_value(row['infills_right_4_type'], 'GZ_office_2'),
-            'Right Infill 4 factory': extract_json_value(row['infills_right_4_type'], 'factory_floor'),
-            'Right Infill 4 Color': extract_json_value(row['infills_right_4_color'], 'GZ_office'),
-            'Right Infill 4 Color factory': extract_json_value(row['infills_right_4_color'], 'factory_floor'),
-            'QC Infill Affix': row['qc_infill_affix'],
-            'Structural Sealant Records': row['structural_sealant_records'],
-            'L/M/R': row['lmr'],
-            'Type 1': extract_json_value(row['type_gz_factory'], 'GZ_office'),
-            'Type 1 factory': extract_json_value(row['type_gz_factory'], 'factory_floor'),
-            'Type 2': extract_json_value(row['isa_type'], 'GZ_office'),
-            'Type 2 factory': extract_json_value(row['isa_type'], 'factory_floor'),
-            'Edge Bead Attached': 'yes' if row['edge_bead_attached'] else 'no',
-            'Operable': 'yes' if row['operable'] else 'no',
-            'Card Checked': row['card_checked'],
-            'Paint Damage': row['paint_damage'],
-            'Glass Scratched': row['glass_scratched'],
-            'Cleaned Ready': row['cleaned_ready'],
-            'Crated': 'yes' if row['crated'] else 'no'
-        }
-        excel_data.append(excel_row)
-    
-    return excel_data
+        DataFrame: One column per key, aligned with the series index
+    """
+    records = parse_json_objects(series.tolist())
+    return pd.DataFrame({
+        key: pd.Series([record.get(key) for record in records], index=series.index, dtype=object)
+        for key in keys
+    }, index=series.index)
 
 def extract_json_value(json_data, key):
     """
@@ -320,272 +453,279 @@ def create_fl17_headers():
     Returns:
         list: Headers for the Fl-17 sheet
     """
-    # These headers should match the headers from row 15 in the reference file
-    headers = [
-        'Index', 'pan #', 'Panel #', 
-        'IPA cleaned', 'Sealant Frame enough',
-        'Width-L (mm)', 'Width-L factory',
-        'Width-R (mm)', 'Width-R factory',
-        'Height 1 (mm)', 'Height 1 factory',
-        'Height 2 (mm)', 'Height 2 factory',
-        'Height 3 (mm)', 'Height 3 factory',
-        'Height 4 (mm)', 'Height 4 factory',
-        '# Cavities (in vert)',
-        'Cavity RO Height Total (mm)', 'Cavity RO Height Total factory',
-        'Cavity Diag CW Pan-L (mm)', 'Cavity Diag CW Pan-L factory',
-        'Cavity Diag CW Pan-R (mm)', 'Cavity Diag CW Pan-R factory',
-        'Left', 'Left factory',
-        'Middle', 'Middle factory',
-        'Right', 'Right factory',
-        'Head', 'Head factory',
-        'Sill', 'Sill factory',
-        'Trans-1', 'Trans-1 factory',
-        'Trans-2', 'Trans-2 factory',
-        'Trans-3', 'Trans-3 factory',
-        'Bracket-L', 'Bracket-L factory',
-        'Bracket-R', 'Bracket-R factory',
-        'Infill-FS-Location', 'Infill-FS-Location factory',
-        'Infill 1 Type', 'Infill 1 Type 2', 'Infill 1 factory', 'Infill 1 Color', 'Infill 1 Color factory',
-        'Infill 2 Type', 'Infill 2 Type 2', 'Infill 2 factory', 'Infill 2 Color', 'Infill 2 Color factory',
-        'Infill 3 Type', 'Infill 3 Type 2', 'Infill 3 factory', 'Infill 3 Color', 'Infill 3 Color factory',
-        'Infill 4 Type', 'Infill 4 Type 2', 'Infill 4 factory', 'Infill 4 Color', 'Infill 4 Color factory',
-        'Right Infill 1 Type', 'Right Infill 1 Type 2', 'Right Infill 1 factory', 'Right Infill 1 Color', 'Right Infill 1 Color factory',
-        'Right Infill 2 Type', 'Right Infill 2 Type 2', 'Right Infill 2 factory', 'Right Infill 2 Color', 'Right Infill 2 Color factory',
-        'Right Infill 3 Type', 'Right Infill 3 Type 2', 'Right Infill 3 factory', 'Right Infill 3 Color', 'Right Infill 3 Color factory',
-        'Right Infill 4 Type', 'Right Infill 4 Type 2', 'Right Infill 4 factory', 'Right Infill 4 Color', 'Right Infill 4 Color factory',
-        'QC Infill Affix', 'Structural Sealant Records', 'L/M/R',
-        'Type 1', 'Type 1 factory', 'Type 2', 'Type 2 factory',
-        'Edge Bead Attached', 'Operable', 'Card Checked', 'Paint Damage', 'Glass Scratched', 'Cleaned Ready', 'Crated'
-    ]
-    return headers
+    # These headers match the headers from row 15 in the reference file
+    return [header for header, _, _, _ in FL17_COLUMN_MAP]
 
-def write_fl17_sheet(writer, df, headers):
+def write_fl17_header_rows(worksheet, headers):
     """
-    Write the Fl-17 sheet to the Excel file.
+    Write the title, description and header rows of the Fl-17 sheet.
+    Data rows follow from row 9.
     
     Args:
-        writer: Excel writer
-        df: DataFrame with data
+        worksheet: Write-only worksheet
         headers: Headers for the sheet
     """
-    # Create the sheet
-    sheet_name = 'Fl-17'
-    df.to_excel(writer, sheet_name=sheet_name, index=False, header=True)
-    
-    # Get the workbook and worksheet
-    workbook = writer.book
-    worksheet = writer.sheets[sheet_name]
-    
-    # Add title row at the top
-    worksheet.cell(row=1, column=1, value='QC CW Panel Data')
+    # Column widths must be set before the first row of a write-only sheet
+    for col_num, _ in enumerate(headers, 1):
+        worksheet.column_dimensions[get_column_letter(col_num)].width = 15
     
-    # Add the header rows
+    # Row 1: Title
+    worksheet.append(['QC CW Panel Data'])
     # Row 2: Production Step categories
-    worksheet.cell(row=2, column=1, value='Production Step')
-    worksheet.cell(row=2, column=3, value='CW Frame Assembly')
-    worksheet.cell(row=2, column=5, value='CW Frame assembled')
-    
+    worksheet.append(['Production Step', None, 'CW Frame Assembly', None, 'CW Frame assembled'])
     # Row 3: Index label
-    worksheet.cell(row=3, column=1, value='Index')
-    
+    worksheet.append(['Index'])
     # Row 4: IT Work note
-    worksheet.cell(row=4, column=1, value='IT Work: simple look up, concatenation, etc….')
-    
+    worksheet.append(['IT Work: simple look up, concatenation, etc….'])
     # Row 5: Input type - GZ office
-    worksheet.cell(row=5, column=1, value='Input-GZ office')
-    
+    worksheet.append(['Input-GZ office'])
     # Row 6: Input type - Factory floor
-    worksheet.cell(row=6, column=1, value='Input-Factory floor')
-    
-    # Format the sheet to match the reference file
-    for col_num, column_title in enumerate(headers, 1):
-        worksheet.cell(row=8, column=col_num, value=column_title)
-    
-    # Adjust column widths
-    for col_num, _ in enumerate(headers, 1):
-        worksheet.column_dimensions[get_column_letter(col_num)].width = 15
+    worksheet.append(['Input-Factory floor'])
+    # Row 7: Spacer
+    worksheet.append([])
+    # Row 8: Column headers matching the reference file
+    worksheet.append(headers)
+
+def format_json_cell(value):
+    """
+    Render a JSON text column as a single cell value.
     
-    # Start data from row 9
-    for row_num, row_data in enumerate(df.values.tolist(), 9):
-        for col_num, cell_value in enumerate(row_data, 1):
-            worksheet.cell(row=row_num, column=col_num, value=cell_value)
+    Args:
+        value: JSON string, dict, list or plain value
+        
+    Returns:
+        Cell value with dict/list members joined by commas
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except:
+            return value
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return ', '.join(str(item) for item in value if item not in (None, ''))
+    return value
 
-def export_str_seal_sheet(db_session: Session, writer):
+def export_str_seal_sheet(db_session: Session, worksheet):
     """
     Export Structural Sealant data to Str Seal sheet.
     
     Args:
         db_session: SQLAlchemy database session
-        writer: Excel writer
-    """
-    # Create a simple sheet with headers if we don't have real data yet
-    pd.DataFrame({
-        'Panel #': [],
-        'Structural Sealant': [],
-        'Date': [],
-        'Time': []
-    }).to_excel(writer, sheet_name='Str Seal', index=False)
-    # Query the database to get structural sealant data
-    query = text("""
-        SELECT DISTINCT 
-            structural_sealant_records,
-            panels_glazed,
-            date_glazed,
-            time_glazed
-        FROM qc_reports
-        WHERE structural_sealant_records IS NOT NULL
-        ORDER BY date_glazed DESC, time_glazed DESC
-    """)
-    
-    # Execute the query
-    result = db_session.execute(query)
-    records = result.fetchall()
-    
-    # Convert the results to a list of dictionaries
-    data = []
-    for record in records:
-        data.append(dict(record))
-    
-    # Create a DataFrame from the data
-    df = pd.DataFrame(data) if data else pd.DataFrame(columns=[
-        'structural_sealant_records', 'panels_glazed', 'date_glazed', 'time_glazed'
-    ])
-    
-    # Rename the columns to match the reference file
-    if not df.empty:
-        df.rename(columns={
-            'structural_sealant_records': 'StrS Batch #',
-            'panels_glazed': 'Panels Glazed',
-            'date_glazed': 'Date Glazed',
-            'time_glazed': 'Time Glazed'
-        }, inplace=True)
-        
-        # Add empty columns for Catalyst Batch #, Primer C, and Photo
-        df['Catalyst Batch #'] = ''
-        df['Primer C'] = ''
-        df['Photo of the paper record as a reference'] = ''
-        
-        # Reorder columns to match reference file
-        df = df[[
-            'StrS Batch #', 'Catalyst Batch #', 'Primer C', 
-            'Panels Glazed', 'Date Glazed', 'Time Glazed',
-            'Photo of the paper record as a reference'
-        ]]
-    else:
-        # Create an empty DataFrame with the headers
-        df = pd.DataFrame(columns=[
-            'StrS Batch #', 'Catalyst Batch #', 'Primer C', 
-            'Panels Glazed', 'Date Glazed', 'Time Glazed',
-            'Photo of the paper record as a reference'
-        ])
-    
-    # Write the DataFrame to the Excel file
-    sheet_name = 'Str Seal'
-    df.to_excel(writer, sheet_name=sheet_name, index=False)
-    
-    # Get the worksheet
-    worksheet = writer.sheets[sheet_name]
+        worksheet: Write-only worksheet
+    """
+    for col_num in range(1, 8):
+        worksheet.column_dimensions[get_column_letter(col_num)].width = 20
     
     # Add title and description rows
-    worksheet.insert_rows(0, 7)
-    worksheet.cell(row=1, column=1, value='Structural Sealant Records')
-    worksheet.cell(row=3, column=1, value='Structural Sealant Batch Numbers (both large drum and smaller activator) as well as the barrel and small barrel number from that batch')
-    worksheet.cell(row=4, column=1, value='Which panels were glazed with that Batch-Barrel')
-    worksheet.cell(row=6, column=1, value='Add in the sheets from the factory. ')
-    worksheet.cell(row=7, column=1, value='The factory produces a daily report, AM, PM, Night and lists the CW panels glazed')
-    
+    worksheet.append(['Structural Sealant Records'])
+    worksheet.append([])
+    worksheet.append(['Structural Sealant Batch Numbers (both large drum and smaller activator) as well as the barrel and small barrel number from that batch'])
+    worksheet.append(['Which panels were glazed with that Batch-Barrel'])
+    worksheet.append([])
+    worksheet.append(['Add in the sheets from the factory. '])
+    worksheet.append(['The factory produces a daily report, AM, PM, Night and lists the CW panels glazed'])
+    worksheet.append(STR_SEAL_HEADERS)
     # Add second header row
-    worksheet.insert_rows(9, 1)
-    worksheet.cell(row=9, column=1, value='Batch #')
-    worksheet.cell(row=9, column=2, value='# of 30')
-    worksheet.cell(row=9, column=3, value='Batch #')
-    worksheet.cell(row=9, column=4, value='# of 30')
-    worksheet.cell(row=9, column=5, value='Lot #')
-    
-    # Adjust column widths
-    for col_num in range(1, 8):
-        worksheet.column_dimensions[get_column_letter(col_num)].width = 20
+    worksheet.append(['Batch #', '# of 30', 'Batch #', '# of 30', 'Lot #'])
+    
+    table = QCReport.__table__
+    statement = select(
+        table.c.strs_batch,
+        table.c.catalyst_batch,
+        table.c.primer_c,
+        table.c.panels_glazed,
+        table.c.date_glazed,
+        table.c.time_glazed
+    ).order_by(table.c.date_glazed.desc(), table.c.time_glazed.desc())
+    
+    for _, rows in stream_query(db_session, statement):
+        for row in rows:
+            worksheet.append([
+                format_json_cell(row.strs_batch),
+                format_json_cell(row.catalyst_batch),
+                format_json_cell(row.primer_c),
+                row.panels_glazed,
+                row.date_glazed,
+                row.time_glazed,
+                ''
+            ])
 
-def export_inventory_sheet(db_session: Session, writer):
+def export_inventory_sheet(db_session: Session, worksheet):
     """
     Export inventory data to Adm-Extrus,Infills sheet.
     
     Args:
         db_session: SQLAlchemy database session
-        writer: Excel writer
-    """
-    # Create a simple sheet with headers if we don't have real data yet
-    pd.DataFrame({
-        'Die # (PF)': [],
-        'Die Name': [],
-        'Description': [],
-        'Type (e.g. Mullion)': [],
-        'Coating Color': []
-    }).to_excel(writer, sheet_name='Adm-Extrus,Infills', index=False)
-    # Query the database to get product parts data
-    query = text("""
-        SELECT 
-            product_part_id,
-            product_part_name,
-            description,
-            part_type,
-            coating_color
-        FROM product_parts
-        ORDER BY product_part_id
-    """)
-    
-    # Execute the query
-    result = db_session.execute(query)
-    records = result.fetchall()
-    
-    # Convert the results to a list of dictionaries
-    data = []
-    for record in records:
-        data.append(dict(record))
-    
-    # Create a DataFrame from the data
-    df = pd.DataFrame(data) if data else pd.DataFrame(columns=[
-        'product_part_id', 'product_part_name', 'description', 'part_type', 'coating_color'
-    ])
+        worksheet: Write-only worksheet
+    """
+    for col_num in range(1, 15):
+        worksheet.column_dimensions[get_column_letter(col_num)].width = 18
     
-    # Rename the columns to match the reference file
-    if not df.empty:
-        df.rename(columns={
-            'product_part_id': 'Die # (PF)',
-            'product_part_name': 'Die Name',
-            'description': 'Description',
-            'part_type': 'Type (e.g. Mullion)',
-            'coating_color': 'Coating Color'
-        }, inplace=True)
-    else:
-        # Create an empty DataFrame with the headers
-        df = pd.DataFrame(columns=[
-            'Die # (PF)', 'Die Name', 'Description', 'Type (e.g. Mullion)', 'Coating Color'
+    # Add title and description rows
+    worksheet.append(['Extrusions & Infills Inventory'])
+    worksheet.append([])
+    worksheet.append(['Process:'])
+    worksheet.append(['For each CW Panel on each floor give the following items'])
+    worksheet.append(['Panel #, Mullion left & right, Color/coating each mullion'])
+    worksheet.append(['Dimension opening width and each opening height'])
+    worksheet.append([])
+    worksheet.append([])
+    # Add the Glass header
+    worksheet.append(['Glass: ', 'Spandral, Vision'])
+    worksheet.append(INVENTORY_HEADERS)
+    
+    for part, colors in iter_product_parts_with_colors(db_session):
+        worksheet.append([
+            part.product_part_id,
+            part.product_part_name,
+            part.product_part_vendor,
+            part.product_part_type,
+            ', '.join(colors)
         ])
+
+def iter_product_parts_with_colors(db_session: Session):
+    """
+    Stream product parts ordered by die number together with their coating color names.
     
-    # Write the DataFrame to the Excel file
-    sheet_name = 'Adm-Extrus,Infills'
-    df.to_excel(writer, sheet_name=sheet_name, index=False)
+    Args:
+        db_session: SQLAlchemy database session
+        
+    Yields:
+        tuple: (part row, list of coating color names)
+    """
+    # One row per part and coating color, ordered so colors of a part are adjacent
+    statement = select(
+        ProductPart.id,
+        ProductPart.product_part_id,
+        ProductPart.product_part_name,
+        ProductPart.product_part_vendor,
+        ProductPart.product_part_type,
+        CoatingColor.coating_color_name
+    ).outerjoin(
+        ProductColor, ProductColor.product_part_id == ProductPart.id
+    ).outerjoin(
+        CoatingColor, CoatingColor.id == ProductColor.coating_color_id
+    ).order_by(ProductPart.product_part_id, ProductPart.id, CoatingColor.coating_color_name)
+    
+    # Group over the flattened stream so a part split across chunks stays together
+    rows = chain.from_iterable(chunk for _, chunk in stream_query(db_session, statement))
+    for _, part_rows in groupby(rows, key=lambda row: row.id):
+        part_rows = list(part_rows)
+        yield part_rows[0], [row.coating_color_name for row in part_rows if row.coating_color_name]
+
+def excel_value(value):
+    """
+    Convert a database value into a value openpyxl can write.
     
-    # Get the worksheet
-    worksheet = writer.sheets[sheet_name]
+    Args:
+        value: Database value
+        
+    Returns:
+        Value with timezone information removed from datetimes
+    """
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None)
+    return value
+
+def write_table_header(worksheet, headers, width=20):
+    """
+    Set column widths and write the header row of a simple table sheet.
     
-    # Add title and description rows
-    worksheet.insert_rows(0, 8)
-    worksheet.cell(row=1, column=1, value='Extrusions & Infills Inventory')
-    worksheet.cell(row=3, column=1, value='Process:')
-    worksheet.cell(row=4, column=1, value='For each CW Panel on each floor give the following items')
-    worksheet.cell(row=5, column=1, value='Panel #, Mullion left & right, Color/coating each mullion')
-    worksheet.cell(row=6, column=1, value='Dimension opening width and each opening height')
+    Args:
+        worksheet: Write-only worksheet
+        headers: Column headers
+        width: Column width
+    """
+    for col_num, _ in enumerate(headers, 1):
+        worksheet.column_dimensions[get_column_letter(col_num)].width = width
+    worksheet.append(headers)
+
+def export_product_parts_sheet(db_session: Session, worksheet):
+    """
+    Export product parts to the Product Parts sheet.
     
-    # Add the Glass header
-    worksheet.insert_rows(9, 1)
-    worksheet.cell(row=9, column=1, value='Glass: ')
-    worksheet.cell(row=9, column=2, value='Spandral, Vision')
+    Args:
+        db_session: SQLAlchemy database session
+        worksheet: Write-only worksheet
+    """
+    write_table_header(worksheet, ['Product Part ID', 'Name', 'Description', 'Part Type', 'Coating Color'])
+    for part, colors in iter_product_parts_with_colors(db_session):
+        worksheet.append([
+            part.product_part_id,
+            part.product_part_name,
+            part.product_part_vendor,
+            part.product_part_type,
+            ', '.join(colors)
+        ])
+
+def export_coating_colors_sheet(db_session: Session, worksheet):
+    """
+    Export coating colors to the Coating Colors sheet.
     
-    # Adjust column widths
-    for col_num in range(1, 15):
-        worksheet.column_dimensions[get_column_letter(col_num)].width = 18
+    Args:
+        db_session: SQLAlchemy database session
+        worksheet: Write-only worksheet
+    """
+    write_table_header(worksheet, ['ID', 'Color Name', 'Created At'])
+    statement = select(
+        CoatingColor.id,
+        CoatingColor.coating_color_name,
+        CoatingColor.created_at
+    ).order_by(CoatingColor.coating_color_name)
+    
+    for _, rows in stream_query(db_session, statement):
+        for row in rows:
+            worksheet.append([row.id, row.coating_color_name, excel_value(row.created_at)])
+
+def export_qc_reports_sheet(db_session: Session, worksheet):
+    """
+    Export QC reports to the QC Reports sheet.
+    
+    Args:
+        db_session: SQLAlchemy database session
+        worksheet: Write-only worksheet
+    """
+    write_table_header(worksheet, [
+        'Report ID', 'Panels Glazed', 'Date Glazed', 'Time Glazed',
+        'StrS Batch #', 'Catalyst Batch #', 'Primer C', 'Number of Items',
+        'Created At', 'Updated At'
+    ])
+    table = QCReport.__table__
+    statement = select(
+        table.c.report_id,
+        table.c.panels_glazed,
+        table.c.date_glazed,
+        table.c.time_glazed,
+        table.c.strs_batch,
+        table.c.catalyst_batch,
+        table.c.primer_c,
+        table.c.batch_items,
+        table.c.created_at,
+        table.c.updated_at
+    ).order_by(table.c.created_at.desc())
+    
+    for _, rows in stream_query(db_session, statement):
+        for row in rows:
+            batch_items = row.batch_items
+            if isinstance(batch_items, str):
+                try:
+                    batch_items = json.loads(batch_items)
+                except:
+                    batch_items = []
+            worksheet.append([
+                row.report_id,
+                row.panels_glazed,
+                row.date_glazed,
+                row.time_glazed,
+                format_json_cell(row.strs_batch),
+                format_json_cell(row.catalyst_batch),
+                format_json_cell(row.primer_c),
+                len(batch_items) if isinstance(batch_items, list) else 0,
+                excel_value(row.created_at),
+                excel_value(row.updated_at)
+            ])
 
 def get_column_letter(col_num):
     """
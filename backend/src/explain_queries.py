@@ -0,0 +1,91 @@
+"""
+Check the query plans of the QC CW panel lookups.
+Runs EXPLAIN for the floor listing, the (fl_id, pan_id) lookup and the
+ordering used by the list endpoint and the Fl-17 export. Each check fails
+if the plan does not use the unique (fl_id, pan_id) index or still sorts.
+Works on PostgreSQL and SQLite; on PostgreSQL sequential scans are disabled
+for the checks so small tables still show whether the index can serve them.
+
+Usage: python explain_queries.py [fl_id] [pan_id]
+"""
+import sys
+
+from sqlalchemy import select, text
+
+from app import app, db
+from models import QCCWPanelData
+
+PANEL_KEY_INDEX = "uq_qc_cw_panel_data_fl_pan"
+
+def panel_queries(fl_id, pan_id):
+    """
+    Build the statements to check.
+
+    Args:
+        fl_id: Floor ID used in the filters
+        pan_id: Panel ID used in the filters
+
+    Returns:
+        list: (name, statement) pairs
+    """
+    table = QCCWPanelData.__table__
+    columns = [table.c.id, table.c.fl_id, table.c.pan_id, table.c.pan_name]
+    return [
+        ("floor listing", select(*columns).where(table.c.fl_id == fl_id).order_by(table.c.pan_id)),
+        ("panel lookup", select(*columns).where(table.c.fl_id == fl_id, table.c.pan_id == pan_id)),
+        ("ordered list / Fl-17 export", select(*columns).order_by(table.c.fl_id, table.c.pan_id)),
+    ]
+
+def explain(connection, statement):
+    """
+    Get the query plan of a statement.
+
+    Args:
+        connection: SQLAlchemy connection
+        statement: Select statement
+
+    Returns:
+        list: Plan lines
+    """
+    dialect = connection.dialect.name
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if dialect == "sqlite":
+        return [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return [row[0] for row in connection.execute(text(f"EXPLAIN {sql}"))]
+
+def check_plan(plan):
+    """
+    Check that a plan uses the panel key index and needs no sort.
+
+    Args:
+        plan: Plan lines
+
+    Returns:
+        list: Problems found, empty when the plan is fine
+    """
+    problems = []
+    joined = "\n".join(plan)
+    if PANEL_KEY_INDEX not in joined:
+        problems.append(f"does not use {PANEL_KEY_INDEX}")
+    if "TEMP B-TREE" in joined or any(line.strip().startswith(("Sort", "->  Sort")) for line in plan):
+        problems.append("sorts rows instead of reading them in index order")
+    return problems
+
+if __name__ == "__main__":
+    fl_id = sys.argv[1] if len(sys.argv) > 1 else "17"
+    pan_id = sys.argv[2] if len(sys.argv) > 2 else "1"
+    failures = 0
+    with app.app_context():
+        with db.engine.connect() as connection:
+            if connection.dialect.name == "postgresql":
+                connection.execute(text("SET enable_seqscan = off"))
+            for name, statement in panel_queries(fl_id, pan_id):
+                plan = explain(connection, statement)
+                problems = check_plan(plan)
+                print(f"{'FAIL' if problems else 'ok  '} {name}")
+                for line in plan:
+                    print(f"       {line}")
+                for problem in problems:
+                    print(f"       -> {problem}")
+                failures += bool(problems)
+    sys.exit(1 if failures else 0)
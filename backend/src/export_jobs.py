@@ -0,0 +1,238 @@
+"""
+Asynchronous export jobs for the QC Management System.
+Excel exports are built by a local thread pool and written to an artifact
+directory. Requests for the same export against unchanged data reuse the
+artifact of an earlier job, keyed by a fingerprint of the data version.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from excel_export import (
+    export_qc_cw_panel_data_to_excel, export_product_parts_to_excel,
+    export_coating_colors_to_excel, export_qc_reports_to_excel
+)
+from models import db, ExportJob, QCCWPanelData, QCReport, ProductPart, ProductColor, CoatingColor
+
+logger = logging.getLogger(__name__)
+
+# Export builders with their download file name prefix and the tables they read
+EXPORT_TYPES = {
+    "qc-cw-panel-data": {
+        "builder": export_qc_cw_panel_data_to_excel,
+        "filename": "QC_CW_Panel_Data",
+        "sources": [QCCWPanelData, QCReport, ProductPart, ProductColor, CoatingColor]
+    },
+    "product-parts": {
+        "builder": export_product_parts_to_excel,
+        "filename": "Product_Parts",
+        "sources": [ProductPart, ProductColor, CoatingColor]
+    },
+    "coating-colors": {
+        "builder": export_coating_colors_to_excel,
+        "filename": "Coating_Colors",
+        "sources": [CoatingColor]
+    },
+    "qc-reports": {
+        "builder": export_qc_reports_to_excel,
+        "filename": "QC_Reports",
+        "sources": [QCReport]
+    }
+}
+
+# Queued or running jobs older than this are treated as abandoned
+STALE_JOB_AGE = timedelta(hours=1)
+
+
+def data_version(db_session, models):
+    """
+    Compute a version string for the rows of the given tables in one query.
+    Inserts and deletes change the row count or highest id, updates change the
+    latest updated_at timestamp, so every source model needs an updated_at
+    column set on update.
+
+    Args:
+        db_session: SQLAlchemy database session
+        models: Model classes to version
+
+    Returns:
+        str: Version of the data in the tables
+    """
+    columns = []
+    for model in models:
+        columns.append(select(func.count()).select_from(model).scalar_subquery())
+        columns.append(select(func.max(model.id)).scalar_subquery())
+        columns.append(select(func.max(model.updated_at)).scalar_subquery())
+    values = db_session.execute(select(*columns)).one()
+    return "|".join(str(value) for value in values)
+
+
+class ExportJobQueue:
+    """
+    Local worker pool that builds export artifacts in the background.
+    Job state is stored in the export_jobs table, so any worker process can
+    report status and serve downloads when the artifact directory is shared.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.executor = None
+        self.artifact_dir = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configure the queue from the app config.
+
+        Args:
+            app: Flask application
+        """
+        self.app = app
+        self.artifact_dir = app.config.get("EXPORT_ARTIFACT_DIR") or os.path.join(tempfile.gettempdir(), "qc_exports")
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        self.executor = ThreadPoolExecutor(
+            max_workers=app.config.get("EXPORT_WORKERS", 2),
+            thread_name_prefix="export"
+        )
+
+    def fingerprint(self, db_session, export_type):
+        """
+        Fingerprint an export by its type and the version of its source data.
+
+        Args:
+            db_session: SQLAlchemy database session
+            export_type: Key of EXPORT_TYPES
+
+        Returns:
+            str: SHA-256 hex digest
+        """
+        version = data_version(db_session, EXPORT_TYPES[export_type]["sources"])
+        return hashlib.sha256(f"{export_type}:{version}".encode("utf-8")).hexdigest()
+
+    def submit(self, db_session, export_type, user_id=None):
+        """
+        Create an export job, or return an existing one for identical data.
+
+        Args:
+            db_session: SQLAlchemy database session
+            export_type: Key of EXPORT_TYPES
+            user_id: ID of the requesting user
+
+        Returns:
+            tuple: (ExportJob, True if a new job was queued)
+        """
+        fingerprint = self.fingerprint(db_session, export_type)
+        stale_before = datetime.now(timezone.utc) - STALE_JOB_AGE
+
+        candidates = db_session.query(ExportJob).filter(
+            ExportJob.fingerprint == fingerprint,
+            ExportJob.status.in_(["queued", "running", "completed"])
+        ).order_by(ExportJob.created_at.desc()).all()
+        for job in candidates:
+            if job.status == "completed" and job.file_path and os.path.exists(job.file_path):
+                return job, False
+            if job.status in ("queued", "running") and as_utc(job.created_at) > stale_before:
+                return job, False
+
+        job = ExportJob(
+            id=str(uuid.uuid4()),
+            export_type=export_type,
+            fingerprint=fingerprint,
+            status="queued",
+            created_by=user_id,
+            created_at=datetime.now(timezone.utc)
+        )
+        db_session.add(job)
+        db_session.commit()
+
+        self.executor.submit(self._run, job.id)
+        return job, True
+
+    def _run(self, job_id):
+        """
+        Build the artifact of a job in a worker thread.
+
+        Args:
+            job_id: ID of the ExportJob
+        """
+        with self.app.app_context():
+            try:
+                job = db.session.get(ExportJob, job_id)
+                if job is None:
+                    return
+                job.status = "running"
+                job.started_at = datetime.now(timezone.utc)
+                db.session.commit()
+
+                export = EXPORT_TYPES[job.export_type]
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                file_path = os.path.join(self.artifact_dir, f"{job.fingerprint}.xlsx")
+                temp_path = f"{file_path}.{job.id}.tmp"
+
+                # Write to a temporary file first so readers never see a partial artifact
+                with open(temp_path, "wb") as output:
+                    export["builder"](db.session, output)
+                os.replace(temp_path, file_path)
+
+                job.status = "completed"
+                job.file_path = file_path
+                job.filename = f"{export['filename']}_{timestamp}.xlsx"
+                job.finished_at = datetime.now(timezone.utc)
+                db.session.commit()
+
+                self._prune_artifacts(job)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Export job {job_id} failed: {str(e)}")
+                job = db.session.get(ExportJob, job_id)
+                if job is not None:
+                    job.status = "failed"
+                    job.error = str(e)
+                    job.finished_at = datetime.now(timezone.utc)
+                    db.session.commit()
+            finally:
+                db.session.remove()
+
+    def _prune_artifacts(self, job):
+        """
+        Delete artifacts of older jobs of the same type, whose data is now outdated.
+
+        Args:
+            job: The job that just completed
+        """
+        outdated = db.session.query(ExportJob).filter(
+            ExportJob.export_type == job.export_type,
+            ExportJob.fingerprint != job.fingerprint,
+            ExportJob.file_path.isnot(None)
+        ).all()
+        for old_job in outdated:
+            try:
+                if os.path.exists(old_job.file_path):
+                    os.remove(old_job.file_path)
+            except OSError as e:
+                logger.warning(f"Could not remove export artifact {old_job.file_path}: {str(e)}")
+            old_job.file_path = None
+        db.session.commit()
+
+
+def as_utc(value):
+    """
+    Treat naive datetimes read back from the database as UTC.
+
+    Args:
+        value: datetime or None
+
+    Returns:
+        datetime: Timezone-aware datetime
+    """
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
@@ -0,0 +1,67 @@
+"""
+Generate thumbnail and medium renditions for images already in the blob store.
+Images uploaded after renditions were introduced are processed automatically;
+this command backfills the rest. Images that already have every rendition are skipped.
+
+Usage:
+    python generate_renditions.py [--sizes thumb,medium] [--format webp|jpeg] [--limit N]
+"""
+import argparse
+import sys
+
+from app import app, db
+from image_renditions import RENDITION_FORMATS, RENDITION_SIZES, complete_source_keys, generate_renditions, iter_image_keys
+
+
+def backfill_renditions(sizes=None, image_format="webp", limit=None):
+    """
+    Generate missing renditions for all stored images.
+
+    Args:
+        sizes: Rendition names, all of RENDITION_SIZES by default
+        image_format: Key of RENDITION_FORMATS
+        limit: Maximum number of images to process
+
+    Returns:
+        int: Number of renditions generated
+    """
+    complete = complete_source_keys(db.session, sizes, image_format)
+    processed = 0
+    generated = 0
+    for source_key in iter_image_keys(db.session):
+        if source_key in complete:
+            continue
+        try:
+            generated += generate_renditions(db.session, source_key, image_format, sizes)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error generating renditions for {source_key}: {str(e)}")
+        processed += 1
+        if processed % 100 == 0:
+            print(f"  {processed} images processed, {generated} renditions generated")
+        if limit and processed >= limit:
+            break
+    print(f"{processed} images processed, {generated} renditions generated")
+    return generated
+
+
+def main():
+    """Entry point for the rendition backfill command."""
+    parser = argparse.ArgumentParser(description="Generate missing image renditions")
+    parser.add_argument("--sizes", type=str, default=",".join(RENDITION_SIZES), help="Comma separated rendition names")
+    parser.add_argument("--format", type=str, default=None, choices=list(RENDITION_FORMATS), help="Output format")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of images to process")
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in RENDITION_SIZES]
+    if unknown:
+        parser.error(f"Unknown sizes: {', '.join(unknown)}")
+
+    with app.app_context():
+        backfill_renditions(sizes, args.format or app.config["IMAGE_RENDITION_FORMAT"], args.limit)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+"""
+Thumbnail and medium renditions of images in the blob store.
+Renditions are generated with Pillow off the request thread once the upload
+that introduced an image commits, stored in the blob store and recorded in
+the image_renditions table keyed by the blob key of the original and the
+rendition spec, e.g. "thumb.webp", so changing the output format generates
+new renditions instead of serving the old ones.
+"""
+
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+from sqlalchemy import event, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from blob_store import get_blob_store
+from models import db, ImageRendition, ReportImage, QCCWPanelPhoto, QCCWPanelData, ProductPart, PartSubtypeImage
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels of each rendition
+RENDITION_SIZES = {
+    "thumb": 320,
+    "medium": 1280,
+}
+
+# Output formats: Pillow format name and content type
+RENDITION_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+
+RENDITION_QUALITY = 80
+
+# Models with images in the blob store and the attribute holding the blob key
+IMAGE_KEY_COLUMNS = [
+    (ReportImage, "image_key"),
+    (QCCWPanelPhoto, "photo_key"),
+    (QCCWPanelData, "profile_photo_key"),
+    (ProductPart, "product_part_image_key"),
+    (PartSubtypeImage, "image_key"),
+]
+
+
+def render_image(data, max_edge, image_format="webp"):
+    """
+    Produce a resized copy of an image.
+    The image is rotated according to its EXIF orientation and saved without
+    metadata. Images smaller than max_edge are re-encoded but not enlarged.
+
+    Args:
+        data: Original image bytes
+        max_edge: Maximum width and height in pixels
+        image_format: Key of RENDITION_FORMATS
+
+    Returns:
+        tuple: (rendition bytes, width, height)
+    """
+    pillow_format, _ = RENDITION_FORMATS[image_format]
+    with Image.open(io.BytesIO(data)) as source:
+        # Let the JPEG decoder downscale while decoding large photos
+        source.draft("RGB", (max_edge, max_edge))
+        image = ImageOps.exif_transpose(source)
+        image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        if pillow_format == "WEBP" and has_alpha:
+            image = image.convert("RGBA")
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+
+        output = io.BytesIO()
+        image.save(output, pillow_format, quality=RENDITION_QUALITY)
+        return output.getvalue(), image.width, image.height
+
+
+def rendition_spec(size, image_format):
+    """
+    Name a rendition by size and output format, e.g. "thumb.webp".
+
+    Args:
+        size: Key of RENDITION_SIZES
+        image_format: Key of RENDITION_FORMATS
+
+    Returns:
+        str: Value of ImageRendition.size
+    """
+    return f"{size}.{image_format}"
+
+
+def find_rendition(db_session, source_key, size, image_format="webp"):
+    """
+    Look up a rendition of an image.
+
+    Args:
+        db_session: SQLAlchemy database session
+        source_key: Blob key of the original image
+        size: Key of RENDITION_SIZES
+        image_format: Key of RENDITION_FORMATS
+
+    Returns:
+        ImageRendition or None if it has not been generated yet
+    """
+    return db_session.query(ImageRendition).filter(
+        ImageRendition.source_key == source_key,
+        ImageRendition.size == rendition_spec(size, image_format)
+    ).first()
+
+
+def discard_rendition(db_session, rendition):
+    """
+    Delete the record of a rendition whose blob is missing from the store,
+    so the next generation run renders it again.
+
+    Args:
+        db_session: SQLAlchemy database session
+        rendition: ImageRendition to delete
+    """
+    db_session.query(ImageRendition).filter(ImageRendition.id == rendition.id).delete(synchronize_session=False)
+    db_session.commit()
+
+
+def generate_renditions(db_session, source_key, image_format="webp", sizes=None):
+    """
+    Generate the missing renditions of an image.
+    Sources Pillow cannot decode are recorded with a NULL rendition_key so they
+    are not retried.
+
+    Args:
+        db_session: SQLAlchemy database session
+        source_key: Blob key of the original image
+        image_format: Key of RENDITION_FORMATS
+        sizes: Rendition names to generate, all of RENDITION_SIZES by default
+
+    Returns:
+        int: Number of renditions generated
+    """
+    sizes = sizes or list(RENDITION_SIZES)
+    existing = {
+        size for (size,) in db_session.query(ImageRendition.size).filter(
+            ImageRendition.source_key == source_key
+        )
+    }
+    missing = [size for size in sizes if rendition_spec(size, image_format) not in existing]
+    if not missing:
+        return 0
+
+    store = get_blob_store()
+    data = store.get(source_key)
+    _, content_type = RENDITION_FORMATS[image_format]
+    for size in missing:
+        try:
+            rendition, width, height = render_image(data, RENDITION_SIZES[size], image_format)
+            db_session.add(ImageRendition(
+                source_key=source_key,
+                size=rendition_spec(size, image_format),
+                rendition_key=store.put(rendition),
+                content_type=content_type,
+                width=width,
+                height=height
+            ))
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.warning(f"Cannot render {size} of image {source_key}: {str(e)}")
+            db_session.add(ImageRendition(source_key=source_key, size=rendition_spec(size, image_format)))
+
+    try:
+        db_session.commit()
+    except IntegrityError:
+        # Another worker generated the same renditions concurrently
+        db_session.rollback()
+        return 0
+    return len(missing)
+
+
+def iter_image_keys(db_session, batch_size=500):
+    """
+    Iterate the distinct blob keys of all stored images.
+
+    Args:
+        db_session: SQLAlchemy database session
+        batch_size: Keys fetched per query
+
+    Returns:
+        Iterator of blob keys
+    """
+    seen = set()
+    for model, key_column in IMAGE_KEY_COLUMNS:
+        key = getattr(model, key_column)
+        last_id = 0
+        while True:
+            rows = db_session.query(model.id, key).filter(
+                key.isnot(None), model.id > last_id
+            ).order_by(model.id).limit(batch_size).all()
+            if not rows:
+                break
+            for _, value in rows:
+                if value not in seen:
+                    seen.add(value)
+                    yield value
+            last_id = rows[-1][0]
+
+
+def complete_source_keys(db_session, sizes=None, image_format="webp"):
+    """
+    Return the blob keys that already have every requested rendition.
+
+    Args:
+        db_session: SQLAlchemy database session
+        sizes: Rendition names, all of RENDITION_SIZES by default
+        image_format: Key of RENDITION_FORMATS
+
+    Returns:
+        set: Blob keys of originals
+    """
+    sizes = sizes or list(RENDITION_SIZES)
+    return {
+        source_key for (source_key,) in db_session.query(ImageRendition.source_key).filter(
+            ImageRendition.size.in_([rendition_spec(size, image_format) for size in sizes])
+        ).group_by(ImageRendition.source_key).having(func.count(ImageRendition.id) == len(sizes))
+    }
+
+
+class RenditionQueue:
+    """
+    Local worker pool generating renditions of newly stored images.
+    Blob keys set on image models are collected when a session flushes and
+    handed to the pool once the session commits.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.executor = None
+        self.image_format = "webp"
+        self._pending = set()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configure the queue from the app config and start tracking image uploads.
+
+        Args:
+            app: Flask application
+        """
+        self.app = app
+        self.image_format = app.config.get("IMAGE_RENDITION_FORMAT") or "webp"
+        if self.image_format not in RENDITION_FORMATS:
+            raise ValueError(f"Unknown image rendition format: {self.image_format}")
+        self.executor = ThreadPoolExecutor(
+            max_workers=app.config.get("IMAGE_RENDITION_WORKERS", 1),
+            thread_name_prefix="rendition"
+        )
+        if not event.contains(Session, "after_flush", self._collect_keys):
+            event.listen(Session, "after_flush", self._collect_keys)
+            event.listen(Session, "after_commit", self._schedule_collected)
+            event.listen(Session, "after_rollback", self._discard_collected)
+
+    def schedule(self, source_keys):
+        """
+        Generate the renditions of images in the background.
+
+        Args:
+            source_keys: Blob keys of original images
+        """
+        if self.executor is None:
+            return
+        for source_key in source_keys:
+            with self._lock:
+                if source_key in self._pending:
+                    continue
+                self._pending.add(source_key)
+            self.executor.submit(self._run, source_key)
+
+    def _run(self, source_key):
+        """
+        Generate the renditions of one image in a worker thread.
+
+        Args:
+            source_key: Blob key of the original image
+        """
+        with self.app.app_context():
+            try:
+                generate_renditions(db.session, source_key, self.image_format)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Rendition generation failed for image {source_key}: {str(e)}")
+            finally:
+                db.session.remove()
+                with self._lock:
+                    self._pending.discard(source_key)
+
+    def _collect_keys(self, session, flush_context):
+        """Remember the blob keys of images added or changed in a flush."""
+        for instance in list(session.new) + list(session.dirty):
+            for model, key_column in IMAGE_KEY_COLUMNS:
+                if isinstance(instance, model):
+                    source_key = getattr(instance, key_column)
+                    if source_key:
+                        session.info.setdefault("rendition_keys", set()).add(source_key)
+
+    def _schedule_collected(self, session):
+        """Schedule the images collected since the last commit."""
+        source_keys = session.info.pop("rendition_keys", None)
+        if source_keys:
+            self.schedule(source_keys)
+
+    def _discard_collected(self, session):
+        """Forget images collected in a rolled back transaction."""
+        session.info.pop("rendition_keys", None)
+
+
+rendition_queue = RenditionQueue()
@@ -0,0 +1,178 @@
+"""
+HTTP responses for images stored in the blob store.
+Images are streamed from storage with their sniffed content type, a strong
+ETag derived from the content hash, and support for conditional and Range requests.
+"""
+
+import hashlib
+import io
+
+from flask import Response, jsonify, request
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from werkzeug.wsgi import wrap_file
+
+from blob_store import get_blob_store, BlobNotFound
+from image_renditions import RENDITION_SIZES, discard_rendition, find_rendition, rendition_queue
+from models import db
+
+# Image signatures checked against the first bytes of a blob
+IMAGE_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+]
+
+# Versioned image URLs never change content, so clients may cache them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def sniff_image_type(head):
+    """
+    Detect the content type of an image from its first bytes.
+
+    Args:
+        head: At least the first 12 bytes of the image
+
+    Returns:
+        str: MIME type, application/octet-stream if unknown
+    """
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:12] in (b"ftypheic", b"ftypheix", b"ftypmif1"):
+        return "image/heic"
+    for signature, mimetype in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return mimetype
+    return "application/octet-stream"
+
+
+def image_url(path, key, size=None):
+    """
+    Build the URL of an image, versioned by its blob key when available.
+
+    Args:
+        path: Endpoint path of the image
+        key: Blob key of the image, or None for images not yet in the blob store
+        size: Optional rendition name (see RENDITION_SIZES)
+
+    Returns:
+        str: Image URL
+    """
+    params = []
+    if key:
+        params.append(f"v={key[:16]}")
+    if size:
+        params.append(f"size={size}")
+    return f"{path}?{'&'.join(params)}" if params else path
+
+
+def is_current_version(key, version):
+    """Return True if a v= argument names the blob key of an image."""
+    return bool(key and version and len(version) >= 16 and key.startswith(version))
+
+
+def image_response(key, legacy_data=None, private=False):
+    """
+    Stream an image with caching headers.
+
+    Requests carrying the current version (v=) of the image are cacheable
+    forever; other requests must revalidate with the ETag. A size= argument
+    selects a rendition; until it has been generated, or when its blob is
+    missing from the store, the original is served and generation is scheduled.
+
+    Private images (QC evidence photos) are only served to requests carrying
+    their current version, which cannot be guessed from the id, or to requests
+    without v= that the caller has authenticated; they are cached privately.
+
+    Args:
+        key: Blob key of the image, or None
+        legacy_data: Image bytes still stored in the table row, used when key is None
+        private: Whether the image is private
+
+    Returns:
+        Response: 200/206 with the image, 304 when the client copy is current,
+        400 for an unknown size, 404 when there is no image, 416 for unsatisfiable ranges
+    """
+    if not key and not legacy_data:
+        return jsonify({"error": "Image not found"}), 404
+    if private and request.args.get("v") and not is_current_version(key, request.args.get("v")):
+        return jsonify({"error": "Image not found"}), 404
+
+    version = key
+    cacheable = True
+    size = request.args.get("size")
+    if size and size != "original":
+        if size not in RENDITION_SIZES:
+            return jsonify({"error": f"size must be one of: original, {', '.join(RENDITION_SIZES)}"}), 400
+        if key:
+            rendition = find_rendition(db.session, key, size, rendition_queue.image_format)
+            if rendition is None:
+                rendition_queue.schedule([key])
+                cacheable = False
+            elif rendition.rendition_key:
+                if get_blob_store().exists(rendition.rendition_key):
+                    key = rendition.rendition_key
+                else:
+                    # The rendition blob was deleted: serve the original and render it again
+                    discard_rendition(db.session, rendition)
+                    rendition_queue.schedule([key])
+                    cacheable = False
+
+    etag = key or hashlib.sha256(legacy_data).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        set_image_cache_control(response, version, cacheable, private)
+        return response
+
+    if key:
+        store = get_blob_store()
+        try:
+            size = store.size(key)
+            blob = store.open(key)
+        except BlobNotFound:
+            return jsonify({"error": "Image not found"}), 404
+    else:
+        size = len(legacy_data)
+        blob = io.BytesIO(legacy_data)
+
+    mimetype = sniff_image_type(blob.read(12))
+    blob.seek(0)
+
+    response = Response(wrap_file(request.environ, blob), mimetype=mimetype, direct_passthrough=True)
+    response.content_length = size
+    response.set_etag(etag)
+    set_image_cache_control(response, version, cacheable, private)
+    try:
+        return response.make_conditional(request, accept_ranges=True, complete_length=size)
+    except RequestedRangeNotSatisfiable:
+        response.close()
+        error = jsonify({"error": "Requested range not satisfiable"})
+        error.status_code = 416
+        error.headers["Content-Range"] = f"bytes */{size}"
+        return error
+
+
+def set_image_cache_control(response, key, cacheable=True, private=False):
+    """
+    Set Cache-Control for an image response.
+
+    Args:
+        response: Response to update
+        key: Current blob key of the original image, or None
+        cacheable: False when the response is a temporary substitute
+        private: Whether shared caches must not store the image
+    """
+    if private:
+        response.cache_control.private = True
+    if cacheable and is_current_version(key, request.args.get("v")):
+        if not private:
+            response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
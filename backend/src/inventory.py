@@ -0,0 +1,232 @@
+"""
+Recording inventory snapshots and part shipments.
+Each write also updates the current_inventory row of the part subtype and
+warehouse, and the inventory rollups of its date, in the same transaction, so
+current stock is a primary-key read and trends need no scan of the history.
+A snapshot is a stock count at the end of its day: shipments received on a
+later day are added to it, shipments received on or before that day are not.
+Days are calendar days in the inventory zone (see inventory_time).
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, case, func, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from inventory_rollups import refresh_rollups
+from inventory_time import day_start, local_date, to_utc
+from models import CurrentInventory, InventorySnapshot, PartShipment
+
+
+def day_after(day):
+    """Return the start of the day after a date, the first moment a snapshot does not include."""
+    return day_start(day + timedelta(days=1))
+
+
+def lock_current(db_session, part_subtype_id, warehouse_id):
+    """Load the current_inventory row of a part subtype and warehouse, locked until commit."""
+    return db_session.query(CurrentInventory).filter(
+        CurrentInventory.part_subtype_id == part_subtype_id,
+        CurrentInventory.warehouse_id == warehouse_id
+    ).with_for_update().one_or_none()
+
+
+def insert_current(db_session, values):
+    """
+    Insert a current_inventory row unless a concurrent transaction already did.
+
+    Returns:
+        bool: True if the row was inserted
+    """
+    try:
+        with db_session.begin_nested():
+            db_session.execute(insert(CurrentInventory.__table__), [values])
+        return True
+    except IntegrityError:
+        return False
+
+
+def record_snapshot(db_session, part_subtype_id, warehouse_id, quantity, snapshot_date):
+    """
+    Record an inventory snapshot and make it the current stock if it is the latest.
+    The caller commits.
+
+    Args:
+        db_session: SQLAlchemy database session
+        part_subtype_id: ID of the part subtype
+        warehouse_id: ID of the warehouse
+        quantity: Counted quantity
+        snapshot_date: Date of the count
+
+    Returns:
+        InventorySnapshot: The new snapshot
+    """
+    snapshot = InventorySnapshot(
+        part_subtype_id=part_subtype_id,
+        warehouse_id=warehouse_id,
+        quantity=quantity,
+        snapshot_date=snapshot_date
+    )
+    db_session.add(snapshot)
+    db_session.flush()
+    apply_snapshot(db_session, snapshot)
+    refresh_rollups(db_session, part_subtype_id, warehouse_id, snapshot_date)
+    return snapshot
+
+
+def apply_snapshot(db_session, snapshot):
+    """Make a new snapshot the current stock if it is the latest; leaves the row locked."""
+    while True:
+        current = lock_current(db_session, snapshot.part_subtype_id, snapshot.warehouse_id)
+        if current is not None and current.snapshot_date is not None and \
+                (current.snapshot_date, current.snapshot_id) > (snapshot.snapshot_date, snapshot.id):
+            # An older count only adds to the history
+            return
+
+        received_quantity, last_received = db_session.query(
+            func.coalesce(func.sum(PartShipment.quantity), 0),
+            func.max(PartShipment.received_at)
+        ).filter(
+            PartShipment.part_subtype_id == snapshot.part_subtype_id,
+            PartShipment.warehouse_id == snapshot.warehouse_id,
+            PartShipment.received_at >= day_after(snapshot.snapshot_date)
+        ).one()
+        values = {
+            "quantity": snapshot.quantity + received_quantity,
+            "snapshot_id": snapshot.id,
+            "snapshot_date": snapshot.snapshot_date,
+            "as_of": max(snapshot.snapshot_date, local_date(last_received)) if last_received else snapshot.snapshot_date
+        }
+
+        if current is not None:
+            for name, value in values.items():
+                setattr(current, name, value)
+            return
+        if insert_current(db_session, dict(
+            values, part_subtype_id=snapshot.part_subtype_id, warehouse_id=snapshot.warehouse_id
+        )):
+            return
+        # Another transaction created the row first; lock it and compare again
+
+
+def record_shipment(db_session, part_subtype_id, warehouse_id, quantity, received_at=None, vendor=None):
+    """
+    Record a part shipment and add it to the current stock unless the latest
+    snapshot already counted it. The caller commits.
+
+    Args:
+        db_session: SQLAlchemy database session
+        part_subtype_id: ID of the part subtype
+        warehouse_id: ID of the warehouse
+        quantity: Received quantity
+        received_at: Time of receipt, now by default; naive times are inventory zone
+            wall time, and the time is stored as a UTC instant
+        vendor: Vendor name
+
+    Returns:
+        PartShipment: The new shipment
+    """
+    received_at = to_utc(received_at) if received_at else datetime.now(timezone.utc)
+    received_on = local_date(received_at)
+    shipment = PartShipment(
+        part_subtype_id=part_subtype_id,
+        warehouse_id=warehouse_id,
+        quantity=quantity,
+        received_at=received_at,
+        vendor=vendor
+    )
+    db_session.add(shipment)
+    db_session.flush()
+
+    apply_shipment(db_session, shipment, received_on)
+    refresh_rollups(db_session, part_subtype_id, warehouse_id, received_on)
+    return shipment
+
+
+def apply_shipment(db_session, shipment, received_on):
+    """Add a new shipment to the current stock unless the latest snapshot counted it; leaves the row locked."""
+    key = and_(
+        CurrentInventory.part_subtype_id == shipment.part_subtype_id,
+        CurrentInventory.warehouse_id == shipment.warehouse_id
+    )
+    while True:
+        # Single statement, so concurrent shipments add up without locking first
+        result = db_session.execute(
+            update(CurrentInventory).where(
+                key,
+                or_(CurrentInventory.snapshot_date.is_(None), CurrentInventory.snapshot_date < received_on)
+            ).values(
+                quantity=CurrentInventory.quantity + shipment.quantity,
+                as_of=case((CurrentInventory.as_of < received_on, received_on), else_=CurrentInventory.as_of)
+            ).execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            return
+        if lock_current(db_session, shipment.part_subtype_id, shipment.warehouse_id) is not None:
+            # The latest snapshot was counted after this shipment arrived
+            return
+        if insert_current(db_session, {
+            "part_subtype_id": shipment.part_subtype_id,
+            "warehouse_id": shipment.warehouse_id,
+            "quantity": shipment.quantity,
+            "snapshot_id": None,
+            "snapshot_date": None,
+            "as_of": received_on
+        }):
+            return
+
+
+def rebuild_current_inventory(db_session):
+    """
+    Rebuild current_inventory from all snapshots and shipments.
+
+    Args:
+        db_session: SQLAlchemy database session
+
+    Returns:
+        int: Number of rows written
+    """
+    ranked = db_session.query(
+        InventorySnapshot.id,
+        InventorySnapshot.part_subtype_id,
+        InventorySnapshot.warehouse_id,
+        InventorySnapshot.quantity,
+        InventorySnapshot.snapshot_date,
+        func.row_number().over(
+            partition_by=(InventorySnapshot.part_subtype_id, InventorySnapshot.warehouse_id),
+            order_by=(InventorySnapshot.snapshot_date.desc(), InventorySnapshot.id.desc())
+        ).label("row_number")
+    ).subquery()
+    rows = {
+        (row.part_subtype_id, row.warehouse_id): {
+            "part_subtype_id": row.part_subtype_id,
+            "warehouse_id": row.warehouse_id,
+            "quantity": row.quantity,
+            "snapshot_id": row.id,
+            "snapshot_date": row.snapshot_date,
+            "as_of": row.snapshot_date
+        }
+        for row in db_session.query(ranked).filter(ranked.c.row_number == 1)
+    }
+
+    for shipment in db_session.query(
+        PartShipment.part_subtype_id, PartShipment.warehouse_id, PartShipment.quantity, PartShipment.received_at
+    ).order_by(PartShipment.received_at):
+        row = rows.setdefault((shipment.part_subtype_id, shipment.warehouse_id), {
+            "part_subtype_id": shipment.part_subtype_id,
+            "warehouse_id": shipment.warehouse_id,
+            "quantity": 0,
+            "snapshot_id": None,
+            "snapshot_date": None,
+            "as_of": local_date(shipment.received_at)
+        })
+        received_on = local_date(shipment.received_at)
+        if row["snapshot_date"] is None or row["snapshot_date"] < received_on:
+            row["quantity"] += shipment.quantity
+            row["as_of"] = max(row["as_of"], received_on)
+
+    db_session.query(CurrentInventory).delete(synchronize_session=False)
+    if rows:
+        db_session.execute(insert(CurrentInventory.__table__), list(rows.values()))
+    db_session.commit()
+    return len(rows)
@@ -0,0 +1,282 @@
+"""
+Daily, weekly and monthly inventory rollups per part subtype and warehouse.
+Recording a snapshot or shipment recomputes the three periods containing its
+date, so the inventory_rollups table stays current without rescans. A full
+rebuild aggregates the whole history at once with pandas. Trends per part
+type, subtype or warehouse are summed from the rollups at query time.
+"""
+
+from datetime import timedelta
+
+import pandas as pd
+from sqlalchemy import and_, func, insert
+
+from inventory_time import day_start, get_inventory_zone, inventory_today
+from models import InventoryRollup, InventorySnapshot, PartShipment, PartSubtype, PartType, Warehouse
+
+BUCKETS = ("day", "week", "month")
+
+# pandas frequency of each bucket; weeks start on Monday
+BUCKET_FREQUENCIES = {"day": "D", "week": "W-MON", "month": "MS"}
+
+GROUP_BY = ("part_type", "part_subtype", "warehouse")
+
+# Upper bound on the periods of one trend request
+MAX_TREND_PERIODS = 1000
+
+
+def period_start(day, bucket):
+    """Return the first day of the period of a bucket that contains a day."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def period_end(start, bucket):
+    """Return the first day after the period of a bucket starting on a day."""
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def refresh_rollups(db_session, part_subtype_id, warehouse_id, day):
+    """
+    Recompute the day, week and month rollups containing a day for one part
+    subtype and warehouse. Callers hold the current_inventory row lock of the
+    part subtype and warehouse, which serializes refreshes of the same rows.
+
+    Args:
+        db_session: SQLAlchemy database session
+        part_subtype_id: ID of the part subtype
+        warehouse_id: ID of the warehouse
+        day: Date of the recorded snapshot or shipment
+    """
+    for bucket in BUCKETS:
+        start = period_start(day, bucket)
+        end = period_end(start, bucket)
+        snapshots = db_session.query(InventorySnapshot.quantity, InventorySnapshot.snapshot_date).filter(
+            InventorySnapshot.part_subtype_id == part_subtype_id,
+            InventorySnapshot.warehouse_id == warehouse_id,
+            InventorySnapshot.snapshot_date >= start,
+            InventorySnapshot.snapshot_date < end
+        ).order_by(InventorySnapshot.snapshot_date, InventorySnapshot.id).all()
+        received = db_session.query(func.coalesce(func.sum(PartShipment.quantity), 0)).filter(
+            PartShipment.part_subtype_id == part_subtype_id,
+            PartShipment.warehouse_id == warehouse_id,
+            PartShipment.received_at >= day_start(start),
+            PartShipment.received_at < day_start(end)
+        ).scalar()
+
+        key = {"bucket": bucket, "period_start": start, "part_subtype_id": part_subtype_id, "warehouse_id": warehouse_id}
+        if not snapshots and not received:
+            db_session.query(InventoryRollup).filter_by(**key).delete(synchronize_session=False)
+            continue
+        db_session.merge(InventoryRollup(
+            **key,
+            closing_quantity=snapshots[-1].quantity if snapshots else None,
+            closing_date=snapshots[-1].snapshot_date if snapshots else None,
+            average_quantity=round(sum(row.quantity for row in snapshots) / len(snapshots), 2) if snapshots else None,
+            snapshot_count=len(snapshots),
+            received_quantity=received
+        ))
+
+
+def period_starts(days, bucket):
+    """Map a datetime64 Series of days to the start of their bucket period."""
+    if bucket == "week":
+        return days - pd.to_timedelta(days.dt.weekday, unit="D")
+    if bucket == "month":
+        return days.dt.to_period("M").dt.to_timestamp()
+    return days
+
+
+def rebuild_rollups(db_session):
+    """
+    Rebuild all rollups from the full snapshot and shipment history.
+    Each table is read once and every bucket is aggregated with vectorized
+    pandas group-bys.
+
+    Args:
+        db_session: SQLAlchemy database session
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    keys = ["period_start", "part_subtype_id", "warehouse_id"]
+    snapshots = pd.DataFrame(db_session.query(
+        InventorySnapshot.id, InventorySnapshot.part_subtype_id, InventorySnapshot.warehouse_id,
+        InventorySnapshot.quantity, InventorySnapshot.snapshot_date
+    ).all(), columns=["id", "part_subtype_id", "warehouse_id", "quantity", "snapshot_date"])
+    snapshots["day"] = pd.to_datetime(snapshots["snapshot_date"])
+    snapshots = snapshots.sort_values(["snapshot_date", "id"])
+
+    shipments = pd.DataFrame(db_session.query(
+        PartShipment.part_subtype_id, PartShipment.warehouse_id, PartShipment.quantity, PartShipment.received_at
+    ).all(), columns=["part_subtype_id", "warehouse_id", "quantity", "received_at"])
+    # Naive values read back from the database (SQLite) are UTC; bucket by the
+    # inventory zone date of receipt, like refresh_rollups
+    received_at = pd.to_datetime(shipments["received_at"], utc=True)
+    shipments["day"] = received_at.dt.tz_convert(get_inventory_zone()).dt.tz_localize(None).dt.normalize()
+
+    rows = []
+    for bucket in BUCKETS:
+        snapshot_rollups = snapshots.assign(period_start=period_starts(snapshots["day"], bucket)).groupby(keys).agg(
+            closing_quantity=("quantity", "last"),
+            closing_date=("snapshot_date", "last"),
+            average_quantity=("quantity", "mean"),
+            snapshot_count=("quantity", "size")
+        )
+        received = shipments.assign(period_start=period_starts(shipments["day"], bucket)).groupby(keys)["quantity"].sum()
+        frame = snapshot_rollups.join(received.rename("received_quantity"), how="outer").reset_index()
+        frame["closing_quantity"] = frame["closing_quantity"].astype("Int64")
+        frame["snapshot_count"] = frame["snapshot_count"].fillna(0).astype(int)
+        frame["received_quantity"] = frame["received_quantity"].fillna(0).astype(int)
+        frame["average_quantity"] = frame["average_quantity"].round(2)
+        frame["period_start"] = frame["period_start"].dt.date
+        frame["bucket"] = bucket
+        frame = frame.astype(object).where(frame.notna(), None)
+        rows.extend(frame.to_dict("records"))
+
+    db_session.query(InventoryRollup).delete(synchronize_session=False)
+    if rows:
+        db_session.execute(insert(InventoryRollup.__table__), rows)
+    db_session.commit()
+    return len(rows)
+
+
+def series_names(db_session, group_by, ids):
+    """Return {id: name} for the part types, subtypes or warehouses of a trend."""
+    model = {"part_type": PartType, "part_subtype": PartSubtype, "warehouse": Warehouse}[group_by]
+    if not ids:
+        return {}
+    return dict(db_session.query(model.id, model.name).filter(model.id.in_(ids)).all())
+
+
+def load_trends(db_session, bucket, group_by="part_type", start=None, end=None,
+                part_type_id=None, part_subtype_id=None, warehouse_id=None):
+    """
+    Load inventory trends from the rollups.
+    The stock of a part subtype in a warehouse is carried forward through
+    periods without a snapshot, so group totals do not drop when one part
+    subtype was not counted in a period.
+
+    Args:
+        db_session: SQLAlchemy database session
+        bucket: One of BUCKETS
+        group_by: One of GROUP_BY
+        start: First day of the range, or None for the first rollup
+        end: First day after the range, or None for up to today
+        part_type_id: Restrict to one part type
+        part_subtype_id: Restrict to one part subtype
+        warehouse_id: Restrict to one warehouse
+
+    Returns:
+        list: One {"id", "name", "points"} series per group; each point has
+        period_start, quantity, average_quantity and received_quantity
+
+    Raises:
+        ValueError: If the range spans more than MAX_TREND_PERIODS periods
+    """
+    series_key = ["part_subtype_id", "warehouse_id"]
+    query = db_session.query(
+        InventoryRollup.period_start,
+        InventoryRollup.part_subtype_id,
+        InventoryRollup.warehouse_id,
+        PartSubtype.part_type_id,
+        InventoryRollup.closing_quantity,
+        InventoryRollup.average_quantity,
+        InventoryRollup.received_quantity
+    ).join(PartSubtype, PartSubtype.id == InventoryRollup.part_subtype_id).filter(InventoryRollup.bucket == bucket)
+    if part_type_id:
+        query = query.filter(PartSubtype.part_type_id == part_type_id)
+    if part_subtype_id:
+        query = query.filter(InventoryRollup.part_subtype_id == part_subtype_id)
+    if warehouse_id:
+        query = query.filter(InventoryRollup.warehouse_id == warehouse_id)
+
+    first = period_start(start, bucket) if start else None
+    if end:
+        last = period_start(end - timedelta(days=1), bucket)
+    else:
+        last = period_start(inventory_today(), bucket)
+
+    in_range = query.filter(InventoryRollup.period_start <= last)
+    if first:
+        in_range = in_range.filter(InventoryRollup.period_start >= first)
+    rows = in_range.all()
+    if first:
+        # Latest counted period before the range, to carry the stock into it
+        latest = query.filter(
+            InventoryRollup.period_start < first,
+            InventoryRollup.closing_quantity.isnot(None)
+        ).with_entities(
+            InventoryRollup.part_subtype_id,
+            InventoryRollup.warehouse_id,
+            func.max(InventoryRollup.period_start).label("period_start")
+        ).group_by(InventoryRollup.part_subtype_id, InventoryRollup.warehouse_id).subquery()
+        rows += query.join(latest, and_(
+            latest.c.part_subtype_id == InventoryRollup.part_subtype_id,
+            latest.c.warehouse_id == InventoryRollup.warehouse_id,
+            latest.c.period_start == InventoryRollup.period_start
+        )).all()
+    if not rows:
+        return []
+
+    frame = pd.DataFrame(rows, columns=[
+        "period_start", "part_subtype_id", "warehouse_id", "part_type_id",
+        "closing_quantity", "average_quantity", "received_quantity"
+    ])
+    frame["period_start"] = pd.to_datetime(frame["period_start"])
+    frame["closing_quantity"] = frame["closing_quantity"].astype(float)
+    frame["average_quantity"] = frame["average_quantity"].astype(float)
+    frame["received_quantity"] = frame["received_quantity"].astype(float)
+    periods = pd.date_range(
+        pd.Timestamp(first) if first else frame["period_start"].min(), pd.Timestamp(last),
+        freq=BUCKET_FREQUENCIES[bucket]
+    )
+    if len(periods) > MAX_TREND_PERIODS:
+        raise ValueError(f"At most {MAX_TREND_PERIODS} {bucket} periods per request")
+
+    # One column per part subtype and warehouse, carried forward over uncounted periods
+    frame["series"] = frame.groupby(series_key).ngroup()
+    series = frame.drop_duplicates("series").set_index("series").sort_index()
+    all_periods = periods.union(frame["period_start"].unique())
+
+    def pivot(values):
+        return frame.pivot_table(
+            index="period_start", columns="series", values=values, aggfunc="last", dropna=False
+        ).reindex(columns=series.index)
+
+    closing = pivot("closing_quantity").reindex(all_periods).ffill().reindex(periods)
+    average = pivot("average_quantity").reindex(periods).fillna(closing)
+    received = pivot("received_quantity").reindex(periods).fillna(0)
+
+    groups = pd.Index(series[{
+        "part_type": "part_type_id", "part_subtype": "part_subtype_id", "warehouse": "warehouse_id"
+    }[group_by]].to_numpy(), name=group_by)
+
+    def group_sum(values):
+        return values.T.groupby(groups).sum(min_count=1).T
+
+    closing, average, received = group_sum(closing), group_sum(average), group_sum(received)
+    names = series_names(db_session, group_by, [int(group_id) for group_id in closing.columns])
+
+    result = []
+    for group_id in closing.columns:
+        result.append({
+            "id": int(group_id),
+            "name": names.get(int(group_id)),
+            "points": [{
+                "period_start": period.date().isoformat(),
+                "quantity": None if pd.isna(quantity) else int(quantity),
+                "average_quantity": None if pd.isna(average_quantity) else round(float(average_quantity), 2),
+                "received_quantity": 0 if pd.isna(received_quantity) else int(received_quantity)
+            } for period, quantity, average_quantity, received_quantity in zip(
+                periods, closing[group_id], average[group_id], received[group_id]
+            )]
+        })
+    return result
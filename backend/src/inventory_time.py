@@ -0,0 +1,124 @@
+"""
+Clock of the inventory history.
+Shipment times are stored as UTC instants. Snapshot dates, the dates shipments
+count toward and rollup periods are calendar days in one configured zone,
+INVENTORY_TZ (an IANA name such as "Asia/Shanghai", UTC by default), so every
+write, rollup refresh, rebuild and date filter buckets a moment the same way.
+"""
+
+import os
+from datetime import datetime, time, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_INVENTORY_TZ = "UTC"
+
+
+def create_inventory_zone(config):
+    """
+    Create the zone configured by INVENTORY_TZ.
+
+    Args:
+        config: Mapping with the INVENTORY_TZ setting
+
+    Returns:
+        ZoneInfo: Inventory zone
+
+    Raises:
+        ValueError: If the zone is unknown
+    """
+    name = config.get("INVENTORY_TZ") or DEFAULT_INVENTORY_TZ
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown inventory time zone: {name}")
+
+
+_inventory_zone = None
+
+
+def init_inventory_zone(app):
+    """
+    Configure the process-wide inventory zone from the app config.
+
+    Args:
+        app: Flask application
+    """
+    global _inventory_zone
+    _inventory_zone = create_inventory_zone(app.config)
+
+
+def get_inventory_zone():
+    """
+    Return the process-wide inventory zone, configured from the environment when
+    init_inventory_zone has not been called (e.g. in scripts).
+
+    Returns:
+        ZoneInfo: Inventory zone
+    """
+    global _inventory_zone
+    if _inventory_zone is None:
+        _inventory_zone = create_inventory_zone(os.environ)
+    return _inventory_zone
+
+
+def to_utc(moment):
+    """
+    Convert a moment to an aware UTC datetime.
+    Naive moments given by clients are read as inventory zone wall time.
+
+    Args:
+        moment: datetime
+
+    Returns:
+        datetime: Aware UTC datetime
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=get_inventory_zone())
+    return moment.astimezone(timezone.utc)
+
+
+def as_utc(moment):
+    """
+    Return a stored moment as an aware UTC datetime.
+    Naive values read back from the database (SQLite) are UTC.
+
+    Args:
+        moment: datetime
+
+    Returns:
+        datetime: Aware UTC datetime
+    """
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def local_date(moment):
+    """
+    Return the inventory zone date of a stored moment.
+
+    Args:
+        moment: datetime as read from the database
+
+    Returns:
+        date: Calendar day in the inventory zone
+    """
+    return as_utc(moment).astimezone(get_inventory_zone()).date()
+
+
+def day_start(day):
+    """
+    Return the first moment of an inventory zone day as an aware UTC datetime.
+
+    Args:
+        day: date
+
+    Returns:
+        datetime: Aware UTC datetime
+    """
+    return datetime.combine(day, time.min, tzinfo=get_inventory_zone()).astimezone(timezone.utc)
+
+
+def inventory_today():
+    """Return the current date in the inventory zone."""
+    return datetime.now(get_inventory_zone()).date()
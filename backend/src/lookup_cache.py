@@ -0,0 +1,224 @@
+"""
+Per-process cache of the lookup forest.
+Lookup types and their lookup trees are read on every form render but only
+change during admin edits. The forest is loaded with one recursive query and
+kept under a version counter that is bumped by commits that change a lookup or
+lookup type in this process; a fixed set of responses rendered from it is
+cached per version with a strong ETag, and lookup types and lookups are
+indexed by id for the per-id responses. Other worker processes pick up changes
+after LOOKUP_CACHE_TTL seconds.
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+from sqlalchemy import event, literal, select
+from sqlalchemy.orm import Session
+
+from models import Lookup, LookupType
+
+DEFAULT_TTL = 300
+
+
+def load_forest(db_session):
+    """
+    Load every lookup type with its lookup trees.
+    Lookups are read with a single recursive CTE walking down from the roots,
+    so lookups whose parent chain never reaches a root are left out.
+
+    Args:
+        db_session: SQLAlchemy database session
+
+    Returns:
+        list: Lookup types ordered by name, each with id, name and lookups; every
+        lookup has id, lookup_type_id, code, label, parent_id and children
+    """
+    tree = select(
+        Lookup.id, Lookup.lookup_type_id, Lookup.code, Lookup.label, Lookup.parent_id, literal(0).label("depth")
+    ).where(Lookup.parent_id.is_(None)).cte("lookup_tree", recursive=True)
+    tree = tree.union_all(select(
+        Lookup.id, Lookup.lookup_type_id, Lookup.code, Lookup.label, Lookup.parent_id, tree.c.depth + 1
+    ).join(tree, Lookup.parent_id == tree.c.id))
+
+    types = [
+        {"id": type_id, "name": name, "lookups": []}
+        for type_id, name in db_session.query(LookupType.id, LookupType.name).order_by(LookupType.name, LookupType.id)
+    ]
+    types_by_id = {lookup_type["id"]: lookup_type for lookup_type in types}
+
+    # Parents come before their children when ordered by depth
+    nodes = {}
+    for row in db_session.execute(select(tree).order_by(tree.c.depth, tree.c.code, tree.c.id)):
+        node = {
+            "id": row.id,
+            "lookup_type_id": row.lookup_type_id,
+            "code": row.code,
+            "label": row.label,
+            "parent_id": row.parent_id,
+            "children": []
+        }
+        nodes[row.id] = node
+        if row.parent_id is None:
+            if row.lookup_type_id in types_by_id:
+                types_by_id[row.lookup_type_id]["lookups"].append(node)
+        else:
+            nodes[row.parent_id]["children"].append(node)
+    return types
+
+
+def encode_body(data):
+    """
+    Encode JSON-serializable data as a compact response body.
+
+    Args:
+        data: JSON-serializable data
+
+    Returns:
+        tuple: (body bytes, strong ETag)
+    """
+    body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return body, hashlib.sha256(body).hexdigest()
+
+
+class LookupTreeCache:
+    """
+    Thread-safe, versioned snapshot of the lookup forest and of the response
+    bodies rendered from it.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self.version = 0
+        self._forest = None
+        self._types_by_id = {}
+        self._lookups_by_id = {}
+        self._bodies = {}
+        self._expires_at = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure the cache from the app config and invalidate it when lookups change.
+
+        Args:
+            app: Flask application
+        """
+        self.ttl = app.config.get("LOOKUP_CACHE_TTL", DEFAULT_TTL)
+        self.invalidate()
+        if not event.contains(Session, "after_flush", self._collect_changes):
+            event.listen(Session, "after_flush", self._collect_changes)
+            event.listen(Session, "after_commit", self._invalidate_changed)
+            event.listen(Session, "after_rollback", self._discard_changes)
+
+    def _load(self, db_session):
+        """Return the current forest, reloading it under a new version when expired. Callers hold the lock."""
+        now = time.monotonic()
+        if self._forest is None or self._expires_at < now:
+            if self._forest is not None:
+                # Expired: other processes may have changed lookups
+                self.version += 1
+                self._bodies = {}
+            self._forest = load_forest(db_session)
+            self._types_by_id = {lookup_type["id"]: lookup_type for lookup_type in self._forest}
+            self._lookups_by_id = {}
+            for lookup_type in self._forest:
+                nodes = list(lookup_type["lookups"])
+                while nodes:
+                    node = nodes.pop()
+                    self._lookups_by_id[node["id"]] = node
+                    nodes.extend(node["children"])
+            self._expires_at = now + self.ttl
+        return self._forest
+
+    def forest(self, db_session):
+        """
+        Return the lookup forest. Callers must not modify it.
+
+        Args:
+            db_session: SQLAlchemy database session
+
+        Returns:
+            list: Lookup types with their lookup trees, as returned by load_forest
+        """
+        with self._lock:
+            return self._load(db_session)
+
+    def lookup_type(self, db_session, lookup_type_id):
+        """
+        Return a lookup type with its lookup trees. Callers must not modify it.
+
+        Args:
+            db_session: SQLAlchemy database session
+            lookup_type_id: ID of the lookup type
+
+        Returns:
+            dict: Lookup type as in the forest, or None if it does not exist
+        """
+        with self._lock:
+            self._load(db_session)
+            return self._types_by_id.get(lookup_type_id)
+
+    def lookup(self, db_session, lookup_id):
+        """
+        Return a lookup with its subtree. Callers must not modify it.
+
+        Args:
+            db_session: SQLAlchemy database session
+            lookup_id: ID of the lookup
+
+        Returns:
+            dict: Lookup tree node, or None if it does not exist
+        """
+        with self._lock:
+            self._load(db_session)
+            return self._lookups_by_id.get(lookup_id)
+
+    def render(self, db_session, key, build):
+        """
+        Return a JSON response body built from the forest, rendered once per version.
+        Keys must come from a fixed set, not from request arguments, so the
+        number of cached bodies stays bounded.
+
+        Args:
+            db_session: SQLAlchemy database session
+            key: Name of the rendering, unique per distinct build
+            build: Function from the forest to JSON-serializable data
+
+        Returns:
+            tuple: (body bytes, strong ETag)
+        """
+        with self._lock:
+            forest = self._load(db_session)
+            if key not in self._bodies:
+                self._bodies[key] = encode_body(build(forest))
+            return self._bodies[key]
+
+    def invalidate(self):
+        """Drop the forest and start a new version; the next read reloads it."""
+        with self._lock:
+            self.version += 1
+            self._forest = None
+            self._types_by_id = {}
+            self._lookups_by_id = {}
+            self._bodies = {}
+
+    def _collect_changes(self, session, flush_context):
+        """Remember whether a flush touched a lookup or lookup type."""
+        for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(instance, (Lookup, LookupType)):
+                session.info["lookups_changed"] = True
+                return
+
+    def _invalidate_changed(self, session):
+        """Invalidate the forest after a commit that changed lookups."""
+        if session.info.pop("lookups_changed", False):
+            self.invalidate()
+
+    def _discard_changes(self, session):
+        """Forget lookup changes of a rolled back transaction."""
+        session.info.pop("lookups_changed", None)
+
+
+lookup_cache = LookupTreeCache()
@@ -2,7 +2,10 @@
 Flask application for Quality Control Management System.
 This is the main entry point for the Gunicorn server.
 """
-from app import app
+# Password worker processes re-import this module as __mp_main__; only the
+# server process loads the app, its schema upgrades and its thread pools
+if __name__ != "__mp_main__":
+    from app import app
 
 if __name__ == "__main__":
     from waitress import serve
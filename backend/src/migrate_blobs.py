@@ -0,0 +1,198 @@
+"""
+Move image data stored in table rows into the blob store.
+Each row keeps only the SHA-256 key of its image; the legacy column is cleared.
+Rows are processed in id order in batches committed one at a time, so the
+migration can be interrupted and re-run safely.
+
+Usage:
+    python migrate_blobs.py [--batch-size N] [--dry-run]
+    python migrate_blobs.py --gc [--grace-hours H]
+"""
+import argparse
+import base64
+import sys
+import time
+
+from app import app, db
+from blob_store import get_blob_store
+from models import ReportImage, QCCWPanelPhoto, QCCWPanelData, ProductPart, PartSubtypeImage, ImageRendition, UploadSession
+
+# (model, legacy data column, blob key column, size column, legacy value is base64 text)
+BLOB_COLUMNS = [
+    (ReportImage, "image_data", "image_key", "image_size", False),
+    (QCCWPanelPhoto, "photo", "photo_key", "photo_size", False),
+    (QCCWPanelData, "profile_photo", "profile_photo_key", "profile_photo_size", False),
+    (ProductPart, "product_part_image", "product_part_image_key", "product_part_image_size", False),
+    (PartSubtypeImage, "image_data", "image_key", "image_size", True),
+]
+
+# (model, blob key column) of every reference kept by garbage collection: the image
+# columns, generated renditions and completed uploads not attached to a row yet
+REFERENCE_COLUMNS = [(model, key_column) for model, _, key_column, _, _ in BLOB_COLUMNS] + [
+    (ImageRendition, "rendition_key"),
+    (UploadSession, "blob_key"),
+]
+
+
+def legacy_filter(model, data_column, key_column):
+    """Build the filter selecting rows whose image is still stored in the row."""
+    data = getattr(model, data_column)
+    condition = data.isnot(None) & getattr(model, key_column).is_(None)
+    if data.type.python_type is str:
+        condition = condition & (data != "")
+    return condition
+
+
+def migrate_column(model, data_column, key_column, size_column, is_base64, batch_size=100, dry_run=False):
+    """
+    Move the images of one column into the blob store.
+
+    Args:
+        model: Model class
+        data_column: Name of the legacy column holding the image
+        key_column: Name of the column receiving the blob key
+        size_column: Name of the column receiving the image size
+        is_base64: Whether the legacy column holds base64 text
+        batch_size: Rows per batch
+        dry_run: Only count the rows that would be migrated
+
+    Returns:
+        int: Number of rows migrated (or to migrate when dry_run)
+    """
+    condition = legacy_filter(model, data_column, key_column)
+    if dry_run:
+        return db.session.query(model.id).filter(condition).count()
+
+    store = get_blob_store()
+    cleared = "" if is_base64 else None
+    migrated = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(model.id, getattr(model, data_column)).filter(
+            condition, model.id > last_id
+        ).order_by(model.id).limit(batch_size).all()
+        if not rows:
+            break
+
+        updates = []
+        for row_id, data in rows:
+            if is_base64:
+                data = base64.b64decode(data.split(",", 1)[1] if "," in data else data)
+            updates.append({"id": row_id, key_column: store.put(data), size_column: len(data), data_column: cleared})
+        db.session.bulk_update_mappings(model, updates)
+        db.session.commit()
+        # Drop the batch from the identity map so memory stays bounded
+        db.session.expunge_all()
+
+        migrated += len(rows)
+        last_id = rows[-1][0]
+        print(f"  {model.__tablename__}.{data_column}: {migrated} rows migrated")
+    return migrated
+
+
+def backfill_sizes(model, key_column, size_column, batch_size=100):
+    """
+    Fill in the size of images moved to the blob store before sizes were recorded.
+
+    Args:
+        model: Model class
+        key_column: Name of the blob key column
+        size_column: Name of the size column
+        batch_size: Rows per batch
+
+    Returns:
+        int: Number of rows updated
+    """
+    store = get_blob_store()
+    key = getattr(model, key_column)
+    condition = key.isnot(None) & getattr(model, size_column).is_(None)
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(model.id, key).filter(
+            condition, model.id > last_id
+        ).order_by(model.id).limit(batch_size).all()
+        if not rows:
+            break
+        db.session.bulk_update_mappings(model, [
+            {"id": row_id, size_column: store.size(blob)} for row_id, blob in rows
+        ])
+        db.session.commit()
+        updated += len(rows)
+        last_id = rows[-1][0]
+    return updated
+
+
+def migrate_blobs(batch_size=100, dry_run=False):
+    """
+    Move all legacy image columns into the blob store.
+
+    Args:
+        batch_size: Rows per batch
+        dry_run: Only report the number of rows to migrate
+
+    Returns:
+        int: Total number of rows migrated (or to migrate when dry_run)
+    """
+    total = 0
+    for model, data_column, key_column, size_column, is_base64 in BLOB_COLUMNS:
+        count = migrate_column(model, data_column, key_column, size_column, is_base64, batch_size, dry_run)
+        action = "to migrate" if dry_run else "migrated"
+        print(f"{model.__tablename__}.{data_column}: {count} rows {action}")
+        total += count
+        if not dry_run:
+            sized = backfill_sizes(model, key_column, size_column, batch_size)
+            if sized:
+                print(f"{model.__tablename__}.{size_column}: {sized} sizes backfilled")
+    if not dry_run and total:
+        print("Run VACUUM on the migrated tables to return the freed space to the database")
+    return total
+
+
+def collect_garbage(grace_hours=24):
+    """
+    Delete blobs no longer referenced by any row.
+    Blobs written within the grace period are kept, since they may belong to a
+    request that has not committed its row yet.
+
+    Args:
+        grace_hours: Minimum age in hours of a blob before it can be deleted
+
+    Returns:
+        int: Number of blobs deleted
+    """
+    referenced = set()
+    for model, key_column in REFERENCE_COLUMNS:
+        key = getattr(model, key_column)
+        referenced.update(value for (value,) in db.session.query(key).filter(key.isnot(None)).distinct())
+
+    store = get_blob_store()
+    cutoff = time.time() - grace_hours * 3600
+    deleted = 0
+    for key, modified_at in store.list_blobs():
+        if key not in referenced and modified_at < cutoff:
+            store.delete(key)
+            deleted += 1
+    print(f"Deleted {deleted} unreferenced blobs, {len(referenced)} referenced")
+    return deleted
+
+
+def main():
+    """Entry point for the blob migration command."""
+    parser = argparse.ArgumentParser(description="Move image data from table rows into the blob store")
+    parser.add_argument("--batch-size", type=int, default=100, help="Rows per committed batch")
+    parser.add_argument("--dry-run", action="store_true", help="Only count rows to migrate")
+    parser.add_argument("--gc", action="store_true", help="Delete unreferenced blobs instead of migrating")
+    parser.add_argument("--grace-hours", type=float, default=24, help="Keep unreferenced blobs younger than this")
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.gc:
+            collect_garbage(args.grace_hours)
+        else:
+            migrate_blobs(args.batch_size, args.dry_run)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,75 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Date, Float, CheckConstraint, Numeric, LargeBinary, Time
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Date, Float, CheckConstraint, Numeric, LargeBinary, Time, Index, JSON
+from sqlalchemy import and_, or_, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import column_property, deferred
 from sqlalchemy.sql import func
-from passlib.hash import bcrypt
 from flask_login import UserMixin
 import os
 import base64
 import json
 
+from blob_store import get_blob_store
+from password_service import hash_password, password_verifier
+
 # Create SQLAlchemy instance
 db = SQLAlchemy()
 
+# JSON documents are JSONB on PostgreSQL and JSON text on SQLite; the driver
+# serializes them, so rows hold dicts and lists. Python None is stored as SQL NULL.
+JSONDocument = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+
+def parse_json_value(data):
+    """
+    Convert a request value for a JSON document column to the value to store.
+    Clients may send documents already encoded as JSON strings; strings encoding
+    an object or array are decoded so they are stored as documents. Other strings,
+    including "123" or "true", are kept as JSON strings.
+    """
+    if isinstance(data, str):
+        if not data.strip():
+            return None
+        try:
+            document = json.loads(data)
+        except ValueError:
+            return data
+        return document if isinstance(document, (dict, list)) else data
+    return data
+
+
+def json_contains(column, document):
+    """
+    Filter rows whose JSON document column contains the given keys and values.
+    Uses @> on PostgreSQL, which the GIN indexes serve, and json_extract elsewhere.
+
+    Args:
+        column: JSONDocument column
+        document: Dict of keys and values to match
+
+    Returns:
+        SQLAlchemy boolean expression
+    """
+    if db.engine.dialect.name == "postgresql":
+        return column.contains(document)
+    return and_(*[
+        func.json_extract(column, f'$."{key}"') == value for key, value in document.items()
+    ])
+
+
+def decode_base64_image(base64_str):
+    """Decode a base64 image, removing a data URL prefix if present (e.g., "data:image/png;base64,")."""
+    if ',' in base64_str:
+        base64_str = base64_str.split(',', 1)[1]
+    return base64.b64decode(base64_str)
+
+
+def load_blob(key, legacy_data=None):
+    """Read image bytes from the blob store, or from the legacy table column if not migrated yet."""
+    if key:
+        return get_blob_store().get(key)
+    return legacy_data or None
+
 class User(db.Model, UserMixin):
     __tablename__ = "users"
 
@@ -20,16 +80,25 @@ class User(db.Model, UserMixin):
     role = Column(String(20), nullable=False, default="inspector")
     department = Column(String(50))
     is_active = Column(Boolean, default=True)
+    token_version = Column(Integer, nullable=True, default=0)  # Bumped to revoke issued access tokens
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     qc_sessions = db.relationship("QCSession", back_populates="inspector_user", foreign_keys="QCSession.inspector_id")
 
+    def revoke_tokens(self):
+        """Invalidate all access tokens issued to the user so far."""
+        self.token_version = (self.token_version or 0) + 1
+
     def set_password(self, password):
-        self.password_hash = bcrypt.hash(password)
+        self.password_hash = hash_password(password)
 
     def verify_password(self, password):
-        return bcrypt.verify(password, self.password_hash)
+        """Verify a password, upgrading the stored hash when the configured bcrypt cost changed."""
+        valid, new_hash = password_verifier.verify(password, self.password_hash)
+        if new_hash:
+            self.password_hash = new_hash
+        return valid
 
     def is_admin(self):
         return self.role == "admin"
@@ -59,6 +128,8 @@ class Product(db.Model):
     # Constraints
     __table_args__ = (
         CheckConstraint("status IN ('pending', 'qc_passed', 'shipped', 'complete')", name="valid_status"),
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_status_created_at_id", "status", "created_at", "id"),
     )
 
 
@@ -76,6 +147,13 @@ class QCSession(db.Model):
     attribute_values = db.relationship("QCAttributeValue", back_populates="qc_session", cascade="all, delete-orphan")
     photos = db.relationship("QCPhoto", back_populates="qc_session", cascade="all, delete-orphan")
 
+    # Indexes
+    __table_args__ = (
+        Index("ix_qc_sessions_product_performed_at", "product_id", "performed_at"),
+        Index("ix_qc_sessions_performed_at_id", "performed_at", "id"),
+        Index("ix_qc_sessions_inspector_performed_at", "inspector_id", "performed_at", "id"),
+    )
+
 
 class QCAttributeDef(db.Model):
     __tablename__ = "qc_attribute_defs"
@@ -137,6 +215,8 @@ class Lookup(db.Model):
     # Constraints
     __table_args__ = (
         CheckConstraint('parent_id != id', name='no_self_reference'),
+        # Children of a lookup, joined level by level when the lookup forest is loaded
+        Index("ix_lookups_parent_id", "parent_id"),
     )
 
 
@@ -207,6 +287,52 @@ class InventorySnapshot(db.Model):
     # Constraints
     __table_args__ = (
         CheckConstraint("quantity >= 0", name="non_negative_quantity"),
+        # Latest snapshot per part subtype and warehouse
+        Index("ix_inventory_snapshots_subtype_warehouse_date", "part_subtype_id", "warehouse_id", "snapshot_date"),
+    )
+
+
+class CurrentInventory(db.Model):
+    """
+    Current stock per part subtype and warehouse: the quantity of the latest
+    inventory snapshot plus the shipments received after its date. Maintained
+    by the inventory module in the transaction that records a snapshot or shipment.
+    """
+    __tablename__ = "current_inventory"
+
+    part_subtype_id = Column(Integer, ForeignKey("part_subtypes.id", ondelete="CASCADE"), primary_key=True)
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id", ondelete="CASCADE"), primary_key=True)
+    quantity = Column(Integer, nullable=False)
+    snapshot_id = Column(Integer, nullable=True)  # Latest InventorySnapshot.id, None before the first count
+    snapshot_date = Column(Date, nullable=True)
+    as_of = Column(Date, nullable=False)  # Date of the latest snapshot or shipment included
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    part_subtype = db.relationship("PartSubtype")
+    warehouse = db.relationship("Warehouse")
+
+
+class InventoryRollup(db.Model):
+    """
+    Inventory aggregated per day, week or month, part subtype and warehouse.
+    Maintained by the inventory module when snapshots and shipments are recorded.
+    """
+    __tablename__ = "inventory_rollups"
+
+    bucket = Column(String(5), primary_key=True)  # 'day', 'week' (starting Monday) or 'month'
+    period_start = Column(Date, primary_key=True)
+    part_subtype_id = Column(Integer, ForeignKey("part_subtypes.id", ondelete="CASCADE"), primary_key=True)
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id", ondelete="CASCADE"), primary_key=True)
+    closing_quantity = Column(Integer, nullable=True)  # Latest snapshot of the period, None without snapshots
+    closing_date = Column(Date, nullable=True)
+    average_quantity = Column(Numeric(14, 2), nullable=True)  # Mean of the snapshots of the period
+    snapshot_count = Column(Integer, nullable=False, default=0)
+    received_quantity = Column(Integer, nullable=False, default=0)  # Shipments received in the period
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint("bucket IN ('day', 'week', 'month')", name="valid_rollup_bucket"),
     )
 
 
@@ -227,6 +353,18 @@ class PartShipment(db.Model):
     # Constraints
     __table_args__ = (
         CheckConstraint("quantity > 0", name="positive_quantity"),
+        # Shipments received after a snapshot, summed when the snapshot is recorded
+        Index("ix_part_shipments_subtype_warehouse_received", "part_subtype_id", "warehouse_id", "received_at"),
+        # Keyset pages of the shipment list, unfiltered or by one filter; the
+        # included columns let PostgreSQL answer from the index alone
+        Index("ix_part_shipments_received_id", "received_at", "id",
+              postgresql_include=["part_subtype_id", "warehouse_id", "quantity", "vendor"]),
+        Index("ix_part_shipments_warehouse_received_id", "warehouse_id", "received_at", "id",
+              postgresql_include=["part_subtype_id", "quantity", "vendor"]),
+        Index("ix_part_shipments_subtype_received_id", "part_subtype_id", "received_at", "id",
+              postgresql_include=["warehouse_id", "quantity", "vendor"]),
+        Index("ix_part_shipments_vendor_received_id", "vendor", "received_at", "id",
+              postgresql_include=["part_subtype_id", "warehouse_id", "quantity"]),
     )
 
 
@@ -260,12 +398,41 @@ class PartSubtypeImage(db.Model):
 
     id = Column(Integer, primary_key=True, index=True)
     part_subtype_id = Column(Integer, ForeignKey("part_subtypes.id"), nullable=False)
-    image_data = Column(Text, nullable=False)  # Base64 encoded image
+    image_data = deferred(Column(Text, nullable=False, default=""))  # Legacy base64 encoded image, emptied once moved to the blob store
+    image_key = Column(String(64), nullable=True)  # Blob store key (SHA-256)
+    image_size = Column(Integer, nullable=True)  # Image size in bytes
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     # Relationships
     part_subtype = db.relationship("PartSubtype", back_populates="images")
 
+    def set_image_blob(self, key, size):
+        """Reference an image already in the blob store"""
+        self.image_key = key
+        self.image_size = size
+        self.image_data = ""
+
+    def set_image_bytes(self, data):
+        """Store image bytes in the blob store and keep only the reference"""
+        self.set_image_blob(get_blob_store().put(data) if data else None, len(data) if data else None)
+
+    def set_image_from_base64(self, base64_str):
+        """Store a base64 encoded image in the blob store"""
+        if base64_str:
+            self.set_image_bytes(decode_base64_image(base64_str))
+
+    def get_image_bytes(self):
+        """Read the image bytes"""
+        if self.image_key:
+            return get_blob_store().get(self.image_key)
+        return base64.b64decode(self.image_data) if self.image_data else None
+
+    def get_image_as_base64(self):
+        """Return the image as a base64 string for display"""
+        if self.image_key:
+            return base64.b64encode(self.get_image_bytes()).decode('utf-8')
+        return self.image_data or None
+
 
 class ProductPart(db.Model):
     """
@@ -277,7 +444,10 @@ class ProductPart(db.Model):
     product_part_id = Column(String(50), nullable=False, unique=True, comment="Die # (PF)")
     product_part_name = Column(String(100), nullable=False, comment="Die Name")
     product_part_vendor = Column(String(100), nullable=True, comment="Die # (Vendor)")
-    product_part_image = Column(LargeBinary, nullable=True, comment="Profile Image stored as binary data")
+    product_part_image = deferred(Column(LargeBinary, nullable=True, comment="Legacy Profile Image binary data, moved to the blob store"))
+    product_part_image_key = Column(String(64), nullable=True, comment="Profile Image blob store key (SHA-256)")
+    product_part_image_size = Column(Integer, nullable=True, comment="Profile Image size in bytes")
+    has_image = column_property(or_(product_part_image_key.isnot(None), product_part_image.expression.isnot(None)))
     product_part_type = Column(String(100), nullable=True, comment="Type (e.g. Mullion)")
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -285,18 +455,30 @@ class ProductPart(db.Model):
     # Relationships
     product_colors = db.relationship("ProductColor", back_populates="product_part", cascade="all, delete-orphan")
 
+    def set_image_blob(self, key, size):
+        """Reference an image already in the blob store"""
+        self.product_part_image_key = key
+        self.product_part_image_size = size
+        self.product_part_image = None
+
+    def set_image_bytes(self, data):
+        """Store image bytes in the blob store and keep only the reference"""
+        self.set_image_blob(get_blob_store().put(data) if data else None, len(data) if data else None)
+
     def set_image_from_base64(self, base64_str):
         """Convert base64 string to binary data for storage"""
         if base64_str:
-            # Remove data URL prefix if present (e.g., "data:image/png;base64,")
-            if ',' in base64_str:
-                base64_str = base64_str.split(',', 1)[1]
-            self.product_part_image = base64.b64decode(base64_str)
+            self.set_image_bytes(decode_base64_image(base64_str))
+    
+    def get_image_bytes(self):
+        """Read the image bytes"""
+        return load_blob(self.product_part_image_key, self.product_part_image)
     
     def get_image_as_base64(self):
         """Convert binary image data to base64 string for display"""
-        if self.product_part_image:
-            return base64.b64encode(self.product_part_image).decode('utf-8')
+        data = self.get_image_bytes()
+        if data:
+            return base64.b64encode(data).decode('utf-8')
         return None
 
 
@@ -309,6 +491,7 @@ class CoatingColor(db.Model):
     id = Column(Integer, primary_key=True, index=True)
     coating_color_name = Column(String(100), nullable=False, unique=True, comment="Name of the coating color")
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     product_colors = db.relationship("ProductColor", back_populates="coating_color", cascade="all, delete-orphan")
@@ -324,6 +507,7 @@ class ProductColor(db.Model):
     product_part_id = Column(Integer, ForeignKey("product_parts.id", ondelete="CASCADE"), nullable=False)
     coating_color_id = Column(Integer, ForeignKey("coating_colors.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     product_part = db.relationship("ProductPart", back_populates="product_colors")
@@ -347,10 +531,10 @@ class QCReport(db.Model):
 
     id = Column(Integer, primary_key=True, index=True)
     report_id = Column(String(50), nullable=False, unique=True, index=True)
-    strs_batch = Column(Text, nullable=True, comment="JSON data for StrS Batch information (shared across all batch items)")
-    catalyst_batch = Column(Text, nullable=True, comment="JSON data for Catalyst Batch information (shared across all batch items)")
-    primer_c = Column(Text, nullable=True, comment="JSON data for Primer C information (shared across all batch items)")
-    batch_items = Column(Text, nullable=True, comment="JSON array of batch items, each containing an individual panels_glazed value")
+    strs_batch = Column(JSONDocument, nullable=True, comment="JSON data for StrS Batch information (shared across all batch items)")
+    catalyst_batch = Column(JSONDocument, nullable=True, comment="JSON data for Catalyst Batch information (shared across all batch items)")
+    primer_c = Column(JSONDocument, nullable=True, comment="JSON data for Primer C information (shared across all batch items)")
+    batch_items = Column(JSONDocument, nullable=True, comment="JSON array of batch items, each containing an individual panels_glazed value")
     # These fields are shared across all batch items in a report
     panels_glazed = Column(String(100), nullable=True, comment="Default panels_glazed for backward compatibility")
     date_glazed = Column(Date, nullable=True, comment="Date glazed (shared across all batch items)")
@@ -363,69 +547,44 @@ class QCReport(db.Model):
     creator = db.relationship("User", foreign_keys=[created_by])
     images = db.relationship("ReportImage", back_populates="report", cascade="all, delete-orphan")
 
+    # Batch lookups by "Batch #" / "Lot #" are served by these on PostgreSQL
+    __table_args__ = tuple(
+        Index(f"ix_qc_reports_{name}", name, postgresql_using="gin",
+              postgresql_ops={name: "jsonb_path_ops"}).ddl_if(dialect="postgresql")
+        for name in ("strs_batch", "catalyst_batch", "primer_c")
+    )
+
     def set_strs_batch(self, batch_data):
-        """Set StrS Batch data as JSON"""
-        if isinstance(batch_data, dict):
-            self.strs_batch = json.dumps(batch_data)
-        else:
-            self.strs_batch = batch_data
+        """Set StrS Batch data"""
+        self.strs_batch = parse_json_value(batch_data)
     
     def get_strs_batch(self):
         """Get StrS Batch data as dict"""
-        if self.strs_batch:
-            try:
-                return json.loads(self.strs_batch)
-            except:
-                return {}
-        return {}
+        return self.strs_batch if isinstance(self.strs_batch, dict) else {}
     
     def set_catalyst_batch(self, batch_data):
-        """Set Catalyst Batch data as JSON"""
-        if isinstance(batch_data, dict):
-            self.catalyst_batch = json.dumps(batch_data)
-        else:
-            self.catalyst_batch = batch_data
+        """Set Catalyst Batch data"""
+        self.catalyst_batch = parse_json_value(batch_data)
     
     def get_catalyst_batch(self):
         """Get Catalyst Batch data as dict"""
-        if self.catalyst_batch:
-            try:
-                return json.loads(self.catalyst_batch)
-            except:
-                return {}
-        return {}
+        return self.catalyst_batch if isinstance(self.catalyst_batch, dict) else {}
     
     def set_primer_c(self, primer_data):
-        """Set Primer C data as JSON"""
-        if isinstance(primer_data, dict):
-            self.primer_c = json.dumps(primer_data)
-        else:
-            self.primer_c = primer_data
+        """Set Primer C data"""
+        self.primer_c = parse_json_value(primer_data)
     
     def get_primer_c(self):
         """Get Primer C data as dict"""
-        if self.primer_c:
-            try:
-                return json.loads(self.primer_c)
-            except:
-                return {}
-        return {}
+        return self.primer_c if isinstance(self.primer_c, dict) else {}
     
     def set_batch_items(self, items_data):
-        """Set batch items as JSON array"""
-        if isinstance(items_data, list):
-            self.batch_items = json.dumps(items_data)
-        else:
-            self.batch_items = items_data
+        """Set batch items"""
+        self.batch_items = parse_json_value(items_data)
     
     def get_batch_items(self):
         """Get batch items as list of dicts"""
-        if self.batch_items:
-            try:
-                return json.loads(self.batch_items)
-            except:
-                return []
-        return []
+        return self.batch_items if isinstance(self.batch_items, list) else []
 
 
 class ReportImage(db.Model):
@@ -436,27 +595,49 @@ class ReportImage(db.Model):
 
     id = Column(Integer, primary_key=True, index=True)
     report_id = Column(Integer, ForeignKey("qc_reports.id", ondelete="CASCADE"), nullable=False)
-    image_data = Column(LargeBinary, nullable=True)
+    image_data = deferred(Column(LargeBinary, nullable=True))  # Legacy binary data, moved to the blob store
+    image_key = Column(String(64), nullable=True)  # Blob store key (SHA-256)
+    image_size = Column(Integer, nullable=True)  # Image size in bytes
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     # Relationships
     report = db.relationship("QCReport", back_populates="images")
     
+    def set_image_blob(self, key, size):
+        """Reference an image already in the blob store"""
+        self.image_key = key
+        self.image_size = size
+        self.image_data = None
+    
+    def set_image_bytes(self, data):
+        """Store image bytes in the blob store and keep only the reference"""
+        self.set_image_blob(get_blob_store().put(data) if data else None, len(data) if data else None)
+    
     def set_image_from_base64(self, base64_str):
         """Convert base64 string to binary data for storage"""
         if base64_str:
-            # Remove data URL prefix if present (e.g., "data:image/png;base64,")
-            if ',' in base64_str:
-                base64_str = base64_str.split(',', 1)[1]
-            self.image_data = base64.b64decode(base64_str)
+            self.set_image_bytes(decode_base64_image(base64_str))
+    
+    def get_image_bytes(self):
+        """Read the image bytes"""
+        return load_blob(self.image_key, self.image_data)
     
     def get_image_as_base64(self):
         """Convert binary image data to base64 string for display"""
-        if self.image_data:
-            return base64.b64encode(self.image_data).decode('utf-8')
+        data = self.get_image_bytes()
+        if data:
+            return base64.b64encode(data).decode('utf-8')
         return None
 
 
+
+# Number of images of a report, loaded on request with undefer() so report lists need no image rows
+QCReport.image_count = column_property(
+    select(func.count(ReportImage.id)).where(ReportImage.report_id == QCReport.id).correlate_except(ReportImage).scalar_subquery(),
+    deferred=True
+)
+
+
 # QC CW Panel Data Models
 class QCCWPanelData(db.Model):
     """
@@ -473,67 +654,71 @@ class QCCWPanelData(db.Model):
     ipa_cleaned = Column(Boolean, default=False)  # Checkbox
     sealant_frame_enough = Column(Boolean, default=False)  # Checkbox
     
-    # Panel measurements as JSON fields
-    width_l = Column(Text, nullable=True)  # {'GZ_office': numeric, 'factory_offer': 'yes'/'no, add sealant'}
-    width_r = Column(Text, nullable=True)
-    height_1 = Column(Text, nullable=True)
-    height_2 = Column(Text, nullable=True)
-    height_3 = Column(Text, nullable=True)
-    height_4 = Column(Text, nullable=True)
+    # Panel measurements as JSON documents
+    width_l = Column(JSONDocument, nullable=True)  # {'GZ_office': numeric, 'factory_offer': 'yes'/'no, add sealant'}
+    width_r = Column(JSONDocument, nullable=True)
+    height_1 = Column(JSONDocument, nullable=True)
+    height_2 = Column(JSONDocument, nullable=True)
+    height_3 = Column(JSONDocument, nullable=True)
+    height_4 = Column(JSONDocument, nullable=True)
     
     # Cavities information
     cavities_invert = Column(Integer, nullable=True)  # Number of cavities
-    cavity_ro_height_total = Column(Text, nullable=True)  # {'GZ_office': numeric, 'factory_offer': numeric}
-    cavity_diag_cw_pan_l = Column(Text, nullable=True)
-    cavity_diag_cw_pan_r = Column(Text, nullable=True)
+    cavity_ro_height_total = Column(JSONDocument, nullable=True)  # {'GZ_office': numeric, 'factory_offer': numeric}
+    cavity_diag_cw_pan_l = Column(JSONDocument, nullable=True)
+    cavity_diag_cw_pan_r = Column(JSONDocument, nullable=True)
     
     # Mullion parts as JSON
-    left = Column(Text, nullable=True)  # {'GZ_office': product_part_id, 'IT_look': image}
-    middle = Column(Text, nullable=True)
-    right = Column(Text, nullable=True)
-    head = Column(Text, nullable=True)
-    sill = Column(Text, nullable=True)
+    left = Column(JSONDocument, nullable=True)  # {'GZ_office': product_part_id, 'IT_look': image}
+    middle = Column(JSONDocument, nullable=True)
+    right = Column(JSONDocument, nullable=True)
+    head = Column(JSONDocument, nullable=True)
+    sill = Column(JSONDocument, nullable=True)
     
     # Transom parts as JSON
-    trans_1 = Column(Text, nullable=True)  # Only D015, D016
-    trans_2 = Column(Text, nullable=True)
-    trans_3 = Column(Text, nullable=True)
+    trans_1 = Column(JSONDocument, nullable=True)  # Only D015, D016
+    trans_2 = Column(JSONDocument, nullable=True)
+    trans_3 = Column(JSONDocument, nullable=True)
     
     # Bracket parts as JSON
-    bracket_l = Column(Text, nullable=True)  # Only parts with prefix D06
-    bracket_r = Column(Text, nullable=True)
+    bracket_l = Column(JSONDocument, nullable=True)  # Only parts with prefix D06
+    bracket_r = Column(JSONDocument, nullable=True)
     
     # Infill location
-    infill_fs_location = Column(Text, nullable=True)  # {'GZ_office': int, 'factory_offer': boolean}
+    infill_fs_location = Column(JSONDocument, nullable=True)  # {'GZ_office': int, 'factory_offer': boolean}
     
     # Infill types (combined in groups)
-    infills_1_type = Column(Text, nullable=True)  # {'GZ_office': text, 'GZ_office_2': text, 'factory_offer': boolean}
-    infills_2_type = Column(Text, nullable=True)
-    infills_3_type = Column(Text, nullable=True)
-    infills_4_type = Column(Text, nullable=True)
-    infills_right_1_type = Column(Text, nullable=True)  # For right combined panel
-    infills_right_2_type = Column(Text, nullable=True)
-    infills_right_3_type = Column(Text, nullable=True)
-    infills_right_4_type = Column(Text, nullable=True)
+    infills_1_type = Column(JSONDocument, nullable=True)  # {'GZ_office': text, 'GZ_office_2': text, 'factory_offer': boolean}
+    infills_2_type = Column(JSONDocument, nullable=True)
+    infills_3_type = Column(JSONDocument, nullable=True)
+    infills_4_type = Column(JSONDocument, nullable=True)
+    infills_right_1_type = Column(JSONDocument, nullable=True)  # For right combined panel
+    infills_right_2_type = Column(JSONDocument, nullable=True)
+    infills_right_3_type = Column(JSONDocument, nullable=True)
+    infills_right_4_type = Column(JSONDocument, nullable=True)
     
     # Infill colors
-    infills_1_color = Column(Text, nullable=True)  # {'GZ_office': text, 'factory_offer': boolean}
-    infills_2_color = Column(Text, nullable=True)
-    infills_3_color = Column(Text, nullable=True)
-    infills_4_color = Column(Text, nullable=True)
-    infills_right_1_color = Column(Text, nullable=True)
-    infills_right_2_color = Column(Text, nullable=True)
-    infills_right_3_color = Column(Text, nullable=True)
-    infills_right_4_color = Column(Text, nullable=True)
+    infills_1_color = Column(JSONDocument, nullable=True)  # {'GZ_office': text, 'factory_offer': boolean}
+    infills_2_color = Column(JSONDocument, nullable=True)
+    infills_3_color = Column(JSONDocument, nullable=True)
+    infills_4_color = Column(JSONDocument, nullable=True)
+    infills_right_1_color = Column(JSONDocument, nullable=True)
+    infills_right_2_color = Column(JSONDocument, nullable=True)
+    infills_right_3_color = Column(JSONDocument, nullable=True)
+    infills_right_4_color = Column(JSONDocument, nullable=True)
     
     # Additional fields
     qc_infill_affix = Column(String(200), nullable=True)  # Text field
     structural_sealant_records = Column(Text, nullable=True)  # Text area
     lmr = Column(String(1), nullable=True)  # L, M, or R
-    type_gz_factory = Column(Text, nullable=True)  # {'GZ_office': text, 'factory_offer': text}
+    type_gz_factory = Column(JSONDocument, nullable=True)  # {'GZ_office': text, 'factory_offer': text}
+    isa_type = Column(JSONDocument, nullable=True)  # {'GZ_office': text, 'factory_floor': text}
     
     # Image fields
-    profile_photo = Column(LargeBinary, nullable=True)  # For storing the image
+    profile_photo = deferred(Column(LargeBinary, nullable=True))  # Legacy binary data, moved to the blob store
+    profile_photo_key = Column(String(64), nullable=True)  # Blob store key (SHA-256)
+    profile_photo_size = Column(Integer, nullable=True)  # Image size in bytes
+    has_profile_photo = column_property(or_(profile_photo_key.isnot(None), profile_photo.expression.isnot(None)))
     
     # Final checks
     edge_bead_attached = Column(Boolean, default=False)
@@ -557,41 +742,51 @@ class QCCWPanelData(db.Model):
     updater = db.relationship("User", foreign_keys=[updated_by])
     frame_cavities_values = db.relationship("FrameCavitiesValue", back_populates="panel", cascade="all, delete-orphan")
     panel_photos = db.relationship("QCCWPanelPhoto", back_populates="panel", cascade="all, delete-orphan")
+    measurements = db.relationship("PanelMeasurement", back_populates="panel", cascade="all, delete-orphan")
+    
+    # Indexes
+    __table_args__ = (
+        # One panel per floor position; also serves floor listings ordered by pan_id
+        Index("uq_qc_cw_panel_data_fl_pan", "fl_id", "pan_id", unique=True),
+    )
+    
+    def get_profile_photo_bytes(self):
+        """Read the profile photo bytes."""
+        return load_blob(self.profile_photo_key, self.profile_photo)
     
     def get_profile_photo_as_base64(self):
         """Convert binary image data to base64 for transmission."""
-        if self.profile_photo:
-            return base64.b64encode(self.profile_photo).decode('utf-8')
+        data = self.get_profile_photo_bytes()
+        if data:
+            return base64.b64encode(data).decode('utf-8')
         return None
     
+    def set_profile_photo_blob(self, key, size):
+        """Reference a profile photo already in the blob store, or clear the photo when key is None."""
+        self.profile_photo_key = key
+        self.profile_photo_size = size
+        self.profile_photo = None
+    
+    def set_profile_photo_bytes(self, data):
+        """Store profile photo bytes in the blob store, or clear the photo when empty."""
+        self.set_profile_photo_blob(get_blob_store().put(data) if data else None, len(data) if data else None)
+    
     def set_profile_photo_from_base64(self, base64_data):
         """Set profile photo from base64 encoded data."""
         if base64_data:
-            # Extract the base64 content after the comma if it includes data URL format
-            if ',' in base64_data:
-                base64_data = base64_data.split(',', 1)[1]
-            self.profile_photo = base64.b64decode(base64_data)
+            self.set_profile_photo_bytes(decode_base64_image(base64_data))
     
     def set_json_field(self, field_name, data):
         """Set JSON field by name"""
         if hasattr(self, field_name) and data is not None:
-            if isinstance(data, dict):
-                setattr(self, field_name, json.dumps(data))
-            else:
-                setattr(self, field_name, data)
+            setattr(self, field_name, parse_json_value(data))
     
     def get_json_field(self, field_name):
         """Get JSON field by name as dict"""
         value = getattr(self, field_name, None)
-        if value:
-            try:
-                return json.loads(value)
-            except:
-                return {}
-        return {}
+        return value if value else {}
 
 
-# Frame Cavities Attribute Model
 class FrameCavitiesAttribute(db.Model):
     """
     Frame Cavities Attribute model for storing attributes that depend on fl_id.
@@ -646,6 +841,33 @@ class FrameCavitiesValue(db.Model):
     attribute = db.relationship("FrameCavitiesAttribute", back_populates="values")
 
 
+# Panel Measurements Model
+class PanelMeasurement(db.Model):
+    """
+    Numeric panel dimension, one row per panel, measurement and source.
+    Mirrors the numeric values of the dimension documents on QCCWPanelData
+    (width_l, height_1, cavity_diag_cw_pan_l, ...) so deviation queries run in SQL.
+    """
+    __tablename__ = "panel_measurements"
+    
+    id = Column(Integer, primary_key=True)
+    panel_id = Column(Integer, ForeignKey("qc_cw_panel_data.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String(40), nullable=False)  # Panel field name, e.g. 'width_l'
+    source = Column(String(20), nullable=False)  # Document key, e.g. 'GZ_office', 'factory_floor'
+    value = Column(Numeric(12, 3), nullable=False)  # mm
+    
+    # Setup relationships
+    panel = db.relationship("QCCWPanelData", back_populates="measurements")
+    
+    # Indexes
+    __table_args__ = (
+        # One value per panel, measurement and source; joins the sources of a panel
+        Index("uq_panel_measurements_panel_kind_source", "panel_id", "kind", "source", unique=True),
+        # Scans one measurement and source across panels, in panel order, without reading the table
+        Index("ix_panel_measurements_kind_source_panel", "kind", "source", "panel_id", "value"),
+    )
+
+
 # QC CW Panel Photos Model
 class QCCWPanelPhoto(db.Model):
     """
@@ -655,7 +877,9 @@ class QCCWPanelPhoto(db.Model):
     
     id = Column(Integer, primary_key=True, index=True)
     panel_id = Column(Integer, ForeignKey("qc_cw_panel_data.id", ondelete="CASCADE"), nullable=False)
-    photo = Column(LargeBinary, nullable=True)
+    photo = deferred(Column(LargeBinary, nullable=True))  # Legacy binary data, moved to the blob store
+    photo_key = Column(String(64), nullable=True)  # Blob store key (SHA-256)
+    photo_size = Column(Integer, nullable=True)  # Image size in bytes
     photo_type = Column(String(50), nullable=True)  # Type of photo (profile, sealant, etc.)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -663,16 +887,127 @@ class QCCWPanelPhoto(db.Model):
     # Setup relationships
     panel = db.relationship("QCCWPanelData", back_populates="panel_photos")
     
+    def get_photo_bytes(self):
+        """Read the photo bytes."""
+        return load_blob(self.photo_key, self.photo)
+    
     def get_photo_as_base64(self):
         """Convert binary image data to base64 for transmission."""
-        if self.photo:
-            return base64.b64encode(self.photo).decode('utf-8')
+        data = self.get_photo_bytes()
+        if data:
+            return base64.b64encode(data).decode('utf-8')
         return None
     
+    def set_photo_blob(self, key, size):
+        """Reference a photo already in the blob store."""
+        self.photo_key = key
+        self.photo_size = size
+        self.photo = None
+    
+    def set_photo_bytes(self, data):
+        """Store photo bytes in the blob store and keep only the reference."""
+        self.set_photo_blob(get_blob_store().put(data) if data else None, len(data) if data else None)
+    
     def set_photo_from_base64(self, base64_data):
         """Set photo from base64 encoded data."""
         if base64_data:
-            # Extract the base64 content after the comma if it includes data URL format
-            if ',' in base64_data:
-                base64_data = base64_data.split(',', 1)[1]
-            self.photo = base64.b64decode(base64_data)
\ No newline at end of file
+            self.set_photo_bytes(decode_base64_image(base64_data))
+
+# Export Job Model
+class ExportJob(db.Model):
+    """
+    Asynchronous Excel export job and the artifact it produced.
+    Jobs with the same fingerprint export identical data and share one artifact.
+    """
+    __tablename__ = "export_jobs"
+
+    id = Column(String(36), primary_key=True)  # UUID
+    export_type = Column(String(50), nullable=False)
+    fingerprint = Column(String(64), nullable=False, index=True)  # SHA-256 of export type and data version
+    status = Column(String(20), nullable=False, default="queued")
+    file_path = Column(Text, nullable=True)
+    filename = Column(String(200), nullable=True)
+    error = Column(Text, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Setup relationships
+    creator = db.relationship("User", foreign_keys=[created_by])
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint("status IN ('queued', 'running', 'completed', 'failed')", name="valid_export_status"),
+    )
+
+
+# Image Rendition Model
+class ImageRendition(db.Model):
+    """
+    Resized rendition of an image in the blob store.
+    Renditions are keyed by the blob key of the source image and the rendition
+    spec, so they are shared by every row referencing the same image.
+    """
+    __tablename__ = "image_renditions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_key = Column(String(64), nullable=False)  # Blob key of the original image
+    size = Column(String(20), nullable=False)  # Rendition spec, size and format, e.g. 'thumb.webp'
+    rendition_key = Column(String(64), nullable=True)  # Blob key of the rendition, NULL if the source is not a decodable image
+    content_type = Column(String(50), nullable=True)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Constraints
+    __table_args__ = (
+        Index("ix_image_renditions_source_key_size", "source_key", "size", unique=True),
+    )
+
+
+# Upload Session Model
+class UploadSession(db.Model):
+    """
+    Resumable chunked upload of a single file.
+    Chunks are appended to a staging file; once all bytes are received the file
+    is moved into the blob store and can be referenced by its upload id.
+    """
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(36), primary_key=True)  # UUID
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    filename = Column(String(255), nullable=True)
+    total_size = Column(Integer, nullable=False)
+    received_size = Column(Integer, nullable=False, default=0)
+    status = Column(String(20), nullable=False, default="uploading")
+    blob_key = Column(String(64), nullable=True)  # Set when completed
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Setup relationships
+    user = db.relationship("User", foreign_keys=[user_id])
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint("status IN ('uploading', 'completed')", name="valid_upload_status"),
+    )
+
+
+class RefreshToken(db.Model):
+    """
+    Refresh token issued at login. Only the SHA-256 digest of the token is stored.
+    Every refresh replaces the token with a new one of the same family; a
+    replaced token presented again revokes the whole family.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,168 @@
+"""
+Keyset (cursor) pagination helpers for list endpoints.
+Cursors are opaque URL-safe tokens encoding the sort key of the last row on a page.
+"""
+
+import base64
+import json
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+def encode_cursor(*values):
+    """
+    Encode the sort key of the last row of a page as a cursor token.
+
+    Args:
+        values: Sort key values (datetimes, dates, ints or strings)
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    payload = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token, *types):
+    """
+    Decode a cursor token back into typed sort key values.
+
+    Args:
+        token: Cursor token produced by encode_cursor
+        types: Expected type of each value (datetime, date, int or str)
+
+    Returns:
+        tuple: Decoded sort key values
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise InvalidCursor("Cursor has the wrong shape")
+        values = []
+        for value, value_type in zip(payload, types):
+            if value_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif value_type is date:
+                values.append(date.fromisoformat(value))
+            else:
+                values.append(value_type(value))
+        return tuple(values)
+    except InvalidCursor:
+        raise
+    except Exception as e:
+        raise InvalidCursor(f"Invalid cursor: {str(e)}")
+
+
+def get_page_size(args, default=DEFAULT_PAGE_SIZE):
+    """
+    Read the limit query argument clamped to [1, MAX_PAGE_SIZE].
+
+    Args:
+        args: Request query arguments
+        default: Page size when no limit is given
+
+    Returns:
+        int: Page size
+    """
+    limit = args.get("limit", default, type=int) or default
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def apply_keyset(query, columns, cursor_values, descending=True):
+    """
+    Restrict a query to rows after the cursor and order it by the keyset columns.
+
+    Args:
+        query: SQLAlchemy query
+        columns: Keyset columns, most significant first (last one must be unique)
+        cursor_values: Decoded cursor values or None for the first page
+        descending: Sort direction of the keyset
+
+    Returns:
+        Query ordered by the keyset and filtered past the cursor
+    """
+    if cursor_values is not None:
+        key = tuple_(*columns)
+        query = query.filter(key < tuple_(*cursor_values) if descending else key > tuple_(*cursor_values))
+    return query.order_by(*[column.desc() if descending else column.asc() for column in columns])
+
+
+def parse_fields(args, allowed_fields):
+    """
+    Parse the fields= projection argument.
+
+    Args:
+        args: Request query arguments
+        allowed_fields: Ordered list of field names the endpoint can return
+
+    Returns:
+        list: Requested field names in the order given, or all allowed fields
+
+    Raises:
+        ValueError: If an unknown field is requested
+    """
+    fields_arg = args.get("fields")
+    if not fields_arg:
+        return list(allowed_fields)
+    fields = [field.strip() for field in fields_arg.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in allowed_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def parse_date_range(args, from_arg="date_from", to_arg="date_to"):
+    """
+    Parse an inclusive date range filter.
+    Values are ISO dates or datetimes; a date in to_arg includes that whole day.
+
+    Args:
+        args: Request query arguments
+        from_arg: Name of the range start argument
+        to_arg: Name of the range end argument
+
+    Returns:
+        tuple: (start datetime or None, exclusive end datetime or None)
+
+    Raises:
+        ValueError: If a value is not an ISO date or datetime
+    """
+    bounds = []
+    for name in (from_arg, to_arg):
+        value = args.get(name)
+        if not value:
+            bounds.append(None)
+            continue
+        try:
+            if len(value) == 10:
+                day = datetime.combine(date.fromisoformat(value), datetime.min.time())
+                bounds.append(day + timedelta(days=1) if name == to_arg else day)
+            else:
+                moment = datetime.fromisoformat(value)
+                bounds.append(moment + timedelta(microseconds=1) if name == to_arg else moment)
+        except ValueError:
+            raise ValueError(f"{name} must be an ISO date (YYYY-MM-DD) or datetime")
+    return tuple(bounds)
+
+
+def contains_pattern(term):
+    """
+    Build a LIKE pattern matching values that contain a search term literally.
+    Use with escape="\\", so % and _ in the term are not wildcards.
+
+    Args:
+        term: Search term
+
+    Returns:
+        str: LIKE pattern
+    """
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
@@ -0,0 +1,169 @@
+"""
+Numeric panel dimensions mirrored into the panel_measurements table.
+Widths, heights and cavity dimensions are JSON documents on the panel keyed by
+source ({"GZ_office": ..., "factory_floor": ...}). Every numeric value is also
+written as a row, so deviation and tolerance queries across floors run in SQL
+on indexed columns instead of loading and parsing every panel.
+"""
+
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import delete, func, insert, tuple_
+from sqlalchemy.orm import aliased
+
+from models import QCCWPanelData, PanelMeasurement
+
+# Panel fields holding dimension documents
+MEASUREMENT_FIELDS = [
+    'width_l', 'width_r', 'height_1', 'height_2', 'height_3', 'height_4',
+    'cavity_ro_height_total', 'cavity_diag_cw_pan_l', 'cavity_diag_cw_pan_r'
+]
+
+REFERENCE_SOURCE = "GZ_office"
+MEASURED_SOURCE = "factory_floor"
+
+# Numeric(12, 3) holds values below this
+MAX_VALUE = Decimal(10) ** 9
+
+
+def measurement_value(value):
+    """
+    Convert a document value to a measurement.
+
+    Args:
+        value: Number or numeric string from a dimension document
+
+    Returns:
+        Decimal, or None for values that are not numbers (e.g. 'yes')
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return None
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        return None
+    if not number.is_finite() or abs(number) >= MAX_VALUE:
+        return None
+    return number
+
+
+def measurement_rows(panel_id, documents):
+    """
+    Build the panel_measurements rows of one panel.
+
+    Args:
+        panel_id: ID of the panel
+        documents: Dimension documents by field name
+
+    Returns:
+        list: Row dicts for the numeric values of the documents
+    """
+    rows = []
+    for kind, document in documents.items():
+        if not isinstance(document, dict):
+            continue
+        for source, value in document.items():
+            number = measurement_value(value)
+            if number is not None and len(source) <= 20:
+                rows.append({"panel_id": panel_id, "kind": kind, "source": source, "value": number})
+    return rows
+
+
+def sync_measurements(db_session, panel_documents):
+    """
+    Replace the measurements of changed dimension fields, in two statements.
+    Call before committing the panel changes, in the same transaction.
+
+    Args:
+        db_session: SQLAlchemy database session
+        panel_documents: (panel id, {field name: document}) pairs; fields that are
+            not dimension fields are ignored
+    """
+    changed = []
+    rows = []
+    for panel_id, documents in panel_documents:
+        documents = {field: document for field, document in documents.items() if field in MEASUREMENT_FIELDS}
+        changed.extend((panel_id, field) for field in documents)
+        rows.extend(measurement_rows(panel_id, documents))
+    if not changed:
+        return
+    db_session.execute(
+        delete(PanelMeasurement).where(
+            tuple_(PanelMeasurement.panel_id, PanelMeasurement.kind).in_(changed)
+        ).execution_options(synchronize_session=False)
+    )
+    if rows:
+        db_session.execute(insert(PanelMeasurement.__table__), rows)
+
+
+def deviation_query(db_session, tolerance, kinds=None, fl_id=None,
+                    source=MEASURED_SOURCE, reference=REFERENCE_SOURCE):
+    """
+    Query the measurements that deviate from their reference by more than a tolerance.
+
+    Args:
+        db_session: SQLAlchemy database session
+        tolerance: Allowed absolute difference in mm
+        kinds: Measurement fields to check, all when None
+        fl_id: Restrict to one floor
+        source: Source of the measured value
+        reference: Source of the reference value
+
+    Returns:
+        Query of (panel_id, fl_id, pan_id, pan_name, kind, reference value,
+        measured value, deviation); order it by PanelMeasurement panel_id and kind
+    """
+    measured = PanelMeasurement
+    expected = aliased(PanelMeasurement)
+    deviation = (measured.value - expected.value).label("deviation")
+    query = db_session.query(
+        measured.panel_id,
+        QCCWPanelData.fl_id,
+        QCCWPanelData.pan_id,
+        QCCWPanelData.pan_name,
+        measured.kind,
+        expected.value.label("reference_value"),
+        measured.value.label("measured_value"),
+        deviation
+    ).join(
+        expected,
+        (expected.panel_id == measured.panel_id) & (expected.kind == measured.kind) & (expected.source == reference)
+    ).join(
+        QCCWPanelData, QCCWPanelData.id == measured.panel_id
+    ).filter(
+        measured.source == source,
+        func.abs(measured.value - expected.value) > tolerance
+    )
+    if kinds:
+        query = query.filter(measured.kind.in_(kinds))
+    if fl_id:
+        query = query.filter(QCCWPanelData.fl_id == fl_id)
+    return query
+
+
+def rebuild_measurements(db_session, batch_size=500):
+    """
+    Rebuild the measurements of all panels from their dimension documents.
+
+    Args:
+        db_session: SQLAlchemy database session
+        batch_size: Panels per transaction
+
+    Returns:
+        int: Number of panels processed
+    """
+    columns = [getattr(QCCWPanelData, field) for field in MEASUREMENT_FIELDS]
+    last_id = 0
+    processed = 0
+    while True:
+        panels = db_session.query(QCCWPanelData.id, *columns).filter(
+            QCCWPanelData.id > last_id
+        ).order_by(QCCWPanelData.id).limit(batch_size).all()
+        if not panels:
+            return processed
+        sync_measurements(db_session, [
+            (panel.id, {field: getattr(panel, field) for field in MEASUREMENT_FIELDS}) for panel in panels
+        ])
+        db_session.commit()
+        last_id = panels[-1].id
+        processed += len(panels)
@@ -0,0 +1,288 @@
+"""
+Bulk insert-or-update of QC CW panel data keyed on (fl_id, pan_id).
+Floor setup imports send hundreds of panels at once. All panels are validated
+first, existing panels are found with one query, and inserts, updates,
+measurements and frame cavity values are written as batched statements in
+one transaction.
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import QCCWPanelData, FrameCavitiesAttribute, FrameCavitiesValue, parse_json_value
+from panel_measurements import sync_measurements
+
+DEFAULT_MAX_PANELS = 2000
+
+# Panel fields holding JSON documents
+PANEL_JSON_FIELDS = [
+    'width_l', 'width_r', 'height_1', 'height_2', 'height_3', 'height_4',
+    'cavity_ro_height_total', 'cavity_diag_cw_pan_l', 'cavity_diag_cw_pan_r',
+    'left', 'middle', 'right', 'head', 'sill',
+    'trans_1', 'trans_2', 'trans_3',
+    'bracket_l', 'bracket_r',
+    'infill_fs_location',
+    'infills_1_type', 'infills_2_type', 'infills_3_type', 'infills_4_type',
+    'infills_right_1_type', 'infills_right_2_type', 'infills_right_3_type', 'infills_right_4_type',
+    'infills_1_color', 'infills_2_color', 'infills_3_color', 'infills_4_color',
+    'infills_right_1_color', 'infills_right_2_color', 'infills_right_3_color', 'infills_right_4_color',
+    'type_gz_factory', 'isa_type'
+]
+
+# Checkbox fields, False when a new panel does not set them
+PANEL_BOOLEAN_FIELDS = ["ipa_cleaned", "sealant_frame_enough", "edge_bead_attached", "operable", "crated"]
+
+# Plain fields and their maximum length (None for integers and unbounded text)
+PANEL_SCALAR_FIELDS = {
+    "cavities_invert": None,
+    "qc_infill_affix": 200,
+    "structural_sealant_records": None,
+    "lmr": 1,
+    "card_checked": 20,
+    "paint_damage": 20,
+    "glass_scratched": 20,
+    "cleaned_ready": 20,
+}
+
+# Photos are stored one request at a time through the panel endpoints
+PANEL_PHOTO_FIELDS = ["profile_photo", "additional_photos", "new_photos"]
+
+
+class PanelUpsertError(Exception):
+    """Raised when the request as a whole cannot be processed."""
+
+
+def panel_key(value, name):
+    """Normalize an fl_id or pan_id to the stored string form, or raise ValueError."""
+    if isinstance(value, bool) or not isinstance(value, (str, int)) or str(value).strip() == "":
+        raise ValueError(f"{name} is required")
+    value = str(value).strip()
+    if len(value) > 20:
+        raise ValueError(f"{name} must be at most 20 characters")
+    return value
+
+
+def validate_panel(item):
+    """
+    Validate one panel of a bulk request.
+
+    Args:
+        item: Panel dict with fl_id, pan_id and the fields of the panel endpoints
+
+    Returns:
+        tuple: (key, column values, frame cavity values by attribute id, list of errors)
+    """
+    if not isinstance(item, dict):
+        return None, {}, {}, ["panel must be an object"]
+
+    errors = []
+    try:
+        key = (panel_key(item.get("fl_id"), "fl_id"), panel_key(item.get("pan_id"), "pan_id"))
+    except ValueError as e:
+        return None, {}, {}, [str(e)]
+
+    values = {}
+    for field in PANEL_BOOLEAN_FIELDS:
+        if field in item:
+            if not isinstance(item[field], bool):
+                errors.append(f"{field} must be true or false")
+            values[field] = item[field]
+    for field, max_length in PANEL_SCALAR_FIELDS.items():
+        if field not in item:
+            continue
+        value = item[field]
+        if field == "cavities_invert":
+            if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+                errors.append(f"{field} must be an integer")
+        elif value is not None and not isinstance(value, str):
+            errors.append(f"{field} must be a string")
+        elif value is not None and max_length and len(value) > max_length:
+            errors.append(f"{field} must be at most {max_length} characters")
+        values[field] = value
+    for field in PANEL_JSON_FIELDS:
+        if field in item and item[field] is not None:
+            values[field] = parse_json_value(item[field])
+    for field in PANEL_PHOTO_FIELDS:
+        if item.get(field):
+            errors.append(f"{field} is not supported in bulk requests, use the panel endpoints")
+
+    cavity_values = {}
+    if "frame_cavities_values" in item:
+        if not isinstance(item["frame_cavities_values"], list):
+            errors.append("frame_cavities_values must be an array")
+        else:
+            for value_data in item["frame_cavities_values"]:
+                if not isinstance(value_data, dict) or not isinstance(value_data.get("attribute_id"), int):
+                    errors.append("frame cavity values need an integer attribute_id")
+                    continue
+                value = value_data.get("value")
+                cavity_values[value_data["attribute_id"]] = None if value is None else str(value)[:255]
+    return key, values, cavity_values, errors
+
+
+def upsert_panels(db_session, items, user_id, atomic=False):
+    """
+    Insert new panels and update existing ones, matched on (fl_id, pan_id).
+    Fields missing from an item keep their stored value on update.
+
+    Args:
+        db_session: SQLAlchemy database session
+        items: Panel dicts
+        user_id: ID of the user recorded as creator or updater
+        atomic: Write nothing when any panel is invalid
+
+    Returns:
+        list: Result per item, {"index", "fl_id", "pan_id", "id", "action"} or {"index", "errors"}
+    """
+    results = []
+    valid = {}
+    for index, item in enumerate(items):
+        result = {"index": index}
+        key, values, cavity_values, errors = validate_panel(item)
+        if key:
+            result["fl_id"], result["pan_id"] = key
+            if key in valid:
+                errors.append(f"duplicate of panel at index {valid[key][0]['index']}")
+        if errors:
+            result["errors"] = errors
+        else:
+            valid[key] = (result, values, cavity_values)
+        results.append(result)
+
+    # Frame cavity attributes must exist, checked in one query
+    attribute_ids = {attribute_id for _, _, cavity_values in valid.values() for attribute_id in cavity_values}
+    if attribute_ids:
+        known = {row[0] for row in db_session.query(FrameCavitiesAttribute.id).filter(
+            FrameCavitiesAttribute.id.in_(attribute_ids)
+        )}
+        for key, (result, _, cavity_values) in list(valid.items()):
+            unknown = sorted(set(cavity_values) - known)
+            if unknown:
+                result["errors"] = [f"unknown frame cavity attributes: {', '.join(map(str, unknown))}"]
+                del valid[key]
+
+    if not valid or (atomic and len(valid) != len(items)):
+        return results
+
+    # Existing panels of the batch in one query, locked until commit
+    existing = lock_panels(db_session, list(valid))
+
+    now = datetime.now(timezone.utc)
+    inserts = []
+    for key, (result, values, _) in valid.items():
+        if key not in existing:
+            row = {field: None for field in list(PANEL_SCALAR_FIELDS) + PANEL_JSON_FIELDS}
+            row.update({field: False for field in PANEL_BOOLEAN_FIELDS})
+            row.update(values)
+            row.update(fl_id=key[0], pan_id=key[1], pan_name=f"c{key[0]}.{key[1]}", created_by=user_id)
+            inserts.append(row)
+
+    if inserts:
+        inserted = insert_new_panels(db_session, inserts)
+        for key, panel_id in inserted.items():
+            result = valid[key][0]
+            result["id"] = panel_id
+            result["action"] = "inserted"
+        # Panels a concurrent request inserted first are updated like existing ones
+        conflicting = [(row["fl_id"], row["pan_id"]) for row in inserts if (row["fl_id"], row["pan_id"]) not in inserted]
+        if conflicting:
+            existing.update(lock_panels(db_session, conflicting))
+
+    updates = []
+    for key, (result, values, _) in valid.items():
+        if key in existing:
+            result["id"] = existing[key]
+            result["action"] = "updated"
+            updates.append(dict(values, id=existing[key], updated_by=user_id, updated_at=now))
+    if updates:
+        # Grouped by the set of fields present, one executemany per group
+        db_session.bulk_update_mappings(QCCWPanelData, updates)
+
+    sync_measurements(db_session, [(result["id"], values) for result, values, _ in valid.values()])
+    upsert_cavity_values(db_session, [
+        (result["id"], cavity_values) for result, _, cavity_values in valid.values() if cavity_values
+    ], now)
+    db_session.commit()
+    return results
+
+
+def lock_panels(db_session, keys):
+    """
+    Find the panels with the given keys and lock them until commit.
+
+    Args:
+        db_session: SQLAlchemy database session
+        keys: (fl_id, pan_id) pairs
+
+    Returns:
+        dict: Panel id by (fl_id, pan_id) of the panels that exist
+    """
+    return {
+        (fl_id, pan_id): panel_id for panel_id, fl_id, pan_id in db_session.query(
+            QCCWPanelData.id, QCCWPanelData.fl_id, QCCWPanelData.pan_id
+        ).filter(
+            tuple_(QCCWPanelData.fl_id, QCCWPanelData.pan_id).in_(keys)
+        ).order_by(QCCWPanelData.id).with_for_update()
+    }
+
+
+def insert_new_panels(db_session, rows):
+    """
+    Insert panels, skipping those whose (fl_id, pan_id) a concurrent
+    transaction inserted since they were looked up.
+    Relies on the unique (fl_id, pan_id) index through ON CONFLICT DO NOTHING,
+    so racing imports of the same new panel do not fail the whole batch.
+
+    Args:
+        db_session: SQLAlchemy database session
+        rows: Column values of the new panels
+
+    Returns:
+        dict: Panel id by (fl_id, pan_id) of the panels inserted
+    """
+    panel_table = QCCWPanelData.__table__
+    dialect = db_session.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql_insert(panel_table).on_conflict_do_nothing(index_elements=["fl_id", "pan_id"])
+    elif dialect == "sqlite":
+        statement = sqlite_insert(panel_table).on_conflict_do_nothing(index_elements=["fl_id", "pan_id"])
+    else:
+        statement = insert(panel_table)
+    returned = db_session.execute(
+        statement.returning(panel_table.c.id, panel_table.c.fl_id, panel_table.c.pan_id), rows
+    ).all()
+    return {(fl_id, pan_id): panel_id for panel_id, fl_id, pan_id in returned}
+
+
+def upsert_cavity_values(db_session, panel_values, now):
+    """
+    Insert or update the frame cavity values of many panels.
+
+    Args:
+        db_session: SQLAlchemy database session
+        panel_values: (panel id, {attribute id: value}) pairs
+        now: Timestamp recorded as updated_at
+    """
+    if not panel_values:
+        return
+    existing = {
+        (panel_id, attribute_id): value_id for value_id, panel_id, attribute_id in db_session.query(
+            FrameCavitiesValue.id, FrameCavitiesValue.panel_id, FrameCavitiesValue.attribute_id
+        ).filter(FrameCavitiesValue.panel_id.in_([panel_id for panel_id, _ in panel_values]))
+    }
+    inserts = []
+    updates = []
+    for panel_id, values in panel_values:
+        for attribute_id, value in values.items():
+            value_id = existing.get((panel_id, attribute_id))
+            if value_id:
+                updates.append({"id": value_id, "value": value, "updated_at": now})
+            else:
+                inserts.append({"panel_id": panel_id, "attribute_id": attribute_id, "value": value})
+    if inserts:
+        db_session.execute(insert(FrameCavitiesValue.__table__), inserts)
+    if updates:
+        db_session.bulk_update_mappings(FrameCavitiesValue, updates)
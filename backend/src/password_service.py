@@ -0,0 +1,157 @@
+"""
+Password hashing and verification for the QC Management System.
+bcrypt verification is CPU bound, so logins run it in a bounded process pool
+instead of on the request thread. A cap on pending verifications turns
+overload into fast 503 responses instead of a growing queue of stalled workers.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+from passlib.hash import bcrypt
+
+DEFAULT_BCRYPT_ROUNDS = 12
+DEFAULT_VERIFY_TIMEOUT = 10
+
+_bcrypt_rounds = DEFAULT_BCRYPT_ROUNDS
+
+
+class VerifierBusy(Exception):
+    """Raised when too many password verifications are already pending."""
+
+
+def configure_bcrypt_rounds(rounds):
+    """
+    Set the bcrypt cost used for new hashes.
+
+    Args:
+        rounds: log2 of the bcrypt iteration count (4-31)
+    """
+    global _bcrypt_rounds
+    _bcrypt_rounds = int(rounds)
+
+
+def hash_password(password, rounds=None):
+    """
+    Hash a password with bcrypt.
+
+    Args:
+        password: Plain text password
+        rounds: bcrypt cost, the configured cost by default
+
+    Returns:
+        str: bcrypt hash
+    """
+    return bcrypt.using(rounds=rounds or _bcrypt_rounds).hash(password)
+
+
+def verify_and_update(password, password_hash, rounds):
+    """
+    Verify a password and rehash it when its hash uses a different cost.
+    Runs in the worker processes, so it only takes picklable arguments.
+
+    Args:
+        password: Plain text password
+        password_hash: Stored bcrypt hash
+        rounds: Configured bcrypt cost
+
+    Returns:
+        tuple: (True if the password matches, new hash or None)
+    """
+    if not bcrypt.verify(password, password_hash):
+        return False, None
+    handler = bcrypt.using(rounds=rounds)
+    if handler.needs_update(password_hash):
+        return True, handler.hash(password)
+    return True, None
+
+
+class PasswordVerifier:
+    """
+    Bounded process pool for password verification.
+    At most max_workers verifications run at once; up to max_pending more wait
+    in the pool's queue, beyond that verify() fails fast with VerifierBusy.
+    """
+
+    def __init__(self, app=None):
+        self.max_workers = 0
+        self.max_pending = 0
+        self.timeout = DEFAULT_VERIFY_TIMEOUT
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """
+        Configure the verifier from the app config.
+        PASSWORD_WORKERS=0 verifies on the calling thread.
+
+        Args:
+            app: Flask application
+        """
+        configure_bcrypt_rounds(app.config.get("BCRYPT_ROUNDS") or DEFAULT_BCRYPT_ROUNDS)
+        self.max_workers = app.config.get("PASSWORD_WORKERS", min(4, os.cpu_count() or 1))
+        self.max_pending = app.config.get("PASSWORD_MAX_PENDING") or self.max_workers * 8
+        self.timeout = app.config.get("PASSWORD_VERIFY_TIMEOUT") or DEFAULT_VERIFY_TIMEOUT
+        self._slots = threading.BoundedSemaphore(max(1, self.max_workers + self.max_pending))
+
+    def _get_executor(self):
+        """Start the worker processes on first use."""
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers do not inherit the app's threads, locks or database connections.
+                # They re-import the __main__ module as __mp_main__, so entry points
+                # import the app only in the parent process (see main.py).
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def verify(self, password, password_hash):
+        """
+        Verify a password against a stored hash.
+
+        Args:
+            password: Plain text password
+            password_hash: Stored bcrypt hash
+
+        Returns:
+            tuple: (True if the password matches, new hash to store or None)
+
+        Raises:
+            VerifierBusy: If the pending verification limit is reached
+        """
+        if self.max_workers <= 0:
+            return verify_and_update(password, password_hash, _bcrypt_rounds)
+
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise VerifierBusy("Too many login attempts in progress")
+        try:
+            future = self._get_executor().submit(verify_and_update, password, password_hash, _bcrypt_rounds)
+        except Exception:
+            slots.release()
+            raise
+        # A timed out verification that already started keeps hashing, so its
+        # slot is freed only when the worker is done with it
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise VerifierBusy("Password verification timed out")
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_verifier = PasswordVerifier()
@@ -0,0 +1,260 @@
+"""
+Bulk ingestion of QC sessions synced from factory line tablets.
+All items are validated in one pass against the cached attribute definitions
+and a few batched existence queries, then the valid sessions and their
+attribute values are written with multi-row inserts in a single transaction.
+"""
+
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import insert, update
+
+from attribute_cache import attribute_cache
+from models import QCSession, QCAttributeValue, Product, User, Lookup
+
+DEFAULT_MAX_ITEMS = 5000
+
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/ndjson", "application/jsonlines")
+
+# qc_attribute_values.value_numeric is Numeric(10, 3): three decimals, magnitudes below this
+NUMERIC_PLACES = Decimal("0.001")
+MAX_NUMERIC = Decimal(10) ** 7
+
+
+class IngestError(Exception):
+    """Raised when the request as a whole cannot be ingested."""
+
+
+def read_items(request, max_items=DEFAULT_MAX_ITEMS):
+    """
+    Read the sessions of a bulk request.
+    The body is a JSON array, an object with a "sessions" array, or NDJSON
+    with one session per line. NDJSON is parsed line by line while streaming.
+
+    Args:
+        request: Flask request
+        max_items: Maximum number of sessions per request
+
+    Returns:
+        list: (item or None, parse error or None) per session
+
+    Raises:
+        IngestError: If the body is not valid JSON or has too many items
+    """
+    items = []
+    if request.mimetype in NDJSON_MIMETYPES:
+        for line in request.stream:
+            line = line.strip()
+            if not line:
+                continue
+            if len(items) >= max_items:
+                raise IngestError(f"At most {max_items} sessions per request")
+            try:
+                items.append((json.loads(line), None))
+            except json.JSONDecodeError as e:
+                items.append((None, f"Invalid JSON: {str(e)}"))
+        return items
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("sessions")
+    if not isinstance(data, list):
+        raise IngestError("Body must be a JSON array of sessions or NDJSON")
+    if len(data) > max_items:
+        raise IngestError(f"At most {max_items} sessions per request")
+    return [(item, None) for item in data]
+
+
+def parse_numeric(value):
+    """Convert a numeric attribute value to Decimal, or raise ValueError."""
+    if isinstance(value, bool):
+        raise ValueError("expected a number")
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError("expected a number")
+    if not number.is_finite():
+        raise ValueError("expected a finite number")
+    # Round to the stored scale first, since rounding can carry up to the limit
+    if abs(number) >= MAX_NUMERIC or abs(number.quantize(NUMERIC_PLACES)) >= MAX_NUMERIC:
+        raise ValueError(f"value_numeric must be less than {MAX_NUMERIC} in magnitude")
+    return number.quantize(NUMERIC_PLACES)
+
+
+def validate_value(db_session, value, lookup_ids):
+    """
+    Validate one attribute value against its definition.
+
+    Args:
+        db_session: SQLAlchemy database session
+        value: Attribute value dict of a session item
+        lookup_ids: IDs of lookups referenced in the request that exist
+
+    Returns:
+        tuple: (column values for qc_attribute_values, error or None)
+    """
+    if not isinstance(value, dict):
+        return None, "attribute value must be an object"
+    if value.get("attribute_id") is not None:
+        definition = attribute_cache.get(db_session, value.get("attribute_id"))
+    else:
+        definition = attribute_cache.get_by_name(db_session, value.get("attribute_name"))
+    if definition is None:
+        return None, f"unknown attribute {value.get('attribute_id') or value.get('attribute_name')!r}"
+
+    row = {"attribute_id": definition.id, "value_numeric": None, "value_text": None,
+           "lookup_id": None, "photo_url": None}
+    try:
+        if definition.data_type == "numeric":
+            if value.get("value_numeric") is None:
+                raise ValueError("value_numeric is required")
+            row["value_numeric"] = parse_numeric(value["value_numeric"])
+        elif definition.data_type == "boolean":
+            # There is no boolean column; booleans are stored as 1/0
+            if not isinstance(value.get("value_boolean"), bool):
+                raise ValueError("value_boolean must be true or false")
+            row["value_numeric"] = Decimal(int(value["value_boolean"]))
+        elif definition.data_type == "lookup":
+            if value.get("lookup_id") not in lookup_ids:
+                raise ValueError(f"unknown lookup {value.get('lookup_id')!r}")
+            row["lookup_id"] = value["lookup_id"]
+        elif definition.data_type == "photo":
+            if not isinstance(value.get("photo_url"), str) or not value["photo_url"]:
+                raise ValueError("photo_url is required")
+            row["photo_url"] = value["photo_url"]
+        else:
+            if value.get("value_text") is not None and not isinstance(value["value_text"], str):
+                raise ValueError("value_text must be a string")
+            row["value_text"] = value.get("value_text")
+    except ValueError as e:
+        return None, f"{definition.name}: {str(e)}"
+    return row, None
+
+
+def validate_session(db_session, item, product_ids, user_ids, lookup_ids):
+    """
+    Validate one session item.
+
+    Args:
+        db_session: SQLAlchemy database session
+        item: Session dict with product_id, inspector_id, performed_at and attribute_values
+        product_ids: IDs of referenced products that exist
+        user_ids: IDs of referenced inspectors that exist
+        lookup_ids: IDs of referenced lookups that exist
+
+    Returns:
+        tuple: (session row, list of value rows, list of errors)
+    """
+    if not isinstance(item, dict):
+        return None, [], ["session must be an object"]
+
+    errors = []
+    if item.get("product_id") not in product_ids:
+        errors.append(f"product {item.get('product_id')!r} not found")
+    if item.get("inspector_id") is not None and item.get("inspector_id") not in user_ids:
+        errors.append(f"inspector {item.get('inspector_id')!r} not found")
+
+    performed_at = datetime.now()
+    if item.get("performed_at"):
+        try:
+            performed_at = datetime.fromisoformat(item["performed_at"])
+        except (TypeError, ValueError):
+            errors.append("performed_at must be an ISO datetime")
+
+    values = item.get("attribute_values") or []
+    if not isinstance(values, list):
+        values = []
+        errors.append("attribute_values must be an array")
+
+    value_rows = []
+    seen = set()
+    for value in values:
+        row, error = validate_value(db_session, value, lookup_ids)
+        if error:
+            errors.append(error)
+        elif row["attribute_id"] in seen:
+            errors.append(f"attribute {row['attribute_id']} given more than once")
+        else:
+            seen.add(row["attribute_id"])
+            value_rows.append(row)
+
+    session_row = {
+        "product_id": item.get("product_id"),
+        "inspector_id": item.get("inspector_id"),
+        "performed_at": performed_at
+    }
+    return session_row, value_rows, errors
+
+
+def existing_ids(db_session, column, values):
+    """Return which of the given ids exist in a column, in one query."""
+    values = {value for value in values if isinstance(value, int) and not isinstance(value, bool)}
+    if not values:
+        return set()
+    return {row[0] for row in db_session.query(column).filter(column.in_(values))}
+
+
+def ingest_sessions(db_session, items, atomic=False):
+    """
+    Validate and insert QC sessions with their attribute values.
+    Valid sessions are inserted in one transaction and their products marked
+    qc_passed, like single session creation does.
+
+    Args:
+        db_session: SQLAlchemy database session
+        items: (item or None, parse error or None) pairs from read_items
+        atomic: Insert nothing when any item is invalid
+
+    Returns:
+        list: Result per item, {"index", "ref", "id"} or {"index", "ref", "errors"}
+    """
+    sessions = [item for item, _ in items if isinstance(item, dict)]
+    values = [value for item in sessions for value in (item.get("attribute_values") or [])
+              if isinstance(item.get("attribute_values"), list) and isinstance(value, dict)]
+    product_ids = existing_ids(db_session, Product.id, (item.get("product_id") for item in sessions))
+    user_ids = existing_ids(db_session, User.id, (item.get("inspector_id") for item in sessions))
+    lookup_ids = existing_ids(db_session, Lookup.id, (value.get("lookup_id") for value in values))
+
+    results = []
+    valid = []
+    for index, (item, parse_error) in enumerate(items):
+        result = {"index": index}
+        if isinstance(item, dict) and item.get("ref") is not None:
+            result["ref"] = item["ref"]
+        if parse_error:
+            result["errors"] = [parse_error]
+        else:
+            session_row, value_rows, errors = validate_session(db_session, item, product_ids, user_ids, lookup_ids)
+            if errors:
+                result["errors"] = errors
+            else:
+                valid.append((result, session_row, value_rows))
+        results.append(result)
+
+    if not valid or (atomic and len(valid) != len(items)):
+        return results
+
+    # One multi-row insert for the sessions, returning ids in parameter order
+    session_table = QCSession.__table__
+    session_ids = db_session.scalars(
+        insert(session_table).returning(session_table.c.id, sort_by_parameter_order=True),
+        [session_row for _, session_row, _ in valid]
+    ).all()
+
+    value_rows = []
+    for (result, _, rows), session_id in zip(valid, session_ids):
+        result["id"] = session_id
+        value_rows.extend(dict(row, qc_id=session_id) for row in rows)
+    if value_rows:
+        # Core executemany, so the rows go out as one batched statement
+        db_session.execute(insert(QCAttributeValue.__table__), value_rows)
+
+    db_session.execute(
+        update(Product).where(
+            Product.id.in_({session_row["product_id"] for _, session_row, _ in valid})
+        ).values(status="qc_passed")
+    )
+    db_session.commit()
+    return results
@@ -0,0 +1,28 @@
+"""
+Rebuild the current_inventory and inventory_rollups tables from all inventory
+snapshots and part shipments. Snapshots and shipments recorded through the API
+keep both up to date; run this once after upgrading, or after snapshots were
+written outside the API.
+
+Usage:
+    python rebuild_inventory.py
+"""
+import sys
+
+from app import app, db
+from inventory import rebuild_current_inventory
+from inventory_rollups import rebuild_rollups
+
+
+def main():
+    """Entry point for the inventory rebuild command."""
+    with app.app_context():
+        rows = rebuild_current_inventory(db.session)
+        print(f"Rebuilt {rows} current inventory rows")
+        rows = rebuild_rollups(db.session)
+        print(f"Rebuilt {rows} inventory rollup rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
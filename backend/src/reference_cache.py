@@ -0,0 +1,195 @@
+"""
+Per-process cache of the reference data bundle used to bootstrap forms.
+Product parts, coating colors, warehouses, lookups and the frame cavity
+attributes of a floor are rendered into one JSON document per fl_id and kept
+gzip-compressed under a version counter. Commits that change any of that data
+in this process start a new version; other worker processes pick up changes
+after REFERENCE_CACHE_TTL seconds.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from lookup_cache import lookup_cache
+from models import CoatingColor, FrameCavitiesAttribute, ProductColor, ProductPart, Warehouse
+
+DEFAULT_TTL = 300
+
+# Bundles of this many floors are kept; the least recently used is dropped first
+DEFAULT_MAX_FLOORS = 256
+
+WATCHED_MODELS = (ProductPart, ProductColor, CoatingColor, FrameCavitiesAttribute, Warehouse)
+
+
+def load_shared_data(db_session):
+    """
+    Load the reference data that does not depend on the floor, one query per table.
+
+    Args:
+        db_session: SQLAlchemy database session
+
+    Returns:
+        dict: product_parts (with colors), coating_colors and warehouses
+    """
+    colors_by_part = {}
+    for part_id, color_id, color_name in db_session.query(
+        ProductColor.product_part_id, CoatingColor.id, CoatingColor.coating_color_name
+    ).join(CoatingColor, ProductColor.coating_color_id == CoatingColor.id).order_by(ProductColor.id):
+        colors_by_part.setdefault(part_id, []).append({"id": color_id, "name": color_name})
+
+    product_parts = [{
+        "id": part.id,
+        "product_part_id": part.product_part_id,
+        "product_part_name": part.product_part_name,
+        "product_part_vendor": part.product_part_vendor,
+        "product_part_type": part.product_part_type,
+        "created_at": part.created_at.isoformat() if part.created_at else None,
+        "has_image": bool(part.has_image),
+        "colors": colors_by_part.get(part.id, [])
+    } for part in db_session.query(
+        ProductPart.id, ProductPart.product_part_id, ProductPart.product_part_name, ProductPart.product_part_vendor,
+        ProductPart.product_part_type, ProductPart.created_at, ProductPart.has_image
+    ).order_by(ProductPart.id)]
+
+    coating_colors = [{
+        "id": color.id,
+        "coating_color_name": color.coating_color_name,
+        "created_at": color.created_at.isoformat() if color.created_at else None
+    } for color in db_session.query(
+        CoatingColor.id, CoatingColor.coating_color_name, CoatingColor.created_at
+    ).order_by(CoatingColor.id)]
+
+    warehouses = [{
+        "id": warehouse.id,
+        "name": warehouse.name,
+        "location": warehouse.location
+    } for warehouse in db_session.query(Warehouse.id, Warehouse.name, Warehouse.location).order_by(Warehouse.id)]
+
+    return {"product_parts": product_parts, "coating_colors": coating_colors, "warehouses": warehouses}
+
+
+def load_floor_attributes(db_session, fl_id):
+    """
+    Load the frame cavity attributes of a floor.
+
+    Args:
+        db_session: SQLAlchemy database session
+        fl_id: Floor ID
+
+    Returns:
+        list: Attributes formatted like the frame cavities attributes endpoint
+    """
+    return [{
+        "id": attr.id,
+        "fl_id": attr.fl_id,
+        "attribute_name": attr.attribute_name,
+        "attribute_type": attr.get_attribute_type(),
+        "created_at": attr.created_at.isoformat() if attr.created_at else None
+    } for attr in db_session.query(FrameCavitiesAttribute).filter(
+        FrameCavitiesAttribute.fl_id == fl_id
+    ).order_by(FrameCavitiesAttribute.id)]
+
+
+class ReferenceBundleCache:
+    """
+    Thread-safe, versioned cache of compressed reference bundles, one per floor.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_floors=DEFAULT_MAX_FLOORS):
+        self.ttl = ttl
+        self.max_floors = max_floors
+        self.version = 0
+        self._shared = None
+        self._lookup_version = None
+        self._bundles = OrderedDict()
+        self._expires_at = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure the cache from the app config and invalidate it when reference data changes.
+
+        Args:
+            app: Flask application
+        """
+        self.ttl = app.config.get("REFERENCE_CACHE_TTL", DEFAULT_TTL)
+        self.invalidate()
+        if not event.contains(Session, "after_flush", self._collect_changes):
+            event.listen(Session, "after_flush", self._collect_changes)
+            event.listen(Session, "after_commit", self._invalidate_changed)
+            event.listen(Session, "after_rollback", self._discard_changes)
+
+    def bundle(self, db_session, fl_id=None):
+        """
+        Return the compressed reference bundle of a floor.
+        The lookups come from the lookup cache; a new lookup version also
+        starts a new bundle version.
+
+        Args:
+            db_session: SQLAlchemy database session
+            fl_id: Floor ID whose frame cavity attributes are included, or None for none
+
+        Returns:
+            tuple: (gzip-compressed JSON body, strong ETag of the uncompressed body)
+        """
+        with self._lock:
+            lookups = lookup_cache.forest(db_session)
+            now = time.monotonic()
+            if self._shared is None or self._expires_at < now or self._lookup_version != lookup_cache.version:
+                if self._shared is not None:
+                    self.version += 1
+                    self._bundles.clear()
+                self._shared = load_shared_data(db_session)
+                self._lookup_version = lookup_cache.version
+                self._expires_at = now + self.ttl
+
+            if fl_id in self._bundles:
+                self._bundles.move_to_end(fl_id)
+                return self._bundles[fl_id]
+
+            data = {
+                "fl_id": fl_id,
+                **self._shared,
+                "frame_cavities_attributes": load_floor_attributes(db_session, fl_id) if fl_id else [],
+                "lookups": lookups
+            }
+            body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+            # mtime=0 keeps the compressed bytes identical across processes
+            entry = (gzip.compress(body, mtime=0), hashlib.sha256(body).hexdigest())
+            self._bundles[fl_id] = entry
+            while len(self._bundles) > self.max_floors:
+                self._bundles.popitem(last=False)
+            return entry
+
+    def invalidate(self):
+        """Drop all bundles and start a new version; the next read reloads them."""
+        with self._lock:
+            self.version += 1
+            self._shared = None
+            self._bundles.clear()
+
+    def _collect_changes(self, session, flush_context):
+        """Remember whether a flush touched bundled reference data."""
+        for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(instance, WATCHED_MODELS):
+                session.info["reference_data_changed"] = True
+                return
+
+    def _invalidate_changed(self, session):
+        """Invalidate the bundles after a commit that changed reference data."""
+        if session.info.pop("reference_data_changed", False):
+            self.invalidate()
+
+    def _discard_changes(self, session):
+        """Forget reference data changes of a rolled back transaction."""
+        session.info.pop("reference_data_changed", None)
+
+
+reference_cache = ReferenceBundleCache()
@@ -0,0 +1,132 @@
+"""
+Rotating refresh tokens for the QC Management System.
+A refresh token is an opaque random string; renewing an access token costs a
+SHA-256 digest and an indexed lookup instead of a bcrypt password check.
+"""
+
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from models import RefreshToken, User
+
+REFRESH_TOKEN_BYTES = 32
+DEFAULT_REFRESH_TOKEN_DAYS = 14
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token is unknown, expired, revoked or reused."""
+
+
+def hash_token(token):
+    """Return the SHA-256 hex digest under which a refresh token is stored."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_refresh_token(db_session, user_id, lifetime, family_id=None):
+    """
+    Issue a refresh token and remove the user's expired ones.
+
+    Args:
+        db_session: SQLAlchemy database session
+        user_id: ID of the user
+        lifetime: timedelta the token stays valid
+        family_id: Family of the token being replaced, a new family for logins
+
+    Returns:
+        str: The refresh token, only known to the client from now on
+    """
+    now = datetime.now(timezone.utc)
+    db_session.query(RefreshToken).filter(
+        RefreshToken.user_id == user_id,
+        RefreshToken.expires_at <= now
+    ).delete(synchronize_session=False)
+
+    token = secrets.token_urlsafe(REFRESH_TOKEN_BYTES)
+    db_session.add(RefreshToken(
+        token_hash=hash_token(token),
+        family_id=family_id or secrets.token_hex(16),
+        user_id=user_id,
+        expires_at=now + lifetime
+    ))
+    db_session.commit()
+    return token
+
+
+def rotate_refresh_token(db_session, token, lifetime):
+    """
+    Exchange a refresh token for a new one.
+    A token can be used once; using it again means it was copied, so all
+    tokens descending from the same login are revoked.
+
+    Args:
+        db_session: SQLAlchemy database session
+        token: Refresh token sent by the client
+        lifetime: timedelta the new token stays valid
+
+    Returns:
+        tuple: (User, new refresh token)
+
+    Raises:
+        RefreshTokenError: If the token cannot be used
+    """
+    if not token or not isinstance(token, str):
+        raise RefreshTokenError("Refresh token required")
+
+    now = datetime.now(timezone.utc)
+    stored = db_session.query(RefreshToken).filter(
+        RefreshToken.token_hash == hash_token(token),
+        RefreshToken.expires_at > now
+    ).first()
+    if not stored:
+        raise RefreshTokenError("Invalid refresh token")
+
+    # Conditional update so two concurrent refreshes cannot both consume the token
+    consumed = db_session.query(RefreshToken).filter(
+        RefreshToken.id == stored.id,
+        RefreshToken.revoked.is_(False)
+    ).update({RefreshToken.revoked: True}, synchronize_session=False)
+    if not consumed:
+        revoke_refresh_tokens(db_session, family_id=stored.family_id)
+        db_session.commit()
+        raise RefreshTokenError("Refresh token already used")
+
+    user = db_session.get(User, stored.user_id)
+    if not user or not user.is_active:
+        db_session.commit()
+        raise RefreshTokenError("Inactive user")
+
+    return user, issue_refresh_token(db_session, user.id, lifetime, stored.family_id)
+
+
+def revoke_refresh_tokens(db_session, user_id=None, family_id=None):
+    """
+    Revoke the refresh tokens of a user or of one login. The caller commits.
+
+    Args:
+        db_session: SQLAlchemy database session
+        user_id: Revoke all tokens of this user
+        family_id: Revoke the tokens descending from one login
+    """
+    query = db_session.query(RefreshToken).filter(RefreshToken.revoked.is_(False))
+    if user_id is not None:
+        query = query.filter(RefreshToken.user_id == user_id)
+    if family_id is not None:
+        query = query.filter(RefreshToken.family_id == family_id)
+    query.update({RefreshToken.revoked: True}, synchronize_session=False)
+
+
+def revoke_refresh_token(db_session, token):
+    """
+    Revoke the login a refresh token belongs to, e.g. on logout.
+
+    Args:
+        db_session: SQLAlchemy database session
+        token: Refresh token sent by the client
+    """
+    stored = db_session.query(RefreshToken).filter(
+        RefreshToken.token_hash == hash_token(token)
+    ).first() if token and isinstance(token, str) else None
+    if stored:
+        revoke_refresh_tokens(db_session, family_id=stored.family_id)
+        db_session.commit()
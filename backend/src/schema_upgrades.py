@@ -0,0 +1,160 @@
+"""
+Idempotent schema upgrades applied at startup.
+db.create_all() only creates missing tables, so objects added to existing
+tables (indexes, columns) are brought up to date here.
+"""
+
+import logging
+
+from sqlalchemy import JSON, inspect, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# SQLite user_version once legacy text in JSON document columns has been converted
+SQLITE_JSON_CONVERTED = 1
+
+
+def ensure_columns(engine):
+    """
+    Add nullable columns declared on the models that are missing from existing tables.
+
+    Args:
+        engine: SQLAlchemy engine
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    quote = engine.dialect.identifier_preparer.quote
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if not column.nullable:
+                logger.warning(f"Cannot add non-nullable column {table.name}.{column.name} automatically")
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            try:
+                with engine.begin() as connection:
+                    connection.execute(text(
+                        f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}"
+                    ))
+                logger.info(f"Added column {table.name}.{column.name}")
+            except Exception as e:
+                logger.warning(f"Could not add column {table.name}.{column.name}: {str(e)}")
+
+
+def json_columns():
+    """Yield (table, column) for the JSON document columns declared on the models."""
+    for table in db.metadata.sorted_tables:
+        for column in table.columns:
+            if isinstance(column.type, JSON):
+                yield table, column
+
+
+def ensure_json_columns(engine):
+    """
+    Convert JSON documents stored as text by older versions.
+    Text that encodes an object or array becomes that document; any other text,
+    including "123" or "true", stays a JSON string, as parse_json_value does
+    for request values. On PostgreSQL text columns are altered to JSONB, once.
+    On SQLite the column type stays TEXT, so the values are rewritten once and
+    the database is marked with SQLITE_JSON_CONVERTED in its user_version.
+
+    Args:
+        engine: SQLAlchemy engine
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    quote = engine.dialect.identifier_preparer.quote
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as connection:
+            if connection.execute(text("PRAGMA user_version")).scalar() >= SQLITE_JSON_CONVERTED:
+                return
+    converted = True
+    for table, column in json_columns():
+        if table.name not in existing_tables:
+            continue
+        name = quote(column.name)
+        try:
+            with engine.begin() as connection:
+                if engine.dialect.name == "postgresql":
+                    reflected = {c["name"]: c["type"] for c in inspector.get_columns(table.name)}
+                    if isinstance(reflected.get(column.name), JSONB):
+                        continue
+                    connection.execute(text("""
+                        CREATE OR REPLACE FUNCTION pg_temp.text_to_jsonb(value text) RETURNS jsonb AS $$
+                        DECLARE
+                            parsed jsonb;
+                        BEGIN
+                            IF value IS NULL OR btrim(value) = '' THEN
+                                RETURN NULL;
+                            END IF;
+                            parsed := value::jsonb;
+                            IF jsonb_typeof(parsed) IN ('object', 'array') THEN
+                                RETURN parsed;
+                            END IF;
+                            RETURN to_jsonb(value);
+                        EXCEPTION WHEN others THEN
+                            RETURN to_jsonb(value);
+                        END;
+                        $$ LANGUAGE plpgsql IMMUTABLE
+                    """))
+                    connection.execute(text(
+                        f"ALTER TABLE {quote(table.name)} ALTER COLUMN {name} "
+                        f"TYPE JSONB USING pg_temp.text_to_jsonb({name}::text)"
+                    ))
+                    logger.info(f"Converted {table.name}.{column.name} to JSONB")
+                elif engine.dialect.name == "sqlite":
+                    reflected = {c["name"]: c["type"] for c in inspector.get_columns(table.name)}
+                    if isinstance(reflected.get(column.name), JSON):
+                        # Created as a JSON column, so it never held legacy text
+                        continue
+                    # Values that are not objects or arrays are quoted; JSON strings are already quoted.
+                    # CASE keeps json_type from seeing malformed values
+                    result = connection.execute(text(
+                        f"UPDATE {quote(table.name)} SET {name} = "
+                        f"CASE WHEN trim({name}) = '' THEN NULL ELSE json_quote({name}) END "
+                        f"WHERE {name} IS NOT NULL AND CASE WHEN json_valid({name}) "
+                        f"THEN json_type({name}) NOT IN ('object', 'array', 'text') ELSE 1 END"
+                    ))
+                    if result.rowcount:
+                        logger.info(f"Quoted {result.rowcount} non-document values in {table.name}.{column.name}")
+        except Exception as e:
+            converted = False
+            logger.warning(f"Could not convert {table.name}.{column.name} to JSON: {str(e)}")
+
+    if engine.dialect.name == "sqlite" and converted:
+        with engine.begin() as connection:
+            connection.execute(text(f"PRAGMA user_version = {SQLITE_JSON_CONVERTED}"))
+
+
+def ensure_indexes(engine):
+    """
+    Create indexes declared on the models that are missing from existing tables.
+
+    Args:
+        engine: SQLAlchemy engine
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except Exception as e:
+                logger.warning(f"Could not create index {index.name}: {str(e)}")
+
+
+def upgrade_schema(engine):
+    """
+    Apply all idempotent schema upgrades.
+
+    Args:
+        engine: SQLAlchemy engine
+    """
+    ensure_columns(engine)
+    ensure_json_columns(engine)
+    ensure_indexes(engine)
@@ -0,0 +1,217 @@
+"""
+Image upload handling for the QC Management System.
+Images can be sent as base64 strings in JSON (legacy), as multipart/form-data
+file parts, or as resumable chunked uploads referenced by upload id. File
+parts and chunks are streamed into the blob store, never buffered whole in memory.
+"""
+
+import json
+import os
+import re
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from flask import request
+from werkzeug.datastructures import FileStorage, MultiDict
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from blob_store import get_blob_store, BlobTooLarge, STREAM_CHUNK_SIZE
+from models import UploadSession, decode_base64_image
+
+DEFAULT_MAX_FILE_SIZE = 25 * 1024 * 1024
+DEFAULT_MAX_REQUEST_SIZE = 200 * 1024 * 1024
+
+# Incomplete uploads older than this are deleted
+STALE_UPLOAD_AGE = timedelta(hours=24)
+
+CONTENT_RANGE_PATTERN = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class UploadError(Exception):
+    """Raised when an upload is invalid; carries the HTTP status to return."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def get_max_file_size(app_config):
+    """Return the configured maximum size of a single uploaded file."""
+    return app_config.get("UPLOAD_MAX_FILE_SIZE") or DEFAULT_MAX_FILE_SIZE
+
+
+def parse_upload_request():
+    """
+    Read the fields and files of a JSON or multipart/form-data request.
+    Multipart requests carry the JSON fields in a "data" form field next to
+    the file parts.
+
+    Returns:
+        tuple: (dict of fields, MultiDict of FileStorage by field name)
+
+    Raises:
+        UploadError: If the body is too large or the data field is not valid JSON
+    """
+    try:
+        if request.mimetype == "multipart/form-data":
+            raw_data = request.form.get("data")
+            data = json.loads(raw_data) if raw_data else {}
+            if not isinstance(data, dict):
+                raise UploadError("data must be a JSON object")
+            return data, request.files
+        return request.json or {}, MultiDict()
+    except RequestEntityTooLarge:
+        raise UploadError("Request body is too large", 413)
+    except json.JSONDecodeError as e:
+        raise UploadError(f"Invalid JSON in data field: {str(e)}")
+
+
+def store_image(value, user_id, max_size):
+    """
+    Store an uploaded image in the blob store.
+
+    Args:
+        value: Base64 string, {"upload_id": ...} of a completed upload, or a multipart FileStorage
+        user_id: ID of the uploading user, who must own referenced uploads
+        max_size: Maximum image size in bytes
+
+    Returns:
+        tuple: (blob key, size in bytes)
+
+    Raises:
+        UploadError: If the image is too large, the upload is unknown or incomplete
+    """
+    if isinstance(value, FileStorage):
+        try:
+            return get_blob_store().put_stream(value.stream, max_size)
+        except BlobTooLarge as e:
+            raise UploadError(str(e), 413)
+
+    if isinstance(value, dict):
+        upload = UploadSession.query.get(value.get("upload_id"))
+        if not upload or upload.user_id != user_id:
+            raise UploadError(f"Upload not found: {value.get('upload_id')}", 404)
+        if upload.status != "completed":
+            raise UploadError(f"Upload {upload.id} is not complete", 409)
+        return upload.blob_key, upload.total_size
+
+    data = decode_base64_image(value)
+    if len(data) > max_size:
+        raise UploadError(f"File exceeds the maximum size of {max_size} bytes", 413)
+    return get_blob_store().put(data), len(data)
+
+
+def staging_path(app_config, upload_id):
+    """Return the staging file of a chunked upload."""
+    staging_dir = app_config.get("UPLOAD_STAGING_DIR") or os.path.join(tempfile.gettempdir(), "qc_uploads")
+    os.makedirs(staging_dir, exist_ok=True)
+    return os.path.join(staging_dir, f"{upload_id}.part")
+
+
+def create_upload_session(db_session, app_config, user_id, total_size, filename=None):
+    """
+    Start a resumable upload and remove stale incomplete uploads.
+
+    Args:
+        db_session: SQLAlchemy database session
+        app_config: Flask app config
+        user_id: ID of the uploading user
+        total_size: Size of the file in bytes
+        filename: Original file name
+
+    Returns:
+        UploadSession: The new upload
+
+    Raises:
+        UploadError: If the size is invalid or above the limit
+    """
+    max_size = get_max_file_size(app_config)
+    if not isinstance(total_size, int) or total_size <= 0:
+        raise UploadError("size must be a positive integer")
+    if total_size > max_size:
+        raise UploadError(f"File exceeds the maximum size of {max_size} bytes", 413)
+
+    stale_before = datetime.now(timezone.utc) - STALE_UPLOAD_AGE
+    stale = db_session.query(UploadSession).filter(
+        UploadSession.status == "uploading",
+        UploadSession.created_at < stale_before
+    ).all()
+    for upload in stale:
+        path = staging_path(app_config, upload.id)
+        if os.path.exists(path):
+            os.remove(path)
+        db_session.delete(upload)
+
+    upload = UploadSession(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        filename=filename,
+        total_size=total_size,
+        received_size=0,
+        status="uploading"
+    )
+    db_session.add(upload)
+    db_session.commit()
+    return upload
+
+
+def append_chunk(db_session, app_config, upload_id, user_id, content_range, stream):
+    """
+    Append the request body to a resumable upload.
+    Chunks must arrive in order; after an interruption the client resumes from
+    the received_size reported by the upload status.
+
+    Args:
+        db_session: SQLAlchemy database session
+        app_config: Flask app config
+        upload_id: ID of the upload
+        user_id: ID of the uploading user
+        content_range: Content-Range header, "bytes <first>-<last>/<total>"
+        stream: Request body stream
+
+    Returns:
+        UploadSession: The updated upload, completed when all bytes are received
+
+    Raises:
+        UploadError: If the upload is unknown or the chunk does not fit
+    """
+    upload = db_session.query(UploadSession).filter(UploadSession.id == upload_id).with_for_update().first()
+    if not upload or upload.user_id != user_id:
+        raise UploadError("Upload not found", 404)
+    if upload.status == "completed":
+        return upload
+
+    match = CONTENT_RANGE_PATTERN.match(content_range or "")
+    if not match:
+        raise UploadError("Content-Range header must be 'bytes <first>-<last>/<total>'")
+    first, last, total = (int(value) for value in match.groups())
+    if total != upload.total_size or last < first or last >= total:
+        raise UploadError("Content-Range does not match the upload size", 416)
+    if first != upload.received_size:
+        raise UploadError(f"Expected chunk starting at byte {upload.received_size}", 409)
+
+    expected = last - first + 1
+    received = 0
+    path = staging_path(app_config, upload.id)
+    with open(path, "r+b" if first else "wb") as staging:
+        staging.seek(first)
+        while received < expected:
+            chunk = stream.read(min(STREAM_CHUNK_SIZE, expected - received))
+            if not chunk:
+                break
+            staging.write(chunk)
+            received += len(chunk)
+        staging.truncate()
+    if received != expected:
+        db_session.rollback()
+        raise UploadError(f"Chunk body has {received} bytes, Content-Range announced {expected}")
+
+    upload.received_size = first + received
+    if upload.received_size == upload.total_size:
+        with open(path, "rb") as staging:
+            upload.blob_key, _ = get_blob_store().put_stream(staging)
+        upload.status = "completed"
+        os.remove(path)
+    db_session.commit()
+    return upload
@@ -18,8 +18,8 @@ const QCList = () => {
     const filters = {
       product_id: productId || undefined,
       inspector: inspector || undefined,
-      start_date: startDate || undefined,
-      end_date: endDate || undefined
+      date_from: startDate || undefined,
+      date_to: endDate || undefined
     };
     
     setAppliedFilters(filters);
@@ -1,6 +1,7 @@
 import React, { createContext, useState, useContext, useEffect } from 'react';
 import axios from 'axios';
 import api from '../services/api';
+import { getRefreshToken, removeToken, setRefreshToken } from '../utils/auth';
 
 const AuthContext = createContext();
 
@@ -41,10 +42,11 @@ export const AuthProvider = ({ children }) => {
       // Use our API service for login
       const response = await api.auth.login(username, password);
 
-      const { access_token } = response.data;
+      const { access_token, refresh_token } = response.data;
       
-      // Store token in localStorage
+      // Store tokens in localStorage
       localStorage.setItem('qc_token', access_token);
+      setRefreshToken(refresh_token);
       
       // Set token in state and headers for future API calls
       setToken(access_token);
@@ -84,8 +86,14 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
-    // Remove token from localStorage
-    localStorage.removeItem('qc_token');
+    // Revoke the refresh token; the access token expires on its own
+    const refreshToken = getRefreshToken();
+    if (refreshToken) {
+      api.auth.logout(refreshToken).catch(() => {});
+    }
+
+    // Remove tokens from localStorage
+    removeToken();
     
     // Reset state
     setToken(null);
@@ -151,9 +151,9 @@ const ProductPartDetail = () => {
               <h5 className="mb-0">Profile Image</h5>
             </Card.Header>
             <Card.Body className="text-center">
-              {part.image_data ? (
+              {part.image_url ? (
                 <img 
-                  src={`data:image/png;base64,${part.image_data}`} 
+                  src={part.image_url} 
                   alt={part.product_part_name} 
                   className="img-fluid" 
                   style={{ maxHeight: '400px' }}
@@ -171,13 +171,13 @@ const QCCWPanelDetail = () => {
                   </div>
                 </Col>
                 <Col md={6}>
-                  {panel.profile_photo && (
+                  {panel.profile_photo_url && (
                     <div className="panel-image-container text-center">
                       <img
-                        src={`data:image/jpeg;base64,${panel.profile_photo}`}
+                        src={panel.profile_photo_medium_url || panel.profile_photo_url}
                         alt="Panel Profile"
                         className="panel-image"
-                        onClick={() => handleImageClick(panel.profile_photo)}
+                        onClick={() => handleImageClick(panel.profile_photo_url)}
                       />
                       <p className="mt-2 text-center">Panel Profile Photo</p>
                     </div>
@@ -556,9 +556,9 @@ const QCCWPanelDetail = () => {
                       <Card>
                         <Card.Img
                           variant="top"
-                          src={`data:image/jpeg;base64,${photo.photo}`}
+                          src={photo.thumbnail_url || photo.url}
                           alt={`Photo ${index + 1}`}
-                          onClick={() => handleImageClick(photo.photo)}
+                          onClick={() => handleImageClick(photo.url)}
                           style={{ cursor: 'pointer', height: '200px', objectFit: 'cover' }}
                         />
                         <Card.Body>
@@ -590,7 +590,7 @@ const QCCWPanelDetail = () => {
         <Modal.Body className="text-center">
           {currentImage && (
             <img
-              src={`data:image/jpeg;base64,${currentImage}`}
+              src={currentImage}
               alt="Panel Detail"
               style={{ maxWidth: '100%', maxHeight: '70vh' }}
             />
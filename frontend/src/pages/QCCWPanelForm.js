@@ -88,8 +88,8 @@ const QCCWPanelForm = () => {
   useEffect(() => {
     const fetchProductParts = async () => {
       try {
-        const response = await api.productParts.getAll();
-        const parts = response.data;
+        const response = await api.referenceData.getBundle();
+        const parts = response.data.product_parts;
         
         console.log('Product parts from API:', parts[0]); // Log the first product part to see its structure
         
@@ -144,8 +144,8 @@ const QCCWPanelForm = () => {
           };
           
           // Set preview for profile photo if it exists
-          if (panelData.profile_photo) {
-            setPreviewProfilePhoto(`data:image/jpeg;base64,${panelData.profile_photo}`);
+          if (panelData.profile_photo_url) {
+            setPreviewProfilePhoto(panelData.profile_photo_url);
           }
           
           // Process JSON fields
@@ -220,16 +220,12 @@ const QCCWPanelForm = () => {
   const handleProfilePhotoChange = (e) => {
     const file = e.target.files[0];
     if (file) {
-      // Convert file to base64
-      const reader = new FileReader();
-      reader.onloadend = () => {
-        setFormData({
-          ...formData,
-          profile_photo: reader.result
-        });
-        setPreviewProfilePhoto(reader.result);
-      };
-      reader.readAsDataURL(file);
+      // Keep the file itself; it is uploaded as a multipart file part
+      setFormData({
+        ...formData,
+        profile_photo: file
+      });
+      setPreviewProfilePhoto(URL.createObjectURL(file));
     }
   };
   
@@ -237,24 +233,14 @@ const QCCWPanelForm = () => {
   const handleAdditionalPhotoChange = (e) => {
     const files = Array.from(e.target.files);
     
-    // Process each file
-    const filePromises = files.map(file => {
-      return new Promise((resolve) => {
-        const reader = new FileReader();
-        reader.onloadend = () => {
-          resolve({
-            photo: reader.result,
-            photo_type: file.name.split('.')[0] // Use filename as photo type
-          });
-        };
-        reader.readAsDataURL(file);
-      });
-    });
+    // Keep the files for the multipart upload and preview them from object URLs
+    const newPhotoArray = files.map(file => ({
+      file: file,
+      photo: URL.createObjectURL(file),
+      photo_type: file.name.split('.')[0] // Use filename as photo type
+    }));
     
-    // Add all new photos when ready
-    Promise.all(filePromises).then(newPhotoArray => {
-      setNewPhotos([...newPhotos, ...newPhotoArray]);
-    });
+    setNewPhotos([...newPhotos, ...newPhotoArray]);
   };
   
   // Handle removing a photo
@@ -262,7 +248,8 @@ const QCCWPanelForm = () => {
     if (isNew) {
       // Remove from new photos
       const updatedNewPhotos = [...newPhotos];
-      updatedNewPhotos.splice(index, 1);
+      const [removed] = updatedNewPhotos.splice(index, 1);
+      URL.revokeObjectURL(removed.photo);
       setNewPhotos(updatedNewPhotos);
     } else {
       // Mark existing photo for deletion
@@ -326,14 +313,23 @@ const QCCWPanelForm = () => {
         }
       });
       
-      // Prepare data for submission 
-      const submitData = {
-        ...cleanedFormData
-      };
+      // Prepare data for submission; photos are sent as file parts
+      const { profile_photo: profilePhoto, ...submitData } = cleanedFormData;
+      const files = {};
+      
+      if (profilePhoto instanceof File) {
+        files.profile_photo = [profilePhoto];
+      } else if (isEditMode && !previewProfilePhoto) {
+        // Existing profile photo removed
+        submitData.profile_photo = null;
+      }
       
       // Add new photos if any
       if (newPhotos.length > 0) {
-        submitData.additional_photos = newPhotos;
+        files[isEditMode ? 'new_photos' : 'additional_photos'] = newPhotos.map(photo => ({
+          file: photo.file,
+          type: photo.photo_type
+        }));
       }
       
       // Add photo deletion list if in edit mode
@@ -345,10 +341,10 @@ const QCCWPanelForm = () => {
       
       if (isEditMode) {
         // Update existing panel
-        response = await api.qcCwPanelData.update(panelId, submitData);
+        response = await api.qcCwPanelData.update(panelId, submitData, files);
       } else {
         // Create new panel
-        response = await api.qcCwPanelData.create(submitData);
+        response = await api.qcCwPanelData.create(submitData, files);
       }
       
       // Navigate to detail view
@@ -1332,7 +1328,7 @@ const QCCWPanelForm = () => {
                                 <Card>
                                   <Card.Img
                                     variant="top"
-                                    src={`data:image/jpeg;base64,${photo.photo}`}
+                                    src={photo.thumbnail_url || photo.url}
                                     style={{ height: '100px', objectFit: 'cover' }}
                                   />
                                   <Card.Body className="p-2">
@@ -125,8 +125,7 @@ const QCReportDetail = () => {
     reader.onloadend = () => {
       setUploadedImage({
         file: file,
-        preview: reader.result,
-        base64: reader.result
+        preview: reader.result
       });
     };
     reader.readAsDataURL(file);
@@ -156,17 +155,15 @@ const QCReportDetail = () => {
         reportData.batch_items = [];
       }
       
-      // Add new images if uploaded
-      if (uploadedImage) {
-        reportData.new_images = [uploadedImage.base64];
-      }
+      // New image if uploaded, sent as a file part
+      const files = uploadedImage ? { new_images: [uploadedImage.file] } : {};
       
       // Add images to delete if any
       if (imagesToDelete.length > 0) {
         reportData.delete_images = imagesToDelete;
       }
       
-      const response = await api.qcReports.update(reportId, reportData);
+      const response = await api.qcReports.update(reportId, reportData, files);
       if (response.data && response.data.status === 'success') {
         // Reset state and fetch updated data
         setEditMode(false);
@@ -607,7 +604,7 @@ const QCReportDetail = () => {
                     ) : (
                       <>
                         <Image 
-                          src={`data:image/jpeg;base64,${image.image_data}`} 
+                          src={image.medium_url || image.url} 
                           fluid 
                           thumbnail
                         />
@@ -104,8 +104,7 @@ const QCReports = () => {
     reader.onloadend = () => {
       setUploadedImage({
         file: file,
-        preview: reader.result,
-        base64: reader.result
+        preview: reader.result
       });
     };
     reader.readAsDataURL(file);
@@ -132,12 +131,10 @@ const QCReports = () => {
         batch_items: batchItemsData.slice(1)
       };
 
-      // Add image if uploaded (shared across all items)
-      if (uploadedImage) {
-        reportData.images = [uploadedImage.base64];
-      }
+      // Image if uploaded (shared across all items), sent as a file part
+      const files = uploadedImage ? { images: [uploadedImage.file] } : {};
 
-      const response = await api.qcReports.create(reportData);
+      const response = await api.qcReports.create(reportData, files);
       if (response.data && response.data.status === 'success') {
         setShowAddModal(false);
         resetForm();
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { getToken, logout } from '../utils/auth';
+import { getToken, setToken, getRefreshToken, setRefreshToken, logout } from '../utils/auth';
 
 // Create Axios instance with base URL
 const api = axios.create({
@@ -24,13 +24,45 @@ api.interceptors.request.use(
   }
 );
 
+// Refresh in progress, shared by all requests failing with 401 meanwhile:
+// a refresh token can only be used once
+let refreshPromise = null;
+
+const refreshAccessToken = () => {
+  if (!refreshPromise) {
+    refreshPromise = axios
+      .post('/api/auth/refresh', { refresh_token: getRefreshToken() })
+      .then((response) => {
+        setToken(response.data.access_token);
+        setRefreshToken(response.data.refresh_token);
+        return response.data.access_token;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
 // Add response interceptor to handle auth errors
 api.interceptors.response.use(
   (response) => {
     return response;
   },
-  (error) => {
+  async (error) => {
+    const request = error.config;
     if (error.response && error.response.status === 401) {
+      // Renew an expired access token once before giving up
+      if (request && !request._retried && getRefreshToken()) {
+        request._retried = true;
+        try {
+          const token = await refreshAccessToken();
+          request.headers.Authorization = `Bearer ${token}`;
+          return api(request);
+        } catch (refreshError) {
+          // Fall through to logout
+        }
+      }
       // Logout on auth error
       logout();
       window.location.href = '/login';
@@ -39,12 +71,68 @@ api.interceptors.response.use(
   }
 );
 
+// Excel exports run as background jobs: queue one, poll it, then download the file
+const EXPORT_POLL_INTERVAL_MS = 1000;
+const EXPORT_TIMEOUT_MS = 10 * 60 * 1000;
+
+const runExport = async (exportType) => {
+  const created = await api.post('/exports', { export_type: exportType });
+  let job = created.data.data;
+  const deadline = Date.now() + EXPORT_TIMEOUT_MS;
+  while (job.status === 'queued' || job.status === 'running') {
+    if (Date.now() > deadline) {
+      throw new Error('Export is taking too long, try again later');
+    }
+    await new Promise((resolve) => setTimeout(resolve, EXPORT_POLL_INTERVAL_MS));
+    const polled = await api.get(`/exports/${job.id}`);
+    job = polled.data.data;
+  }
+  if (job.status !== 'completed') {
+    throw new Error(job.error || 'Export failed');
+  }
+
+  const file = await api.get(`/exports/${job.id}/download`, { responseType: 'blob' });
+  const url = window.URL.createObjectURL(file.data);
+  const link = document.createElement('a');
+  link.href = url;
+  link.setAttribute('download', job.filename);
+  document.body.appendChild(link);
+  link.click();
+  document.body.removeChild(link);
+  window.URL.revokeObjectURL(url);
+  return job;
+};
+
+// Forms with images are sent as multipart/form-data: the JSON body goes in the
+// "data" field and each file in its own part, so images are neither base64
+// encoded nor buffered inside one JSON document. `files` maps a field name to a
+// list of File objects, or of { file, type } entries whose types are sent in
+// matching "<field>_type" fields.
+const MULTIPART = { headers: { 'Content-Type': 'multipart/form-data' } };
+
+const multipartForm = (data, files = {}) => {
+  const form = new FormData();
+  form.append('data', JSON.stringify(data));
+  Object.entries(files).forEach(([field, entries]) => {
+    entries.forEach((entry) => {
+      if (entry instanceof Blob) {
+        form.append(field, entry);
+      } else {
+        form.append(field, entry.file);
+        form.append(`${field}_type`, entry.type || '');
+      }
+    });
+  });
+  return form;
+};
+
 // Authentication API calls
 const auth = {
   login: (username, password) => {
     // Use the correct login endpoint with proper path that matches the backend
     return api.post('/auth/token', { username, password });
   },
+  logout: (refreshToken) => api.post('/auth/logout', { refresh_token: refreshToken }),
   register: (userData) => api.post('/auth/register', userData),
   getCurrentUser: () => api.get('/auth/users/me'),
 };
@@ -154,16 +242,7 @@ const productParts = {
   create: (data) => api.post('/product-parts', data),
   update: (id, data) => api.put(`/product-parts/${id}`, data),
   delete: (id) => api.delete(`/product-parts/${id}`),
-  exportExcel: () => {
-    // Create a direct download link with proper headers
-    const downloadUrl = '/api/product-parts/export-excel';
-    const link = document.createElement('a');
-    link.href = downloadUrl;
-    link.setAttribute('download', 'Product_Parts.xlsx');
-    document.body.appendChild(link);
-    link.click();
-    document.body.removeChild(link);
-  },
+  exportExcel: () => runExport('product-parts'),
 };
 
 // Coating Colors API calls
@@ -173,35 +252,17 @@ const coatingColors = {
   create: (data) => api.post('/coating-colors', data),
   update: (id, data) => api.put(`/coating-colors/${id}`, data),
   delete: (id) => api.delete(`/coating-colors/${id}`),
-  exportExcel: () => {
-    // Create a direct download link with proper headers
-    const downloadUrl = '/api/coating-colors/export-excel';
-    const link = document.createElement('a');
-    link.href = downloadUrl;
-    link.setAttribute('download', 'Coating_Colors.xlsx');
-    document.body.appendChild(link);
-    link.click();
-    document.body.removeChild(link);
-  },
+  exportExcel: () => runExport('coating-colors'),
 };
 
 // QC Reports API calls
 const qcReports = {
   getAll: (params) => api.get('/qc-reports', { params }),
   getById: (id) => api.get(`/qc-reports/${id}`),
-  create: (data) => api.post('/qc-reports', data),
-  update: (id, data) => api.put(`/qc-reports/${id}`, data),
+  create: (data, files) => api.post('/qc-reports', multipartForm(data, files), MULTIPART),
+  update: (id, data, files) => api.put(`/qc-reports/${id}`, multipartForm(data, files), MULTIPART),
   delete: (id) => api.delete(`/qc-reports/${id}`),
-  exportExcel: () => {
-    // Create a direct download link with proper headers
-    const downloadUrl = '/api/qc-reports/export-excel';
-    const link = document.createElement('a');
-    link.href = downloadUrl;
-    link.setAttribute('download', 'QC_Reports.xlsx');
-    document.body.appendChild(link);
-    link.click();
-    document.body.removeChild(link);
-  },
+  exportExcel: () => runExport('qc-reports'),
 };
 
 // QC CW Panel Data API calls
@@ -209,19 +270,10 @@ const qcCwPanelData = {
   getAll: (params) => api.get('/qc-cw-panel-data', { params }),
   getById: (id) => api.get(`/qc-cw-panel-data/${id}`),
   getByFlId: (flId) => api.get(`/qc-cw-panel-data/fl/${flId}`),
-  create: (data) => api.post('/qc-cw-panel-data', data),
-  update: (id, data) => api.put(`/qc-cw-panel-data/${id}`, data),
+  create: (data, files) => api.post('/qc-cw-panel-data', multipartForm(data, files), MULTIPART),
+  update: (id, data, files) => api.put(`/qc-cw-panel-data/${id}`, multipartForm(data, files), MULTIPART),
   delete: (id) => api.delete(`/qc-cw-panel-data/${id}`),
-  exportExcel: () => {
-    // Create a direct download link with proper headers
-    const downloadUrl = '/api/qc/cw-panel-data/export-excel';
-    const link = document.createElement('a');
-    link.href = downloadUrl;
-    link.setAttribute('download', 'QC_CW_Panel_Data.xlsx');
-    document.body.appendChild(link);
-    link.click();
-    document.body.removeChild(link);
-  },
+  exportExcel: () => runExport('qc-cw-panel-data'),
   
   // Frame Cavities API
   getFrameCavitiesAttributes: (flId) => api.get(`/frame-cavities-attributes/${flId}`),
@@ -236,6 +288,11 @@ const qcCwPanelData = {
   deleteFrameCavitiesValue: (id) => api.delete(`/frame-cavities-values/${id}`),
 };
 
+// Reference data bundle for form bootstrapping
+const referenceData = {
+  getBundle: (params) => api.get('/reference-bundle', { params }),
+};
+
 export default {
   auth,
   products,
@@ -246,4 +303,5 @@ export default {
   coatingColors,
   qcReports,
   qcCwPanelData,
+  referenceData,
 };
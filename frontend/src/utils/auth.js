@@ -8,9 +8,20 @@ export const getToken = () => {
   return localStorage.getItem('qc_token');
 };
 
-// Remove the JWT token from localStorage
+// Store the refresh token used to renew the JWT token
+export const setRefreshToken = (token) => {
+  localStorage.setItem('qc_refresh_token', token);
+};
+
+// Get the refresh token from localStorage
+export const getRefreshToken = () => {
+  return localStorage.getItem('qc_refresh_token');
+};
+
+// Remove the JWT and refresh tokens from localStorage
 export const removeToken = () => {
   localStorage.removeItem('qc_token');
+  localStorage.removeItem('qc_refresh_token');
 };
 
 // Check if user is authenticated